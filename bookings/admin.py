@@ -1,5 +1,8 @@
-from django.contrib import admin
-from .models import Booking
+from django.contrib import admin, messages
+from django.utils import timezone
+from .approvals import bulk_approve
+from .models import Booking, BookingArchive, BlackoutDate, CounselorAvailability, IdempotencyKey, OutboxJob
+from .transitions import transition_many
 
 
 @admin.register(Booking)
@@ -7,7 +10,8 @@ class BookingAdmin(admin.ModelAdmin):
     """
     Admin interface for Booking model.
     """
-    list_display = ('student', 'date', 'time', 'status', 'created_at')
+    list_display = ('student', 'date', 'time', 'status', 'risk_score', 'created_at')
+    list_select_related = ('student',)
     list_filter = ('status', 'date', 'created_at')
     search_fields = ('student__username', 'student__email', 'reason')
     ordering = ('-created_at',)
@@ -19,29 +23,111 @@ class BookingAdmin(admin.ModelAdmin):
         ('Status', {
             'fields': ('status', 'notes')
         }),
+        ('Risk', {
+            'fields': ('risk_score', 'risk_reasons', 'risk_scored_at')
+        }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('risk_score', 'risk_reasons', 'risk_scored_at', 'created_at', 'updated_at')
     
     actions = ['approve_bookings', 'reject_bookings', 'mark_completed']
     
     def approve_bookings(self, request, queryset):
-        queryset.update(status='approved')
-        self.message_user(request, f"{queryset.count()} booking(s) approved.")
+        results = bulk_approve(queryset.select_related('student'))
+        approved = sum(1 for result in results if result['ok'])
+        self.message_user(request, f"{approved} booking(s) approved with Google Meet links.")
+        for result in results:
+            if not result['ok']:
+                self.message_user(request, f"Booking #{result['id']} not approved: {result['error']}", messages.WARNING)
     approve_bookings.short_description = "Approve selected bookings"
     
     def reject_bookings(self, request, queryset):
-        queryset.update(status='rejected')
-        self.message_user(request, f"{queryset.count()} booking(s) rejected.")
+        updated = transition_many(queryset, 'rejected')
+        self.message_user(request, f"{updated} booking(s) rejected.")
     reject_bookings.short_description = "Reject selected bookings"
     
     def mark_completed(self, request, queryset):
-        queryset.update(status='completed')
-        self.message_user(request, f"{queryset.count()} booking(s) marked as completed.")
+        updated = transition_many(queryset, 'completed')
+        self.message_user(request, f"{updated} booking(s) marked as completed.")
     mark_completed.short_description = "Mark as completed"
 
 
+@admin.register(BookingArchive)
+class BookingArchiveAdmin(admin.ModelAdmin):
+    """
+    Read-only admin interface for archived bookings.
+    """
+    list_display = ('student', 'date', 'time', 'status', 'archived_at')
+    list_select_related = ('student',)
+    list_filter = ('status', 'date')
+    search_fields = ('student__username', 'student__email')
+    ordering = ('-date',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CounselorAvailability)
+class CounselorAvailabilityAdmin(admin.ModelAdmin):
+    """
+    Admin interface for counselor working hours.
+    """
+    list_display = ('counselor', 'weekday', 'start_time', 'end_time', 'session_type', 'is_active')
+    list_select_related = ('counselor',)
+    list_filter = ('weekday', 'session_type', 'is_active')
+    search_fields = ('counselor__username',)
+    ordering = ('weekday', 'start_time')
+
+
+@admin.register(BlackoutDate)
+class BlackoutDateAdmin(admin.ModelAdmin):
+    """
+    Admin interface for counselor and team blackout dates.
+    """
+    list_display = ('date', 'counselor', 'reason')
+    list_select_related = ('counselor',)
+    list_filter = ('date',)
+    search_fields = ('counselor__username', 'reason')
+    ordering = ('-date',)
+
+
+@admin.register(OutboxJob)
+class OutboxJobAdmin(admin.ModelAdmin):
+    """
+    Admin interface for queued booking side effects.
+    """
+    list_display = ('id', 'kind', 'booking', 'status', 'attempts', 'run_after', 'updated_at')
+    list_select_related = ('booking__student',)
+    list_filter = ('status', 'kind')
+    search_fields = ('booking__student__username', 'last_error')
+    ordering = ('-id',)
+    raw_id_fields = ('booking', 'parent')
+    readonly_fields = ('created_at', 'updated_at')
+
+    actions = ['retry_jobs']
+
+    def retry_jobs(self, request, queryset):
+        updated = queryset.filter(status='failed').update(status='pending', attempts=0, run_after=timezone.now())
+        self.message_user(request, f"{updated} job(s) queued for retry.")
+    retry_jobs.short_description = "Retry selected failed jobs"
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    """
+    Admin interface for stored Idempotency-Key responses.
+    """
+    list_display = ('key', 'user', 'method', 'path', 'response_status', 'created_at')
+    list_select_related = ('user',)
+    list_filter = ('method', 'response_status')
+    search_fields = ('key', 'user__username', 'path')
+    ordering = ('-created_at',)
+    raw_id_fields = ('user',)
+    readonly_fields = ('created_at',)
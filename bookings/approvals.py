@@ -0,0 +1,93 @@
+"""
+Approval of bookings.
+
+A single approval only records the status change and queues the Meet
+creation in the outbox. For bulk approval Meet events for all selected
+bookings are created through Calendar batch requests, the results are
+written back with one bulk_update and the approval emails are queued in the
+outbox.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import outbox
+from .google_meet import create_meet_events
+from .models import Booking, OutboxJob
+from .transitions import transition
+
+
+def approve_booking(booking):
+    """
+    Approve a booking and queue its Meet creation (which then queues the
+    approval email).
+
+    Returns:
+        OutboxJob: the queued Meet creation job
+
+    Raises:
+        TransitionConflict: if the booking is no longer pending
+    """
+    with transaction.atomic():
+        transition(booking, 'approved')
+        return outbox.enqueue(OutboxJob.CREATE_MEET, booking)
+
+
+def bulk_approve(bookings):
+    """
+    Approve pending bookings and create their Google Meet events.
+
+    Bookings whose Meet event could not be created stay pending so they can
+    be retried.
+
+    Args:
+        bookings: queryset or iterable of Booking instances
+
+    Returns:
+        list of dicts, one per booking: {'id', 'ok', 'meet_link'} on success
+        or {'id', 'ok', 'error'} on failure
+    """
+    bookings = list(bookings)
+    report = {}
+    pending = []
+    for booking in bookings:
+        if booking.status == 'pending':
+            pending.append(booking)
+        else:
+            report[booking.id] = {'id': booking.id, 'ok': False, 'error': f'Booking is {booking.status}'}
+
+    meet_results = create_meet_events(pending)
+
+    now = timezone.now()
+    approved = []
+    for booking in pending:
+        result = meet_results.get(booking.id) or {'error': 'No response from Google Calendar'}
+        if 'error' in result:
+            report[booking.id] = {'id': booking.id, 'ok': False, 'error': result['error']}
+            continue
+        booking.status = 'approved'
+        booking.meet_link = result['meet_link']
+        booking.calendar_event_id = result['event_id']
+        booking.updated_at = now
+        approved.append(booking)
+        report[booking.id] = {'id': booking.id, 'ok': True, 'meet_link': booking.meet_link}
+
+    if approved:
+        with transaction.atomic():
+            # Only write bookings that are still pending; the rows stay
+            # locked for the short bulk_update, not for the Google calls
+            still_pending = set(
+                Booking.objects.select_for_update()
+                .filter(pk__in=[booking.id for booking in approved], status='pending')
+                .values_list('id', flat=True)
+            )
+            for booking in approved:
+                if booking.id not in still_pending:
+                    report[booking.id] = {'id': booking.id, 'ok': False, 'error': 'Booking was changed by another request'}
+                    outbox.enqueue(OutboxJob.DELETE_MEET, booking, payload={'event_id': booking.calendar_event_id})
+            approved = [booking for booking in approved if booking.id in still_pending]
+            Booking.objects.bulk_update(
+                approved, ['status', 'meet_link', 'calendar_event_id', 'updated_at'], batch_size=500
+            )
+            outbox.enqueue_many(OutboxJob.SEND_APPROVAL_EMAIL, approved)
+
+    return [report[booking.id] for booking in bookings]
@@ -0,0 +1,58 @@
+"""
+Moves old completed and cancelled bookings to the bookings_archive table.
+
+Each batch is its own short transaction: the rows are locked (skipping rows
+other transactions hold), copied to the archive and deleted from bookings.
+Locks are only held for one batch, so the API keeps running while a large
+backlog is archived.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Booking, BookingArchive
+
+ARCHIVE_STATUSES = ('completed', 'cancelled')
+UNFINISHED_JOB_STATUSES = ('pending', 'running')
+
+# Booking columns copied to the archive (student as student_id)
+ARCHIVED_FIELDS = [field.attname for field in Booking._meta.concrete_fields]
+
+
+def archivable(days):
+    """
+    Bookings in ARCHIVE_STATUSES whose session is more than ``days`` days
+    old. Bookings with outbox jobs still to run (e.g. deleting the Meet event
+    of a cancelled session) stay until the jobs are done, since deleting the
+    booking would delete its jobs.
+    """
+    cutoff = timezone.localdate() - timedelta(days=days)
+    # No ORDER BY: the default -created_at would sort every candidate row
+    return (
+        Booking.objects.filter(status__in=ARCHIVE_STATUSES, date__lt=cutoff)
+        .exclude(jobs__status__in=UNFINISHED_JOB_STATUSES)
+        .order_by()
+    )
+
+
+def archive_batch(queryset, batch_size):
+    """
+    Move up to ``batch_size`` bookings from ``queryset`` to the archive.
+
+    Returns:
+        int: number of bookings moved (0 when nothing is left)
+    """
+    with transaction.atomic():
+        bookings = list(queryset.select_for_update(skip_locked=True)[:batch_size])
+        if not bookings:
+            return 0
+        now = timezone.now()
+        BookingArchive.objects.bulk_create([
+            BookingArchive(archived_at=now, **{name: getattr(booking, name) for name in ARCHIVED_FIELDS})
+            for booking in bookings
+        ])
+        # Their outbox jobs are all finished (see archivable) and are deleted
+        # with them
+        Booking.objects.filter(id__in=[booking.id for booking in bookings]).delete()
+    return len(bookings)
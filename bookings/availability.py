@@ -0,0 +1,238 @@
+"""
+Free-slot engine for counseling bookings.
+
+A slot is BOOKING_SLOT_MINUTES long. The counselors whose working hours
+cover it (and who are not on a blackout date) can each take one session,
+of the session types their working-hours rows accept. Bookings are not
+assigned to counselors, so a slot is free for a session type when every
+pending or approved booking overlapping it, plus the new session, can be
+matched to a distinct counselor who accepts its type (a small bipartite
+matching per slot). A group booking therefore does not use up a
+crisis-only counselor.
+
+Everything for a date range is loaded with one query per table and the
+rest is done in memory.
+"""
+import datetime
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import accumulate
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import BlackoutDate, Booking, CounselorAvailability
+
+# Bookings in these states hold their slot
+ACTIVE_STATUSES = ('pending', 'approved')
+# Accepted-types value of a counselor who takes every session type
+ANY_TYPE = None
+
+
+class SlotUnavailable(Exception):
+    """Raised when a booking is made for a slot with no free capacity."""
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _time(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def _accepts(types, session_type):
+    return types is ANY_TYPE or session_type is None or session_type in types
+
+
+class SlotIndex:
+    """
+    Capacity and booked intervals between two dates (inclusive).
+
+    Args:
+        start: first date
+        end: last date
+        session_type: check capacity for sessions of this type (None: any
+            counselor will do)
+    """
+
+    def __init__(self, start, end, session_type=None):
+        self.start = start
+        self.end = end
+        self.session_type = session_type or None
+        self.slot_minutes = settings.BOOKING_SLOT_MINUTES
+
+        # weekday -> [(start_minute, end_minute, counselor_id, session type or '')]
+        self.windows = defaultdict(list)
+        rows = CounselorAvailability.objects.filter(is_active=True).values_list(
+            'counselor_id', 'weekday', 'start_time', 'end_time', 'session_type'
+        )
+        for counselor_id, weekday, start_time, end_time, window_type in rows:
+            self.windows[weekday].append((_minutes(start_time), _minutes(end_time), counselor_id, window_type))
+        # No availability configured at all: bookings are not restricted
+        self.enforced = bool(rows)
+
+        # date -> set of counselor ids (None blocks the whole team)
+        self.blackouts = defaultdict(set)
+        for day, counselor_id in BlackoutDate.objects.filter(date__range=(start, end)).values_list('date', 'counselor_id'):
+            self.blackouts[day].add(counselor_id)
+
+        # date -> session type -> (sorted booking start minutes, running
+        # booking counts); bookings are grouped by start time and type in
+        # the database so only one row per group is transferred
+        grouped = defaultdict(lambda: defaultdict(list))
+        bookings = (
+            Booking.objects.filter(date__range=(start, end), status__in=ACTIVE_STATUSES)
+            .order_by()
+            .values_list('date', 'time', 'session_type')
+            .annotate(count=Count('id'))
+        )
+        for day, start_time, booking_type, count in bookings:
+            grouped[day][booking_type].append((_minutes(start_time), count))
+        self.booked = {}
+        for day, by_type in grouped.items():
+            self.booked[day] = {}
+            for booking_type, entries in by_type.items():
+                entries.sort()
+                self.booked[day][booking_type] = (
+                    [minute for minute, _ in entries],
+                    list(accumulate(count for _, count in entries)),
+                )
+
+    def staffing(self, day, start_minute):
+        """
+        Counselors able to take a session starting at start_minute on day.
+
+        Returns:
+            {counselor id: set of accepted session types, or ANY_TYPE}
+        """
+        blocked = self.blackouts.get(day, ())
+        if None in blocked:
+            return {}
+        end_minute = start_minute + self.slot_minutes
+        staff = {}
+        for window_start, window_end, counselor_id, window_type in self.windows.get(day.weekday(), ()):
+            if window_start <= start_minute and end_minute <= window_end and counselor_id not in blocked:
+                if not window_type:
+                    staff[counselor_id] = ANY_TYPE
+                elif staff.get(counselor_id, set()) is not ANY_TYPE:
+                    staff.setdefault(counselor_id, set()).add(window_type)
+        return staff
+
+    def counselors(self, day, start_minute):
+        """Ids of counselors able to take a session of this index's type at start_minute on day."""
+        return {
+            counselor_id for counselor_id, types in self.staffing(day, start_minute).items()
+            if _accepts(types, self.session_type)
+        }
+
+    def overlapping(self, day, start_minute):
+        """{session type: number of active bookings overlapping a slot starting at start_minute}."""
+        counts = {}
+        low = start_minute - self.slot_minutes
+        high = start_minute + self.slot_minutes
+        for booking_type, (starts, totals) in self.booked.get(day, {}).items():
+            last = bisect_left(starts, high)
+            first = bisect_right(starts, low)
+            if last > first:
+                counts[booking_type] = totals[last - 1] - (totals[first - 1] if first else 0)
+        return counts
+
+    def available(self, day, start_minute):
+        """
+        How many more sessions of this index's type the slot can take once
+        the overlapping bookings are matched to counselors accepting their
+        type. Bookings that cannot be matched (e.g. after working hours were
+        reduced) do not block the others.
+        """
+        staff = self.staffing(day, start_minute)
+        eligible = [counselor_id for counselor_id, types in staff.items() if _accepts(types, self.session_type)]
+        if not eligible:
+            return 0
+        overlapping = self.overlapping(day, start_minute)
+        if not overlapping:
+            return len(eligible)
+        if all(types is ANY_TYPE for types in staff.values()):
+            # Everyone takes every type: plain capacity minus bookings
+            return max(len(eligible) - sum(overlapping.values()), 0)
+
+        # Kuhn's augmenting paths; sizes are a handful of counselors and bookings
+        assigned = {}  # counselor id -> index of the booking it takes
+
+        def match(candidates, booking, seen):
+            for counselor_id in candidates[booking]:
+                if counselor_id in seen:
+                    continue
+                seen.add(counselor_id)
+                if counselor_id not in assigned or match(candidates, assigned[counselor_id], seen):
+                    assigned[counselor_id] = booking
+                    return True
+            return False
+
+        candidates = []
+        for booking_type, count in overlapping.items():
+            servers = [counselor_id for counselor_id, types in staff.items() if _accepts(types, booking_type)]
+            candidates.extend([servers] * count)
+        for booking in range(len(candidates)):
+            match(candidates, booking, set())
+        free = 0
+        for _ in eligible:
+            candidates.append(eligible)
+            if not match(candidates, len(candidates) - 1, set()):
+                break
+            free += 1
+        return free
+
+    def is_free(self, day, start_time):
+        if not self.enforced:
+            return True
+        return self.available(day, _minutes(start_time)) > 0
+
+    def free_slots(self, now=None):
+        """
+        Yield dicts {'date', 'time', 'available'} for every slot with free
+        capacity, in chronological order. Slots start on the working-hours
+        grid of the counselors accepting the session type.
+        """
+        now = timezone.localtime(now or timezone.now())
+        day = self.start
+        while day <= self.end:
+            starts = set()
+            for window_start, window_end, _, window_type in self.windows.get(day.weekday(), ()):
+                if _accepts(ANY_TYPE if not window_type else {window_type}, self.session_type):
+                    starts.update(range(window_start, window_end - self.slot_minutes + 1, self.slot_minutes))
+            if day == now.date():
+                starts = {minute for minute in starts if minute > _minutes(now.time())}
+            elif day < now.date():
+                starts = set()
+            for start_minute in sorted(starts):
+                available = self.available(day, start_minute)
+                if available > 0:
+                    yield {'date': day, 'time': _time(start_minute), 'available': available}
+            day += datetime.timedelta(days=1)
+
+
+def is_slot_free(day, start_time, session_type=None):
+    """Check a single slot (advisory; use reserve_slot when saving)."""
+    return SlotIndex(day, day, session_type).is_free(day, start_time)
+
+
+@contextmanager
+def reserve_slot(day, start_time, session_type=None):
+    """
+    Check a slot and keep it reserved while the booking is saved.
+
+    The day's availability rows are locked with SELECT ... FOR UPDATE, so
+    concurrent bookings for the same weekday are checked one at a time.
+
+    Raises:
+        SlotUnavailable: if the slot has no free capacity
+    """
+    with transaction.atomic():
+        list(CounselorAvailability.objects.select_for_update().filter(weekday=day.weekday()).values_list('id'))
+        if not is_slot_free(day, start_time, session_type):
+            raise SlotUnavailable("This time slot is no longer available. Please choose another time.")
+        yield
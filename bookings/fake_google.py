@@ -0,0 +1,256 @@
+"""
+Local stand-in for the Google Calendar and Gmail APIs.
+
+Implements the calls MindBridge makes (Calendar events insert/get/update/
+patch/delete, Gmail messages.send and batch requests for both) with
+configurable latency and error injection, so the approval path can be
+load-tested without touching live Google.
+
+    python manage.py fake_google --latency-ms 150 --error-rate 0.02
+    GOOGLE_API_ENDPOINT=http://127.0.0.1:8765/ python manage.py benchmark_approvals
+
+Events are kept in memory and are lost when the server stops.
+"""
+import email.parser
+import json
+import random
+import re
+import string
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+EVENTS_PATH = re.compile(r'^/calendar/v3/calendars/(?P<calendar>[^/]+)/events$')
+EVENT_PATH = re.compile(r'^/calendar/v3/calendars/(?P<calendar>[^/]+)/events/(?P<event_id>[^/]+)$')
+SEND_PATH = re.compile(r'^/gmail/v1/users/(?P<user>[^/]+)/messages/send$')
+
+# Status codes returned by injected errors, as Google returns them under load
+INJECTED_ERRORS = (
+    (HTTPStatus.TOO_MANY_REQUESTS, 'rateLimitExceeded'),
+    (HTTPStatus.INTERNAL_SERVER_ERROR, 'backendError'),
+    (HTTPStatus.SERVICE_UNAVAILABLE, 'backendError'),
+)
+
+
+def _error(code, reason, message):
+    return code, {'error': {
+        'code': int(code),
+        'message': message,
+        'errors': [{'domain': 'global', 'reason': reason, 'message': message}],
+    }}
+
+
+def _meet_code(rng):
+    letters = [rng.choice(string.ascii_lowercase) for _ in range(10)]
+    return f"{''.join(letters[:3])}-{''.join(letters[3:7])}-{''.join(letters[7:])}"
+
+
+class FakeGoogleServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the fake API state.
+
+    Args:
+        address: (host, port) to listen on
+        latency: seconds added to every HTTP request (a batch counts once)
+        jitter: up to this many seconds added or removed at random
+        error_rate: fraction (0-1) of API calls answered with a 429/500/503
+        seed: seed for the random generator, for repeatable runs
+    """
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        super().__init__(address, FakeGoogleHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.events = {}
+        self.stats = {'requests': 0, 'calls': 0, 'errors': 0, 'events_created': 0, 'messages_sent': 0}
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def delay(self):
+        with self.lock:
+            delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def injected_error(self):
+        """Return an error response for this call, or None."""
+        with self.lock:
+            if self.error_rate <= 0 or self.rng.random() >= self.error_rate:
+                return None
+            code, reason = self.rng.choice(INJECTED_ERRORS)
+        self.count('errors')
+        return _error(code, reason, 'Injected error from fake Google server')
+
+    def call(self, method, path, body):
+        """
+        Handle one API call.
+
+        Returns:
+            (status code, JSON-serializable body or None)
+        """
+        self.count('calls')
+        failure = self.injected_error()
+        if failure:
+            return failure
+
+        match = EVENTS_PATH.match(path)
+        if match and method == 'POST':
+            return self.insert_event(body)
+        match = EVENT_PATH.match(path)
+        if match:
+            return self.event_call(method, match['event_id'], body)
+        match = SEND_PATH.match(path)
+        if match and method == 'POST':
+            self.count('messages_sent')
+            message_id = uuid.uuid4().hex[:16]
+            return HTTPStatus.OK, {'id': message_id, 'threadId': message_id, 'labelIds': ['SENT']}
+        return _error(HTTPStatus.NOT_FOUND, 'notFound', f'No fake endpoint for {method} {path}')
+
+    def insert_event(self, body):
+        event_id = body.get('id') or uuid.uuid4().hex
+        with self.lock:
+            if event_id in self.events:
+                return _error(HTTPStatus.CONFLICT, 'duplicate', 'The requested identifier already exists.')
+            meet_link = f'https://meet.google.com/{_meet_code(self.rng)}'
+        event = dict(
+            body,
+            kind='calendar#event',
+            id=event_id,
+            status='confirmed',
+            htmlLink=f'https://www.google.com/calendar/event?eid={event_id}',
+        )
+        if 'createRequest' in body.get('conferenceData', {}):
+            event['hangoutLink'] = meet_link
+            event['conferenceData'] = dict(
+                body['conferenceData'],
+                entryPoints=[{'entryPointType': 'video', 'uri': meet_link}],
+            )
+        with self.lock:
+            self.events[event_id] = event
+        self.count('events_created')
+        return HTTPStatus.OK, event
+
+    def event_call(self, method, event_id, body):
+        with self.lock:
+            event = self.events.get(event_id)
+            if event is None:
+                return _error(HTTPStatus.NOT_FOUND, 'notFound', 'Not Found')
+            if method == 'GET':
+                return HTTPStatus.OK, event
+            if method in ('PUT', 'PATCH'):
+                updated = dict(body) if method == 'PUT' else dict(event, **body)
+                updated.update(id=event_id, kind='calendar#event', htmlLink=event['htmlLink'])
+                if 'hangoutLink' in event:
+                    updated['hangoutLink'] = event['hangoutLink']
+                self.events[event_id] = updated
+                return HTTPStatus.OK, updated
+            if method == 'DELETE':
+                del self.events[event_id]
+                return HTTPStatus.NO_CONTENT, None
+        return _error(HTTPStatus.METHOD_NOT_ALLOWED, 'methodNotAllowed', f'{method} is not supported')
+
+
+class FakeGoogleHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so the API clients reuse their connections as with Google
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.dispatch()
+
+    def do_POST(self):
+        self.dispatch()
+
+    def do_PUT(self):
+        self.dispatch()
+
+    def do_PATCH(self):
+        self.dispatch()
+
+    def do_DELETE(self):
+        self.dispatch()
+
+    def dispatch(self):
+        server = self.server
+        server.count('requests')
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        path = urlsplit(self.path).path
+
+        server.delay()
+        if path == '/_stats':
+            with server.lock:
+                stats = dict(server.stats, events_stored=len(server.events))
+            return self.respond(HTTPStatus.OK, json.dumps(stats).encode(), 'application/json')
+        if path.startswith('/batch'):
+            return self.batch(raw)
+
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            code, payload = _error(HTTPStatus.BAD_REQUEST, 'parseError', 'Invalid JSON payload')
+        else:
+            code, payload = server.call(self.command, path, body)
+        content = json.dumps(payload).encode() if payload is not None else b''
+        self.respond(code, content, 'application/json; charset=UTF-8')
+
+    def batch(self, raw):
+        """Answer a multipart/mixed batch request with one part per call."""
+        content_type = self.headers.get('Content-Type', '')
+        message = email.parser.BytesParser().parsebytes(
+            f'Content-Type: {content_type}\r\n\r\n'.encode() + raw
+        )
+        if not message.is_multipart():
+            code, payload = _error(HTTPStatus.BAD_REQUEST, 'badRequest', 'Expected a multipart/mixed body')
+            return self.respond(code, json.dumps(payload).encode(), 'application/json; charset=UTF-8')
+
+        boundary = f'batch_{uuid.uuid4().hex}'
+        parts = []
+        for part in message.get_payload():
+            method, path, body = self._parse_inner_request(part.get_payload())
+            code, payload = self.server.call(method, path, body)
+            inner = f'HTTP/1.1 {int(code)} {HTTPStatus(code).phrase}\r\n'
+            if payload is not None:
+                inner += f'Content-Type: application/json; charset=UTF-8\r\n\r\n{json.dumps(payload)}'
+            else:
+                inner += '\r\n'
+            content_id = part.get('Content-ID', '<>')
+            parts.append(
+                f'--{boundary}\r\n'
+                'Content-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id[1:-1]}>\r\n\r\n'
+                f'{inner}\r\n'
+            )
+        content = (''.join(parts) + f'--{boundary}--\r\n').encode()
+        self.respond(HTTPStatus.OK, content, f'multipart/mixed; boundary={boundary}')
+
+    @staticmethod
+    def _parse_inner_request(text):
+        head, _, body = text.replace('\r\n', '\n').partition('\n\n')
+        method, target = head.split('\n', 1)[0].split(' ')[:2]
+        try:
+            payload = json.loads(body) if body.strip() else {}
+        except ValueError:
+            payload = {}
+        return method, urlsplit(target).path, payload
+
+    def respond(self, code, content, content_type):
+        self.send_response(code)
+        if content:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if content:
+            self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        # One line per request would swamp the output under load
+        pass
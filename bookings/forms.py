@@ -1,5 +1,6 @@
 from django import forms
 from .models import Booking
+from .availability import is_slot_free
 from datetime import date
 
 
@@ -45,3 +46,11 @@ class BookingForm(forms.ModelForm):
         if booking_date and booking_date < date.today():
             raise forms.ValidationError("Cannot book sessions in the past.")
         return booking_date
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        booking_date = cleaned_data.get('date')
+        booking_time = cleaned_data.get('time')
+        if booking_date and booking_time and not is_slot_free(booking_date, booking_time, cleaned_data.get('session_type')):
+            self.add_error('time', "This time slot is not available. Please choose another time.")
+        return cleaned_data
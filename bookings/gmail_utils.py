@@ -1,11 +1,10 @@
 import base64
-from email.mime.text import MIMEText
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-import os
 
-# Assumes token.json is in the same directory and contains the correct scopes
-TOKEN_PATH = os.path.join(os.path.dirname(__file__), 'token.json')
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+from googleapiclient.errors import HttpError
+
+from .google_clients import get_service
 
 # You may need to adjust the scopes and credentials loading for your project
 SCOPES = [
@@ -13,16 +12,101 @@ SCOPES = [
     'https://www.googleapis.com/auth/calendar.events'
 ]
 
+# Gmail accepts up to 100 calls per batch but throttles large batches
+BATCH_SIZE = 50
+
+
+class GmailBackend(BaseEmailBackend):
+    """
+    Django email backend that sends through the Gmail API.
+
+    Uses the cached Gmail client, and sends several messages as Gmail
+    batch HTTP requests of up to BATCH_SIZE messages each.
+
+    A batch can partly fail. send_messages() returns the number sent and
+    sets ``send_error`` on every message: None if it was sent, otherwise
+    the exception. It only raises (unless fail_silently) when no message
+    was sent, so callers can tell which messages of a partly failed batch
+    went out.
+
+    EMAIL_BACKEND = 'bookings.gmail_utils.GmailBackend'
+    """
+
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        self.service = None
+
+    def open(self):
+        if self.service is not None:
+            return False
+        try:
+            self.service = get_service('gmail', 'v1')
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return False
+        return True
+
+    def close(self):
+        # The client and its HTTP connection are shared; keep them cached
+        self.service = None
+
+    def send_messages(self, email_messages):
+        email_messages = [message for message in email_messages if message.recipients()]
+        if not email_messages:
+            return 0
+        new_connection = self.open()
+        if self.service is None:
+            return 0
+
+        for message in email_messages:
+            message.send_error = None
+        errors = []
+
+        def fail(message, exception):
+            message.send_error = exception
+            errors.append(exception)
+            print(f"Failed to send email to {', '.join(message.recipients())}: {exception}")
+
+        try:
+            for start in range(0, len(email_messages), BATCH_SIZE):
+                chunk = email_messages[start:start + BATCH_SIZE]
+                if len(chunk) == 1:
+                    try:
+                        self._send_request(chunk[0]).execute()
+                    except HttpError as e:
+                        fail(chunk[0], e)
+                    continue
+
+                def callback(request_id, response, exception, chunk=chunk):
+                    if exception is not None:
+                        fail(chunk[int(request_id)], exception)
+
+                batch = self.service.new_batch_http_request(callback=callback)
+                for index, message in enumerate(chunk):
+                    batch.add(self._send_request(message), request_id=str(index))
+                try:
+                    batch.execute()
+                except HttpError as e:
+                    print(f"Batch email request failed: {e}")
+                    for message in chunk:
+                        if message.send_error is None:
+                            fail(message, e)
+        finally:
+            if new_connection:
+                self.close()
+
+        sent = sum(1 for message in email_messages if message.send_error is None)
+        if errors and not sent and not self.fail_silently:
+            raise errors[0]
+        return sent
+
+    def _send_request(self, message):
+        raw = base64.urlsafe_b64encode(message.message().as_bytes()).decode()
+        return self.service.users().messages().send(userId='me', body={'raw': raw})
+
+
 def send_gmail(to, subject, message_text):
-    creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
-    service = build('gmail', 'v1', credentials=creds)
-    message = MIMEText(message_text)
-    message['to'] = to
-    message['subject'] = subject
-    raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-    body = {'raw': raw}
-    try:
-        service.users().messages().send(userId='me', body=body).execute()
-        print(f"Email sent to {to}")
-    except Exception as e:
-        print(f"Failed to send email: {e}")
+    """Send a single plain-text email through the Gmail API."""
+    GmailBackend().send_messages([EmailMessage(subject, message_text, to=[to])])
+    print(f"Email sent to {to}")
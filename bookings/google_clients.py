@@ -0,0 +1,187 @@
+"""
+Process-wide cache of Google API clients and OAuth credentials.
+
+Building a client parses the discovery document and opens new HTTP
+connections, so services are built once and reused. httplib2 connections
+are not thread-safe, so each thread gets its own client while the
+credentials are shared by the whole process. Token refreshes are serialized
+across processes (gunicorn workers, outbox workers) with a lock file next to
+token.json.
+
+Setting GOOGLE_API_ENDPOINT points every client at another server (such as
+the local fake in bookings/fake_google.py) without credentials.
+"""
+import datetime
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import httplib2
+from django.conf import settings
+from google.auth.credentials import AnonymousCredentials
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+TOKEN_PATH = os.path.join(os.path.dirname(__file__), 'token.json')
+TOKEN_LOCK_PATH = TOKEN_PATH + '.lock'
+
+# Refresh a little before Google considers the token expired
+REFRESH_MARGIN = datetime.timedelta(minutes=5)
+HTTP_TIMEOUT = 30
+
+_lock = threading.Lock()
+_local = threading.local()
+_credentials = None
+_anonymous = AnonymousCredentials()
+
+_stats = {
+    'client_hits': 0,
+    'client_misses': 0,
+    'credential_loads': 0,
+    'token_refreshes': 0,
+    'token_reloads': 0,
+}
+
+
+def client_stats():
+    """Return this process's cache counters."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset_clients():
+    """Drop cached credentials and this thread's clients (e.g. after re-authorizing)."""
+    global _credentials
+    with _lock:
+        _credentials = None
+    _local.services = {}
+
+
+def get_service(api, version):
+    """
+    Return a cached, authorized client for a Google API.
+
+    Args:
+        api: API name, e.g. 'calendar' or 'gmail'
+        version: API version, e.g. 'v3'
+
+    Returns:
+        googleapiclient Resource bound to this thread's HTTP connection
+    """
+    endpoint = settings.GOOGLE_API_ENDPOINT
+    credentials = _anonymous if endpoint else get_credentials()
+    services = getattr(_local, 'services', None)
+    if services is None:
+        services = _local.services = {}
+
+    # Clients are rebuilt when another thread swapped in refreshed credentials
+    cached = services.get((api, version))
+    with _lock:
+        if cached is not None and cached[0] is credentials:
+            _stats['client_hits'] += 1
+            return cached[1]
+        _stats['client_misses'] += 1
+
+    http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+    if endpoint:
+        service = _build_for_endpoint(api, version, endpoint, http)
+    else:
+        service = build(api, version, http=http, static_discovery=True, cache_discovery=False)
+    services[(api, version)] = (credentials, service)
+    return service
+
+
+def _build_for_endpoint(api, version, endpoint, http):
+    """
+    Build a client whose requests, batch requests included, go to ``endpoint``.
+
+    client_options' api_endpoint does not apply to batch requests, so the
+    root URL is replaced in the discovery document instead.
+    """
+    document = json.loads(get_static_doc(api, version))
+    document['rootUrl'] = endpoint.rstrip('/') + '/'
+    document.pop('mtlsRootUrl', None)
+    return build_from_document(document, http=http)
+
+
+def get_credentials():
+    """
+    Return valid credentials from token.json, refreshing them if needed.
+
+    Raises:
+        FileNotFoundError: if token.json has not been created yet
+            (run bookings/auth_helper.py once to create it)
+    """
+    global _credentials
+    with _lock:
+        if _credentials is None:
+            _credentials = _load_token()
+            _stats['credential_loads'] += 1
+        if not _needs_refresh(_credentials):
+            return _credentials
+
+        with _token_file_lock():
+            # Another worker may have refreshed the token while we waited
+            credentials = _load_token()
+            if _needs_refresh(credentials):
+                credentials.refresh(Request())
+                _write_token(credentials)
+                _stats['token_refreshes'] += 1
+            else:
+                _stats['token_reloads'] += 1
+        _credentials = credentials
+        return _credentials
+
+
+def _needs_refresh(credentials):
+    if not credentials.valid:
+        return True
+    if credentials.expiry is None:
+        return False
+    # google-auth stores expiry as naive UTC
+    return credentials.expiry - datetime.datetime.utcnow() < REFRESH_MARGIN
+
+
+def _load_token():
+    if not os.path.exists(TOKEN_PATH):
+        raise FileNotFoundError(
+            "token.json not found. Run bookings/auth_helper.py to authorize Google APIs."
+        )
+    return Credentials.from_authorized_user_file(TOKEN_PATH)
+
+
+def _write_token(credentials):
+    """Atomically replace token.json so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(TOKEN_PATH), suffix='.tmp')
+    with os.fdopen(fd, 'w') as tmp:
+        tmp.write(credentials.to_json())
+    os.replace(tmp_path, TOKEN_PATH)
+
+
+@contextmanager
+def _token_file_lock():
+    with open(TOKEN_LOCK_PATH, 'a+') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -2,14 +2,12 @@
 Google Meet Integration for MindBridge
 Handles Google Calendar API and Meet link generation
 """
-import os
 import datetime
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import hashlib
 from googleapiclient.errors import HttpError
 
+from .google_clients import get_service
+
 # If modifying these scopes, delete the token.json file
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
@@ -17,64 +15,50 @@ SCOPES = ['https://www.googleapis.com/auth/calendar']
 def get_calendar_service():
     """
     Get authenticated Google Calendar service.
-    Returns the Calendar API service object.
+    Returns the cached Calendar API service object.
     """
-    creds = None
-    token_path = os.path.join(os.path.dirname(__file__), 'token.json')
-    credentials_path = os.path.join(os.path.dirname(__file__), 'credentials.json')
-    
-    # The file token.json stores the user's access and refresh tokens
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-    
-    # If there are no (valid) credentials available, let the user log in
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            if not os.path.exists(credentials_path):
-                raise FileNotFoundError(
-                    "credentials.json not found. Please download it from Google Cloud Console."
-                )
-            flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
-            creds = flow.run_local_server(port=0)
-        
-        # Save the credentials for the next run
-        with open(token_path, 'w') as token:
-            token.write(creds.to_json())
-    
-    return build('calendar', 'v3', credentials=creds)
+    return get_service('calendar', 'v3')
+
 
+# Google recommends at most 50 calls per Calendar batch request
+BATCH_SIZE = 50
 
-def create_meet_event(booking):
+
+def meet_event_id(booking, key):
     """
-    Create a Google Calendar event with Google Meet link for a booking.
+    Deterministic Calendar event id for the Meet event of ``booking``
+    created by ``key`` (e.g. the outbox job id). Event ids use the base32hex
+    alphabet (0-9, a-v), which hex digits are part of.
+    """
+    return 'mb' + hashlib.sha1(f'{booking.pk}:{key}'.encode()).hexdigest()[:30]
+
+
+def build_event_body(booking, event_id=None):
+    """
+    Build the Calendar event resource (with a Meet conference request) for a booking.
     
     Args:
         booking: Booking model instance
+        event_id: optional id for the new event (see meet_event_id)
         
     Returns:
-        dict: Contains 'meet_link' and 'event_id'
+        dict: Calendar API event body
     """
-    try:
-        service = get_calendar_service()
-        
-        # Combine date and time
-        start_datetime = datetime.datetime.combine(booking.date, booking.time)
-        # Assume 1 hour session duration
-        end_datetime = start_datetime + datetime.timedelta(hours=1)
-        
-        # Format for RFC3339
-        start_time = start_datetime.isoformat()
-        end_time = end_datetime.isoformat()
-        
-        # Get student name
-        student_name = booking.student.get_full_name() or booking.student.username
-        
-        # Create event
-        event = {
-            'summary': f'MindBridge Counseling Session - {student_name}',
-            'description': f'''
+    # Combine date and time
+    start_datetime = datetime.datetime.combine(booking.date, booking.time)
+    # Assume 1 hour session duration
+    end_datetime = start_datetime + datetime.timedelta(hours=1)
+    
+    # Format for RFC3339
+    start_time = start_datetime.isoformat()
+    end_time = end_datetime.isoformat()
+    
+    # Get student name
+    student_name = booking.student.get_full_name() or booking.student.username
+    
+    body = {
+        'summary': f'MindBridge Counseling Session - {student_name}',
+        'description': f'''
 MindBridge Counseling Session
 
 Student: {student_name}
@@ -85,52 +69,98 @@ Reason: {booking.reason}
 
 Additional Notes:
 {booking.additional_notes or 'None'}
-            '''.strip(),
-            'start': {
-                'dateTime': start_time,
-                'timeZone': 'Africa/Kigali',  # Adjust to your timezone
-            },
-            'end': {
-                'dateTime': end_time,
-                'timeZone': 'Africa/Kigali',
-            },
-            'attendees': [
-                {'email': booking.email or booking.student.email},
-            ],
-            'conferenceData': {
-                'createRequest': {
-                    'requestId': f'mindbridge-{booking.id}',
-                    'conferenceSolutionKey': {
-                        'type': 'hangoutsMeet'
-                    }
+        '''.strip(),
+        'start': {
+            'dateTime': start_time,
+            'timeZone': 'Africa/Kigali',  # Adjust to your timezone
+        },
+        'end': {
+            'dateTime': end_time,
+            'timeZone': 'Africa/Kigali',
+        },
+        'attendees': [
+            {'email': booking.email or booking.student.email},
+        ],
+        'conferenceData': {
+            'createRequest': {
+                'requestId': event_id or f'mindbridge-{booking.id}',
+                'conferenceSolutionKey': {
+                    'type': 'hangoutsMeet'
                 }
-            },
-            'reminders': {
-                'useDefault': False,
-                'overrides': [
-                    {'method': 'email', 'minutes': 24 * 60},  # 1 day before
-                    {'method': 'popup', 'minutes': 30},  # 30 minutes before
-                ],
-            },
-        }
-        
-        # Create the event
-        event = service.events().insert(
-            calendarId='primary',
-            body=event,
-            conferenceDataVersion=1,
-            sendUpdates='all'  # Send email notifications
-        ).execute()
-        
-        # Extract Meet link
-        meet_link = event.get('hangoutLink', '')
-        event_id = event.get('id', '')
+            }
+        },
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'email', 'minutes': 24 * 60},  # 1 day before
+                {'method': 'popup', 'minutes': 30},  # 30 minutes before
+            ],
+        },
+    }
+    if event_id:
+        body['id'] = event_id
+    return body
+
+
+def _meet_data(event):
+    """Extract the fields we store from an inserted Calendar event."""
+    return {
+        'meet_link': event.get('hangoutLink', ''),
+        'event_id': event.get('id', ''),
+        'html_link': event.get('htmlLink', '')
+    }
+
+
+def _insert_request(service, booking, event_id=None):
+    return service.events().insert(
+        calendarId='primary',
+        body=build_event_body(booking, event_id),
+        conferenceDataVersion=1,
+        sendUpdates='all'  # Send email notifications
+    )
+
+
+def _get_event(service, event_id):
+    """The event with this id, or None if it does not exist."""
+    try:
+        return service.events().get(calendarId='primary', eventId=event_id).execute()
+    except HttpError as error:
+        if error.resp.status in (404, 410):
+            return None
+        raise
+
+
+def create_meet_event(booking, event_id=None):
+    """
+    Create a Google Calendar event with Google Meet link for a booking.
+    
+    With ``event_id`` the call is idempotent: an event already created with
+    that id (by an earlier attempt that crashed before its result was
+    saved) is returned instead of inserting a second one.
+    
+    Args:
+        booking: Booking model instance
+        event_id: optional deterministic id (see meet_event_id)
         
-        return {
-            'meet_link': meet_link,
-            'event_id': event_id,
-            'html_link': event.get('htmlLink', '')
-        }
+    Returns:
+        dict: Contains 'meet_link' and 'event_id'
+    """
+    try:
+        service = get_calendar_service()
+        if event_id:
+            event = _get_event(service, event_id)
+            if event is not None:
+                return _meet_data(event)
+        try:
+            event = _insert_request(service, booking, event_id).execute()
+        except HttpError as error:
+            # 409: created concurrently since the lookup
+            if not event_id or error.resp.status != 409:
+                raise
+            event = _get_event(service, event_id)
+            if event is None:
+                raise
+        return _meet_data(event)
         
     except HttpError as error:
         print(f'An error occurred: {error}')
@@ -140,6 +170,48 @@ Additional Notes:
         return None
 
 
+def create_meet_events(bookings):
+    """
+    Create Calendar events with Meet links for many bookings, sending the
+    inserts as batch HTTP requests of up to BATCH_SIZE calls each.
+    
+    Args:
+        bookings: iterable of Booking instances (with student loaded)
+        
+    Returns:
+        dict: booking id -> meet data dict (as create_meet_event) on success,
+        or {'error': message} on failure
+    """
+    bookings = list(bookings)
+    try:
+        service = get_calendar_service()
+    except FileNotFoundError as e:
+        print(f'Setup error: {e}')
+        return {booking.id: {'error': str(e)} for booking in bookings}
+    
+    results = {}
+    
+    def callback(request_id, response, exception):
+        if exception is not None:
+            results[int(request_id)] = {'error': str(exception)}
+        else:
+            results[int(request_id)] = _meet_data(response)
+    
+    for start in range(0, len(bookings), BATCH_SIZE):
+        chunk = bookings[start:start + BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=callback)
+        for booking in chunk:
+            batch.add(_insert_request(service, booking), request_id=str(booking.id))
+        try:
+            batch.execute()
+        except HttpError as error:
+            print(f'Batch request failed: {error}')
+            for booking in chunk:
+                results.setdefault(booking.id, {'error': str(error)})
+    
+    return results
+
+
 def update_meet_event(booking):
     """
     Update an existing Google Calendar event.
@@ -207,5 +279,8 @@ def delete_meet_event(calendar_event_id):
         return True
         
     except HttpError as error:
+        if error.resp.status in (404, 410):
+            # Already deleted
+            return True
         print(f'An error occurred: {error}')
         return False
@@ -0,0 +1,126 @@
+"""
+Idempotency-Key support for unsafe API actions.
+
+A client that may retry a request (timeouts, double clicks, flaky mobile
+networks) sends a unique ``Idempotency-Key`` header. The first request with
+a key runs normally and its response is stored; a retry with the same key
+and the same body gets the stored response back (with an
+``Idempotent-Replayed: true`` header) without running the action again.
+
+    @idempotent
+    def approve(self, request, pk=None):
+        ...
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+# A key whose request has not finished after this long is treated as
+# abandoned (crashed worker) and may be used again
+IN_PROGRESS_TIMEOUT = timedelta(minutes=5)
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method}\n{request.path}\n{body}".encode()).hexdigest()
+
+
+def _claim(request, key, fingerprint):
+    """Insert the key, or return (existing record, False) if it is already taken."""
+    defaults = {'method': request.method, 'path': request.path[:255], 'request_hash': fingerprint}
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(user=request.user, key=key, **defaults), True
+    except IntegrityError:
+        pass
+
+    record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+    if record is None:
+        # Purged in the meantime
+        return _claim(request, key, fingerprint)
+    now = timezone.now()
+    expired = record.created_at < now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    abandoned = record.response_status is None and record.created_at < now - IN_PROGRESS_TIMEOUT
+    if expired or abandoned:
+        # Take the key over only if nobody else did first
+        taken = IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at).update(
+            created_at=now, response_status=None, response_body=None, **defaults
+        )
+        if taken:
+            record.refresh_from_db()
+            return record, True
+        record.refresh_from_db()
+    return record, False
+
+
+def _replay(record, fingerprint):
+    if record.request_hash != fingerprint:
+        return Response(
+            {'error': f'{HEADER} was already used for a different request'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if record.response_status is None:
+        return Response(
+            {'error': f'A request with this {HEADER} is still in progress'},
+            status=status.HTTP_409_CONFLICT
+        )
+    return Response(record.response_body, status=record.response_status, headers={'Idempotent-Replayed': 'true'})
+
+
+def idempotent(view_method):
+    """
+    Make a ViewSet action replay its stored response for a repeated
+    Idempotency-Key. Requests without the header, or from anonymous users,
+    are not affected.
+
+    Responses are stored unless the action raised or returned a 5xx, so
+    those can be retried with the same key.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = _fingerprint(request)
+        record, claimed = _claim(request, key, fingerprint)
+        if not claimed:
+            return _replay(record, fingerprint)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                response_status=response.status_code, response_body=response.data
+            )
+        return response
+
+    return wrapper
+
+
+def purge_expired():
+    """Delete stored responses older than IDEMPOTENCY_KEY_TTL_HOURS; return the count."""
+    cutoff = timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,48 @@
+"""
+Move old completed and cancelled bookings to bookings_archive.
+
+    python manage.py archive_bookings --days 365 --batch-size 500
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bookings.archive import archivable, archive_batch
+
+
+class Command(BaseCommand):
+    help = "Move completed and cancelled bookings past the retention horizon to the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.BOOKING_ARCHIVE_AFTER_DAYS,
+                            help="Archive bookings whose session is older than this many days")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Bookings moved per transaction")
+        parser.add_argument('--sleep', type=float, default=0.1,
+                            help="Seconds to pause between batches")
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Stop after moving about this many bookings")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only count the bookings that would be archived")
+
+    def handle(self, *args, **options):
+        candidates = archivable(options['days'])
+        if options['dry_run']:
+            self.stdout.write(f"{candidates.count()} booking(s) would be archived")
+            return
+
+        moved = 0
+        started = time.perf_counter()
+        while options['limit'] is None or moved < options['limit']:
+            count = archive_batch(candidates, options['batch_size'])
+            if not count:
+                break
+            moved += count
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"Moved {moved} booking(s), {moved / elapsed:.0f} rows/s")
+            time.sleep(options['sleep'])
+
+        elapsed = time.perf_counter() - started
+        rate = moved / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} booking(s) in {elapsed:.1f}s ({rate:.0f} rows/s)"))
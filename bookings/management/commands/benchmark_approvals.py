@@ -0,0 +1,204 @@
+"""
+Load test of the booking approval path against the fake Google server.
+
+    python manage.py fake_google --latency-ms 150 &
+    GOOGLE_API_ENDPOINT=http://127.0.0.1:8765/ python manage.py benchmark_approvals --count 500 --concurrency 16
+
+In outbox mode each approval is timed end to end: status change, Meet
+creation and approval email, i.e. what the outbox worker does for one
+approval. In bulk mode each batch goes through bulk_approve. The report
+counts the bookings that actually ended up approved and lists why the
+others were not. The bookings created for the run are deleted afterwards
+unless --keep is given.
+"""
+import datetime
+import math
+import queue
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import F
+
+from bookings.approvals import approve_booking, bulk_approve
+from bookings.models import Booking, OutboxJob
+from bookings.outbox import run_job
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent booking approvals against a fake Google API server."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200,
+                            help="Number of bookings to approve")
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help="Number of approving threads")
+        parser.add_argument('--mode', choices=('outbox', 'bulk'), default='outbox',
+                            help="Approve one by one through the outbox, or in batches with bulk_approve")
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help="Bookings per bulk_approve call (bulk mode)")
+        parser.add_argument('--keep', action='store_true',
+                            help="Keep the benchmark bookings instead of deleting them")
+
+    def handle(self, *args, **options):
+        if not settings.GOOGLE_API_ENDPOINT:
+            raise CommandError(
+                "GOOGLE_API_ENDPOINT is not set; refusing to create real Google Calendar events. "
+                "Start python manage.py fake_google and point GOOGLE_API_ENDPOINT at it."
+            )
+        if settings.EMAIL_BACKEND == 'django.core.mail.backends.smtp.EmailBackend':
+            raise CommandError("EMAIL_BACKEND is SMTP; use the Gmail backend so emails go to the fake server.")
+
+        count = options['count']
+        concurrency = options['concurrency']
+        ids = self._create_bookings(count)
+        # booking id -> error reported by bulk_approve
+        self.batch_errors = {}
+        try:
+            if options['mode'] == 'outbox':
+                items = ids
+                func = self._approve_one
+                unit = "approval"
+            else:
+                size = options['batch_size']
+                items = [ids[start:start + size] for start in range(0, len(ids), size)]
+                func = self._approve_batch
+                unit = f"batch of up to {size}"
+            timings, elapsed = self._run(func, items, concurrency)
+            approved, reasons = self._outcome(ids, options['mode'])
+        finally:
+            if not options['keep']:
+                Booking.objects.filter(pk__in=ids).delete()
+
+        self._report(timings, elapsed, count, approved, reasons, concurrency, options['mode'], unit)
+
+    def _create_bookings(self, count):
+        student, _ = get_user_model().objects.get_or_create(
+            username='benchmark_student',
+            defaults={'email': 'benchmark_student@example.com', 'first_name': 'Benchmark'},
+        )
+        # Far in the future so the run does not touch real schedules
+        first_day = datetime.date.today() + datetime.timedelta(days=3650)
+        tag = f"benchmark {uuid.uuid4().hex}"
+        Booking.objects.bulk_create([
+            Booking(
+                student=student,
+                email=student.email,
+                date=first_day + datetime.timedelta(days=i // 10),
+                time=datetime.time(8 + i % 10),
+                reason=tag,
+            )
+            for i in range(count)
+        ], batch_size=500)
+        return list(Booking.objects.filter(reason=tag).order_by('id').values_list('id', flat=True))
+
+    def _run(self, func, items, concurrency):
+        """Run func over items from `concurrency` threads; return ([(seconds, ok)], elapsed)."""
+        work = queue.SimpleQueue()
+        for item in items:
+            work.put(item)
+        timings = []
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        item = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        ok = func(item)
+                    except Exception as e:
+                        print(f"Benchmark approval failed: {e}")
+                        ok = False
+                    timings.append((time.perf_counter() - started, ok))
+            finally:
+                # Each thread has its own DB connection
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, time.perf_counter() - started
+
+    def _approve_one(self, booking_id):
+        booking = Booking.objects.select_related('student').get(pk=booking_id)
+        job = approve_booking(booking)
+        ok = self._run_job(job)
+        for child in job.children.select_related('booking__student'):
+            ok = self._run_job(child) and ok
+        return ok
+
+    def _run_job(self, job):
+        # Claim the job as the outbox worker would, so it is not picked up twice
+        OutboxJob.objects.filter(pk=job.pk).update(status='running', attempts=F('attempts') + 1)
+        job.attempts += 1
+        return run_job(job)
+
+    def _approve_batch(self, booking_ids):
+        report = bulk_approve(Booking.objects.select_related('student').filter(pk__in=booking_ids))
+        for entry in report:
+            if not entry['ok']:
+                self.batch_errors[entry['id']] = entry['error']
+        return all(entry['ok'] for entry in report)
+
+    def _outcome(self, ids, mode):
+        """
+        Returns:
+            (number of bookings approved with a Meet link, Counter of the
+            reasons the others were not)
+        """
+        bookings = Booking.objects.filter(pk__in=ids)
+        approved = bookings.filter(status='approved', meet_link__isnull=False).exclude(meet_link='')
+        if mode == 'outbox':
+            # Every job was run once, so any job not succeeded has failed
+            approved = approved.exclude(jobs__status__in=('pending', 'running', 'failed'))
+        approved_ids = set(approved.values_list('id', flat=True))
+
+        job_errors = dict(
+            OutboxJob.objects.filter(booking_id__in=ids).exclude(status='succeeded').exclude(last_error='')
+            .values_list('booking_id', 'last_error')
+        )
+        reasons = Counter()
+        for booking_id, status in bookings.exclude(pk__in=approved_ids).values_list('id', 'status'):
+            error = job_errors.get(booking_id) or self.batch_errors.get(booking_id)
+            reasons[error.splitlines()[0] if error else f"booking is {status}"] += 1
+        return len(approved_ids), reasons
+
+    def _report(self, timings, elapsed, count, approved, reasons, concurrency, mode, unit):
+        latencies = sorted(seconds for seconds, _ in timings)
+        failures = sum(1 for _, ok in timings if not ok)
+        self.stdout.write(
+            f"Approved {approved} of {count} booking(s) in {elapsed:.2f}s "
+            f"with {concurrency} thread(s) ({mode} mode)"
+        )
+        self.stdout.write(f"Throughput: {approved / elapsed:.1f} approvals/s")
+        if latencies:
+            self.stdout.write(
+                f"Latency per {unit}: "
+                f"p50 {percentile(latencies, 50) * 1000:.0f}ms, "
+                f"p95 {percentile(latencies, 95) * 1000:.0f}ms, "
+                f"p99 {percentile(latencies, 99) * 1000:.0f}ms, "
+                f"max {latencies[-1] * 1000:.0f}ms"
+            )
+        style = self.style.ERROR if failures else self.style.SUCCESS
+        self.stdout.write(style(f"Failures: {failures} of {len(timings)}"))
+        if reasons:
+            self.stdout.write(self.style.ERROR(f"Not approved: {count - approved} booking(s)"))
+            for reason, times in reasons.most_common():
+                self.stdout.write(f"  {times} x {reason}")
@@ -0,0 +1,45 @@
+"""
+Local fake of the Google Calendar and Gmail APIs for load tests.
+
+    python manage.py fake_google --port 8765 --latency-ms 150 --error-rate 0.02
+
+Then run the app or benchmark with GOOGLE_API_ENDPOINT=http://127.0.0.1:8765/
+"""
+from django.core.management.base import BaseCommand
+
+from bookings.fake_google import FakeGoogleServer
+
+
+class Command(BaseCommand):
+    help = "Serve a local fake of the Google Calendar and Gmail APIs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency-ms', type=float, default=0,
+                            help="Latency added to every HTTP request")
+        parser.add_argument('--jitter-ms', type=float, default=0,
+                            help="Random variation of the latency (+/-)")
+        parser.add_argument('--error-rate', type=float, default=0,
+                            help="Fraction of API calls answered with 429/500/503 (0-1)")
+        parser.add_argument('--seed', type=int, default=None,
+                            help="Random seed for repeatable runs")
+
+    def handle(self, *args, **options):
+        server = FakeGoogleServer(
+            (options['host'], options['port']),
+            latency=options['latency_ms'] / 1000,
+            jitter=options['jitter_ms'] / 1000,
+            error_rate=options['error_rate'],
+            seed=options['seed'],
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(f"Fake Google API listening on http://{host}:{port}/")
+        self.stdout.write(f"Set GOOGLE_API_ENDPOINT=http://{host}:{port}/ to use it")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Stopped. {server.stats}")
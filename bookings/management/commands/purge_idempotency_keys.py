@@ -0,0 +1,16 @@
+"""
+Delete stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL_HOURS.
+
+    python manage.py purge_idempotency_keys
+"""
+from django.core.management.base import BaseCommand
+
+from bookings.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete expired Idempotency-Key responses."
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(f"Deleted {deleted} expired idempotency key(s)")
@@ -0,0 +1,60 @@
+"""
+Outbox worker: executes queued booking side effects (Meet creation, emails).
+
+    python manage.py run_outbox --workers 4
+"""
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from bookings.outbox import claim_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Run queued booking side effects with retries and backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.OUTBOX_WORKERS,
+                            help="Number of jobs run concurrently")
+        parser.add_argument('--poll-interval', type=float, default=settings.OUTBOX_POLL_INTERVAL,
+                            help="Seconds to sleep when no job is due")
+        parser.add_argument('--once', action='store_true',
+                            help="Run the currently due jobs and exit")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write(f"Outbox worker {worker_id} started with {workers} worker thread(s)")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while not self.stopping:
+                close_old_connections()
+                jobs = claim_jobs(workers * 2, worker_id)
+                if jobs:
+                    results = list(pool.map(self._run, jobs))
+                    self.stdout.write(f"Ran {len(results)} job(s), {results.count(False)} failed")
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['poll_interval'])
+        self.stdout.write("Outbox worker stopped")
+
+    def _run(self, job):
+        try:
+            return run_job(job)
+        finally:
+            # Each pool thread has its own DB connection
+            connection.close()
+
+    def _stop(self, signum, frame):
+        self.stdout.write("Stopping after the current batch...")
+        self.stopping = True
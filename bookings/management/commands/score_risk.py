@@ -0,0 +1,83 @@
+"""
+Score new posts and booking reasons for crisis language.
+
+Cron-safe single pass:
+    python manage.py score_risk --workers 4
+Long-running loop:
+    python manage.py score_risk --loop --interval 60
+Re-score everything after changing RISK_MODEL_PATH:
+    python manage.py score_risk --rescore
+"""
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from bookings.models import Booking
+from mindbridge_app import risk
+from posts.models import Post
+
+# (model, text fields scored together)
+SCORED = (
+    (Post, ('content',)),
+    (Booking, ('reason', 'additional_notes')),
+)
+
+
+class Command(BaseCommand):
+    help = "Score unscored posts and bookings for crisis language on a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.RISK_SCORING_WORKERS,
+                            help="Scoring processes; 0 scores in this process")
+        parser.add_argument('--batch-size', type=int, default=settings.RISK_SCORING_BATCH_SIZE,
+                            help="Rows read, scored and written per batch")
+        parser.add_argument('--rescore', action='store_true',
+                            help="Score every row again, not only new or edited ones")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running, one pass every --interval seconds")
+        parser.add_argument('--interval', type=int, default=60,
+                            help="Seconds between passes in --loop mode")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        pool = None
+        if workers > 0:
+            # Children must not share the parent's database connections
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            while True:
+                for model, fields in SCORED:
+                    self.score(pool, workers, model, fields, options)
+                if not options['loop']:
+                    break
+                options['rescore'] = False
+                time.sleep(options['interval'])
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def score(self, pool, workers, model, fields, options):
+        started = time.perf_counter()
+        scored = 0
+        batches = risk.unscored_batches(model.objects.all(), fields, options['batch_size'], options['rescore'])
+        if pool is None:
+            for rows in batches:
+                scored += risk.save_scores(model, risk.score_batch(rows))
+        else:
+            # Keep every worker busy while the results of earlier batches are written
+            pending = deque()
+            for rows in batches:
+                pending.append(pool.submit(risk.score_batch, rows))
+                if len(pending) >= workers * 2:
+                    scored += risk.save_scores(model, pending.popleft().result())
+            while pending:
+                scored += risk.save_scores(model, pending.popleft().result())
+
+        elapsed = time.perf_counter() - started
+        rate = scored / elapsed if elapsed else 0
+        self.stdout.write(f"Scored {scored} {model._meta.verbose_name_plural.lower()} in {elapsed:.1f}s ({rate:.0f}/s)")
@@ -0,0 +1,92 @@
+"""
+Reminder scheduler for approved counseling sessions and event registrations.
+
+Cron-safe single pass:
+    python manage.py send_reminders --hours 24
+Long-running loop:
+    python manage.py send_reminders --loop --interval 300
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from bookings.models import Booking
+from events.models import Event, EventRegistration
+from mindbridge_app.notifications import render_notification
+from mindbridge_app.reminders import claim_unsent, datetime_window_q, send_claimed
+
+
+class Command(BaseCommand):
+    help = "Email reminders for sessions and events starting within the next N hours."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.REMINDER_LEAD_HOURS,
+                            help="Remind about anything starting within this many hours")
+        parser.add_argument('--batch-size', type=int, default=settings.REMINDER_BATCH_SIZE,
+                            help="Rows claimed and emailed per batch")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running, one pass every --interval seconds")
+        parser.add_argument('--interval', type=int, default=300,
+                            help="Seconds between passes in --loop mode")
+
+    def handle(self, *args, **options):
+        while True:
+            if not options['loop']:
+                self.run_pass(options)
+                break
+            close_old_connections()
+            try:
+                self.run_pass(options)
+            except Exception as e:
+                # e.g. the database went away; try again next pass
+                self.stderr.write(f"Reminder pass failed: {e}")
+            time.sleep(options['interval'])
+
+    def run_pass(self, options):
+        start = timezone.localtime()
+        end = start + timedelta(hours=options['hours'])
+        bookings = self.remind_bookings(start, end, options['batch_size'])
+        registrations = self.remind_events(start, end, options['batch_size'])
+        self.stdout.write(f"Sent {bookings} session and {registrations} event reminder(s)")
+
+    def remind_bookings(self, start, end, batch_size):
+        due = Booking.objects.filter(
+            datetime_window_q(start, end),
+            status='approved',
+            reminder_sent_at__isnull=True,
+        ).order_by('date', 'time', 'id')
+
+        sent = 0
+        for ids in claim_unsent(due, batch_size):
+            bookings = Booking.objects.filter(pk__in=ids).select_related('student')
+            sent += send_claimed(bookings, lambda booking: render_notification(
+                'bookings/emails/booking_reminder',
+                {'booking': booking, 'student_name': booking.student.first_name or booking.full_name or booking.student.username},
+                [booking.student.email or booking.email],
+            ))
+        return sent
+
+    def remind_events(self, start, end, batch_size):
+        event_ids = list(
+            Event.objects.filter(datetime_window_q(start, end), is_active=True).values_list('id', flat=True)
+        )
+        if not event_ids:
+            return 0
+        due = EventRegistration.objects.filter(
+            event_id__in=event_ids,
+            reminder_sent_at__isnull=True,
+        ).order_by('event_id', 'id')
+
+        sent = 0
+        for ids in claim_unsent(due, batch_size):
+            registrations = EventRegistration.objects.filter(pk__in=ids).select_related('event', 'student')
+            sent += send_claimed(registrations, lambda registration: render_notification(
+                'events/emails/event_reminder',
+                {'event': registration.event, 'student_name': registration.student.first_name or registration.student.username},
+                [registration.student.email],
+            ))
+        return sent
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='meeting_id',
+            field=models.CharField(blank=True, help_text='Zoom meeting ID', max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='calendar_event_id',
+            field=models.CharField(blank=True, help_text='Google Calendar event ID (legacy)', max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='meet_link',
+            field=models.URLField(blank=True, help_text='Video call link (Zoom/Google Meet)', null=True),
+        ),
+        migrations.CreateModel(
+            name='OutboxJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('create_meet', 'Create Google Meet event'), ('send_approval_email', 'Send approval email')], max_length=50)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=5)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the job may run')),
+                ('locked_by', models.CharField(blank=True, help_text='Worker currently running the job', max_length=100)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('booking', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='bookings.booking')),
+                ('parent', models.ForeignKey(blank=True, help_text='Job that enqueued this one', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='bookings.outboxjob')),
+            ],
+            options={
+                'verbose_name': 'Outbox Job',
+                'verbose_name_plural': 'Outbox Jobs',
+                'db_table': 'booking_outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='booking_outbox_due_idx')],
+            },
+        ),
+    ]
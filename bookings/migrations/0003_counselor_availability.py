@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('bookings', '0002_outboxjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlackoutDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=200)),
+            ],
+            options={
+                'verbose_name': 'Blackout Date',
+                'verbose_name_plural': 'Blackout Dates',
+                'db_table': 'booking_blackout_dates',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CounselorAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('session_type', models.CharField(blank=True, choices=[('individual', 'Individual Counseling'), ('group', 'Group Therapy'), ('crisis', 'Crisis Support'), ('consultation', 'General Consultation')], help_text='Leave blank to accept every session type', max_length=20)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Counselor Availability',
+                'verbose_name_plural': 'Counselor Availability',
+                'db_table': 'counselor_availability',
+                'ordering': ['weekday', 'start_time'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['date', 'time', 'status'], name='bookings_slot_idx'),
+        ),
+        migrations.AddField(
+            model_name='counseloravailability',
+            name='counselor',
+            field=models.ForeignKey(limit_choices_to={'role': 'wellness_team'}, on_delete=django.db.models.deletion.CASCADE, related_name='availability', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='blackoutdate',
+            name='counselor',
+            field=models.ForeignKey(blank=True, help_text='Leave blank to block the whole team', limit_choices_to={'role': 'wellness_team'}, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='blackout_dates', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='blackoutdate',
+            index=models.Index(fields=['date'], name='blackout_date_idx'),
+        ),
+    ]
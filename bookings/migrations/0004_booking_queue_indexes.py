@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_counselor_availability'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'date', 'time', 'id'], name='bookings_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'session_type', 'date', 'time', 'id'], name='bookings_queue_type_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('bookings', '0006_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('full_name', models.CharField(blank=True, max_length=200)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('phone_number', models.CharField(blank=True, max_length=20)),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+                ('session_type', models.CharField(choices=[('individual', 'Individual Counseling'), ('group', 'Group Therapy'), ('crisis', 'Crisis Support'), ('consultation', 'General Consultation')], max_length=20)),
+                ('reason', models.TextField()),
+                ('additional_notes', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('meet_link', models.URLField(blank=True, null=True)),
+                ('meeting_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('calendar_event_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('reminder_sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Booking',
+                'verbose_name_plural': 'Archived Bookings',
+                'db_table': 'bookings_archive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['student', 'date'], name='bookings_archive_student_idx'), models.Index(fields=['date'], name='bookings_archive_date_idx')],
+            },
+        ),
+    ]
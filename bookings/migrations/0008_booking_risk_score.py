@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_booking_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='risk_reasons',
+            field=models.JSONField(blank=True, default=list, help_text='Reason codes of matched crisis phrases'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='risk_score',
+            field=models.FloatField(default=0.0, help_text='Crisis-language risk from 0 to 1'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='risk_scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bookingarchive',
+            name='risk_reasons',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='bookingarchive',
+            name='risk_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='bookingarchive',
+            name='risk_scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', '-risk_score', 'date', 'time', 'id'], name='bookings_risk_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['risk_scored_at', 'id'], name='bookings_unscored_idx'),
+        ),
+    ]
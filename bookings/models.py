@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 
 
 class Booking(models.Model):
@@ -40,6 +42,12 @@ class Booking(models.Model):
     meet_link = models.URLField(blank=True, null=True, help_text="Video call link (Zoom/Google Meet)")
     meeting_id = models.CharField(max_length=255, blank=True, null=True, help_text="Zoom meeting ID")
     calendar_event_id = models.CharField(max_length=255, blank=True, null=True, help_text="Google Calendar event ID (legacy)")
+    reminder_sent_at = models.DateTimeField(blank=True, null=True, help_text="When the session reminder was sent")
+    # Crisis-language risk (python manage.py score_risk); risk_scored_at is
+    # cleared when the text changes so the row is scored again
+    risk_score = models.FloatField(default=0.0, help_text="Crisis-language risk from 0 to 1")
+    risk_reasons = models.JSONField(default=list, blank=True, help_text="Reason codes of matched crisis phrases")
+    risk_scored_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -48,6 +56,18 @@ class Booking(models.Model):
         verbose_name = 'Booking'
         verbose_name_plural = 'Bookings'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['date', 'time', 'status'], name='bookings_slot_idx'),
+            # Wellness team triage queue (see BookingViewSet.queue)
+            models.Index(fields=['status', 'date', 'time', 'id'], name='bookings_queue_idx'),
+            models.Index(fields=['status', 'session_type', 'date', 'time', 'id'], name='bookings_queue_type_idx'),
+            # Triage queue sorted by risk (?sort=risk)
+            models.Index(fields=['status', '-risk_score', 'date', 'time', 'id'], name='bookings_risk_queue_idx'),
+            # Bookings waiting to be scored (score_risk)
+            models.Index(fields=['risk_scored_at', 'id'], name='bookings_unscored_idx'),
+            # Unsent reminders for upcoming sessions (send_reminders)
+            models.Index(fields=['status', 'reminder_sent_at', 'date', 'time'], name='bookings_reminder_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.date} at {self.time} ({self.status})"
@@ -55,3 +75,218 @@ class Booking(models.Model):
     def can_cancel(self):
         """Check if booking can be cancelled by student."""
         return self.status in ['pending', 'approved']
+
+
+class BookingArchive(models.Model):
+    """
+    Cold copy of old completed and cancelled bookings, moved out of the
+    bookings table by ``python manage.py archive_bookings``. Rows keep their
+    original booking id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_bookings'
+    )
+    full_name = models.CharField(max_length=200, blank=True)
+    email = models.EmailField(blank=True)
+    phone_number = models.CharField(max_length=20, blank=True)
+    date = models.DateField()
+    time = models.TimeField()
+    session_type = models.CharField(max_length=20, choices=Booking.SESSION_TYPE_CHOICES)
+    reason = models.TextField()
+    additional_notes = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES)
+    notes = models.TextField(blank=True, null=True)
+    meet_link = models.URLField(blank=True, null=True)
+    meeting_id = models.CharField(max_length=255, blank=True, null=True)
+    calendar_event_id = models.CharField(max_length=255, blank=True, null=True)
+    reminder_sent_at = models.DateTimeField(blank=True, null=True)
+    risk_score = models.FloatField(default=0.0)
+    risk_reasons = models.JSONField(default=list, blank=True)
+    risk_scored_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'bookings_archive'
+        verbose_name = 'Archived Booking'
+        verbose_name_plural = 'Archived Bookings'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['student', 'date'], name='bookings_archive_student_idx'),
+            models.Index(fields=['date'], name='bookings_archive_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} - {self.date} at {self.time} ({self.status}, archived)"
+
+
+class CounselorAvailability(models.Model):
+    """
+    Weekly working hours of a wellness team counselor.
+    Each counselor can take one session at a time within these hours.
+    """
+    WEEKDAY_CHOICES = (
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    )
+    
+    counselor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='availability',
+        limit_choices_to={'role': 'wellness_team'}
+    )
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    session_type = models.CharField(
+        max_length=20,
+        choices=Booking.SESSION_TYPE_CHOICES,
+        blank=True,
+        help_text="Leave blank to accept every session type"
+    )
+    is_active = models.BooleanField(default=True)
+    
+    class Meta:
+        db_table = 'counselor_availability'
+        verbose_name = 'Counselor Availability'
+        verbose_name_plural = 'Counselor Availability'
+        ordering = ['weekday', 'start_time']
+    
+    def __str__(self):
+        return f"{self.counselor.username} - {self.get_weekday_display()} {self.start_time}-{self.end_time}"
+
+
+class BlackoutDate(models.Model):
+    """
+    Day on which a counselor, or the whole wellness team, takes no sessions.
+    """
+    date = models.DateField()
+    counselor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='blackout_dates',
+        limit_choices_to={'role': 'wellness_team'},
+        help_text="Leave blank to block the whole team"
+    )
+    reason = models.CharField(max_length=200, blank=True)
+    
+    class Meta:
+        db_table = 'booking_blackout_dates'
+        verbose_name = 'Blackout Date'
+        verbose_name_plural = 'Blackout Dates'
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['date'], name='blackout_date_idx'),
+        ]
+    
+    def __str__(self):
+        who = self.counselor.username if self.counselor else 'Whole team'
+        return f"{who} - {self.date}"
+
+
+class OutboxJob(models.Model):
+    """
+    Side effect of a booking change (Meet creation, emails, ...) that is
+    recorded in the same transaction as the change and executed later by
+    the outbox worker (``python manage.py run_outbox``).
+    """
+    CREATE_MEET = 'create_meet'
+    SEND_APPROVAL_EMAIL = 'send_approval_email'
+    DELETE_MEET = 'delete_meet'
+
+    KIND_CHOICES = (
+        (CREATE_MEET, 'Create Google Meet event'),
+        (SEND_APPROVAL_EMAIL, 'Send approval email'),
+        (DELETE_MEET, 'Delete Google Meet event'),
+    )
+
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='children',
+        help_text="Job that enqueued this one"
+    )
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run")
+    locked_by = models.CharField(max_length=100, blank=True, help_text="Worker currently running the job")
+    locked_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'booking_outbox'
+        verbose_name = 'Outbox Job'
+        verbose_name_plural = 'Outbox Jobs'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='booking_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Response stored for a client-supplied Idempotency-Key, so a retried
+    request is answered from here instead of being executed again.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64, help_text="SHA-256 of the method, path and body")
+    response_status = models.PositiveSmallIntegerField(blank=True, null=True, help_text="Empty while the request is running")
+    response_body = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_key_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.key})"
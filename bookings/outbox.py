@@ -0,0 +1,189 @@
+"""
+Durable outbox for booking side effects.
+
+Jobs are inserted in the same transaction as the booking change that caused
+them and executed later by ``python manage.py run_outbox``, so API requests
+never wait on Google Calendar or Gmail round trips.
+"""
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from mindbridge_app.notifications import send_notification
+
+from .models import Booking, OutboxJob
+
+# kind -> callable(job), filled in by the @handler decorator below
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register a function as the runner for jobs of the given kind."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, booking=None, payload=None, parent=None):
+    """
+    Record a job. Call this inside the transaction that changes the booking
+    so the job only exists if the change is committed.
+    """
+    return OutboxJob.objects.create(
+        kind=kind,
+        booking=booking,
+        parent=parent,
+        payload=payload or {},
+        max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def enqueue_many(kind, bookings):
+    """Record one job of the given kind per booking with a single INSERT."""
+    return OutboxJob.objects.bulk_create([
+        OutboxJob(kind=kind, booking=booking, max_attempts=settings.OUTBOX_MAX_ATTEMPTS)
+        for booking in bookings
+    ])
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter, capped at OUTBOX_MAX_BACKOFF_SECONDS."""
+    delay = settings.OUTBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    delay = min(delay, settings.OUTBOX_MAX_BACKOFF_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_jobs(limit, worker_id):
+    """
+    Lock up to ``limit`` due jobs for this worker.
+
+    Rows are picked with SKIP LOCKED so several workers can poll the table
+    concurrently, and running jobs whose lease expired (crashed worker) are
+    picked up again.
+    """
+    now = timezone.now()
+    due = Q(status='pending', run_after__lte=now) | Q(status='running', locked_until__lt=now)
+    with transaction.atomic():
+        ids = list(
+            OutboxJob.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        OutboxJob.objects.filter(id__in=ids).update(
+            status='running',
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+    return list(OutboxJob.objects.filter(id__in=ids).select_related('booking__student'))
+
+
+def run_job(job):
+    """
+    Run a claimed job and record the outcome.
+
+    Failures are retried with exponential backoff until ``max_attempts`` is
+    reached, after which the job is marked failed.
+    """
+    try:
+        HANDLERS[job.kind](job)
+    except Exception as e:
+        now = timezone.now()
+        error = f"{e}\n{traceback.format_exc()}"
+        if job.attempts >= job.max_attempts:
+            OutboxJob.objects.filter(pk=job.pk).update(
+                status='failed', last_error=error, locked_by='', locked_until=None, updated_at=now
+            )
+            print(f"Outbox job {job.pk} ({job.kind}) failed permanently: {e}")
+        else:
+            OutboxJob.objects.filter(pk=job.pk).update(
+                status='pending',
+                last_error=error,
+                run_after=now + backoff_delay(job.attempts),
+                locked_by='',
+                locked_until=None,
+                updated_at=now,
+            )
+            print(f"Outbox job {job.pk} ({job.kind}) failed, will retry: {e}")
+        return False
+
+    OutboxJob.objects.filter(pk=job.pk).update(
+        status='succeeded', last_error='', locked_by='', locked_until=None, updated_at=timezone.now()
+    )
+    return True
+
+
+# ========== Job Handlers ==========
+
+@handler(OutboxJob.CREATE_MEET)
+def create_meet(job):
+    """Create the Google Meet event and queue the approval email."""
+    from .google_meet import create_meet_event, meet_event_id
+
+    booking = job.booking
+    booking.refresh_from_db(fields=['status', 'meet_link', 'calendar_event_id'])
+    if booking.status != 'approved':
+        print(f"Booking {booking.pk} is {booking.status}; Meet event not created")
+        return
+    # A previous attempt may have created the event before crashing. If it
+    # saved the result, calendar_event_id is set; if not, the event id is
+    # derived from the booking and job, so create_meet_event finds the
+    # existing event instead of inserting a second one.
+    if not booking.calendar_event_id:
+        meet_data = create_meet_event(booking, event_id=meet_event_id(booking, job.pk))
+        if not meet_data:
+            raise RuntimeError("Google Meet creation failed")
+        booking.meet_link = meet_data['meet_link']
+        booking.calendar_event_id = meet_data['event_id']
+
+    with transaction.atomic():
+        updated = Booking.objects.filter(pk=booking.pk, status='approved').update(
+            meet_link=booking.meet_link,
+            calendar_event_id=booking.calendar_event_id,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            # Cancelled while the event was being created
+            enqueue(OutboxJob.DELETE_MEET, booking, payload={'event_id': booking.calendar_event_id}, parent=job)
+            return
+        enqueue(OutboxJob.SEND_APPROVAL_EMAIL, booking, parent=job)
+
+
+@handler(OutboxJob.SEND_APPROVAL_EMAIL)
+def send_approval_email(job):
+    """Email the student their session details and Meet link."""
+    booking = Booking.objects.select_related('student').get(pk=job.booking_id)
+    if booking.status != 'approved':
+        print(f"Booking {booking.pk} is {booking.status}; approval email not sent")
+        return
+    student_email = booking.student.email or booking.email
+    send_notification('bookings/emails/booking_approved', approval_context(booking), [student_email])
+    print(f"✓ Approval email with Google Meet link sent to {student_email}")
+
+
+@handler(OutboxJob.DELETE_MEET)
+def delete_meet(job):
+    """Remove the Google Calendar event of a cancelled booking."""
+    from .google_meet import delete_meet_event
+
+    if not delete_meet_event(job.payload.get('event_id')):
+        raise RuntimeError("Google Calendar event deletion failed")
+
+
+def approval_context(booking):
+    """Template context for the booking approval email."""
+    return {
+        'booking': booking,
+        'student_name': booking.student.first_name or booking.full_name or booking.student.username,
+        'duration': settings.BOOKING_SLOT_MINUTES,
+    }
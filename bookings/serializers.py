@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Booking
+from .models import Booking, BookingArchive, OutboxJob
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -29,8 +29,53 @@ class BookingSerializer(serializers.ModelSerializer):
         # Set student from request user
         validated_data['student'] = self.context['request'].user
         return super().create(validated_data)
+    
+    def update(self, instance, validated_data):
+        for field in ('reason', 'additional_notes'):
+            if validated_data.get(field, getattr(instance, field)) != getattr(instance, field):
+                # Score the edited text again
+                instance.risk_scored_at = None
+        return super().update(instance, validated_data)
 
 
 class BookingDetailSerializer(BookingSerializer):
     """Detailed serializer for single booking view."""
     pass
+
+
+class BookingTriageSerializer(BookingSerializer):
+    """Booking with its risk score, for the wellness team triage queue."""
+    
+    class Meta(BookingSerializer.Meta):
+        fields = BookingSerializer.Meta.fields + ['risk_score', 'risk_reasons', 'risk_scored_at']
+        read_only_fields = fields
+
+
+class BookingArchiveSerializer(serializers.ModelSerializer):
+    """Archived booking, in the same shape as BookingSerializer plus archived_at."""
+    student_username = serializers.CharField(source='student.username', read_only=True)
+    student_name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = BookingArchive
+        fields = BookingSerializer.Meta.fields + ['archived_at']
+        read_only_fields = fields
+    
+    def get_student_name(self, obj):
+        return f"{obj.student.first_name} {obj.student.last_name}".strip() or obj.student.username
+
+
+class OutboxJobSerializer(serializers.ModelSerializer):
+    """Status of a queued booking side effect and the jobs it enqueued."""
+    children = serializers.SerializerMethodField()
+
+    class Meta:
+        model = OutboxJob
+        fields = [
+            'id', 'kind', 'booking', 'status', 'attempts', 'max_attempts',
+            'run_after', 'last_error', 'children', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_children(self, obj):
+        return OutboxJobSerializer(obj.children.all(), many=True).data
@@ -0,0 +1,202 @@
+import base64
+import json
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from mindbridge_app.query_budget import assert_max_queries
+
+from .archive import archivable, archive_batch
+from .availability import SlotIndex, is_slot_free
+from .models import Booking, BookingArchive, CounselorAvailability, OutboxJob
+from .views import BookingViewSet
+
+User = get_user_model()
+
+
+class BookingQueryBudgetTest(TestCase):
+    """
+    The booking endpoints must stay within BookingViewSet.query_budgets
+    however many bookings (and students) are listed.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            username='wellness',
+            email='wellness@example.com',
+            password='testpass123',
+            role='wellness_team'
+        )
+        students = [
+            User.objects.create_user(
+                username=f'student{i}',
+                email=f'student{i}@example.com',
+                password='testpass123',
+                role='student'
+            )
+            for i in range(25)
+        ]
+        Booking.objects.bulk_create([
+            Booking(
+                student=student,
+                date=date.today() + timedelta(days=i % 7 + 1),
+                time=time(9 + i % 8, 0),
+                reason='Need counseling session',
+            )
+            for i, student in enumerate(students)
+        ])
+        cls.booking = Booking.objects.order_by('id').first()
+
+    def setUp(self):
+        self.client = APIClient()
+        # No session lookups: only the view's own queries are counted
+        self.client.force_authenticate(self.staff)
+
+    def test_list(self):
+        with assert_max_queries(BookingViewSet.query_budgets['list'], 'GET /api/bookings/'):
+            response = self.client.get('/api/bookings/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_list_with_archived(self):
+        with assert_max_queries(BookingViewSet.query_budgets['list'] * 2, 'GET /api/bookings/?include_archived=1'):
+            response = self.client.get('/api/bookings/', {'include_archived': '1'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve(self):
+        url = f'/api/bookings/{self.booking.pk}/'
+        with assert_max_queries(BookingViewSet.query_budgets['retrieve'], f'GET {url}'):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], self.booking.pk)
+
+    def test_queue(self):
+        with assert_max_queries(BookingViewSet.query_budgets['queue'], 'GET /api/bookings/queue/'):
+            response = self.client.get('/api/bookings/queue/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+
+
+class BookingQueueCursorTest(TestCase):
+    """Malformed keyset cursors are a 404, not a server error."""
+
+    def setUp(self):
+        staff = User.objects.create_user(
+            username='wellness',
+            email='wellness@example.com',
+            password='testpass123',
+            role='wellness_team'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(staff)
+
+    def cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def test_invalid_cursors(self):
+        for values in (['x', 'y', 1], ['2030-01-01', '10:00', 'abc'], [None, None, None],
+                       ['2030-01-01', '10:00'], {'id': 1}):
+            response = self.client.get('/api/bookings/queue/', {'cursor': self.cursor(values)})
+            self.assertEqual(response.status_code, 404, values)
+        response = self.client.get('/api/bookings/queue/', {'cursor': 'not base64!'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_valid_cursor(self):
+        response = self.client.get('/api/bookings/queue/', {'cursor': self.cursor(['2030-01-01', '10:00:00', 1])})
+        self.assertEqual(response.status_code, 200)
+
+
+class SlotAvailabilityTest(TestCase):
+    """Counselors only take bookings of the session types they accept."""
+
+    def setUp(self):
+        self.day = date.today() + timedelta(days=7)
+        self.student = User.objects.create_user(
+            username='teststudent',
+            email='test@example.com',
+            password='testpass123',
+            role='student'
+        )
+        self.crisis = self.counselor('crisis_counselor', 'crisis')
+        self.group = self.counselor('group_counselor', 'group')
+
+    def counselor(self, username, session_type):
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123',
+            role='wellness_team'
+        )
+        CounselorAvailability.objects.create(
+            counselor=user, weekday=self.day.weekday(),
+            start_time=time(9, 0), end_time=time(12, 0), session_type=session_type,
+        )
+        return user
+
+    def book(self, session_type, at=time(9, 0)):
+        return Booking.objects.create(
+            student=self.student, date=self.day, time=at,
+            session_type=session_type, reason='Need counseling session',
+        )
+
+    def free_times(self, session_type):
+        return [slot['time'] for slot in SlotIndex(self.day, self.day, session_type).free_slots()]
+
+    def test_other_type_does_not_use_capacity(self):
+        self.book('group')
+        self.assertIn(time(9, 0), self.free_times('crisis'))
+        self.assertNotIn(time(9, 0), self.free_times('group'))
+        self.assertTrue(is_slot_free(self.day, time(9, 0), 'crisis'))
+        self.assertFalse(is_slot_free(self.day, time(9, 0), 'group'))
+
+    def test_same_type_fills_slot(self):
+        self.book('group')
+        self.book('crisis')
+        self.assertNotIn(time(9, 0), self.free_times('crisis'))
+        self.assertFalse(is_slot_free(self.day, time(9, 0), None))
+
+    def test_generalist_is_matched_last(self):
+        # Counselors: crisis-only, group-only, and one taking every type
+        self.counselor('generalist', '')
+        self.book('group')
+        self.book('group')
+        # The two group bookings take the group and the general counselor
+        self.assertIn(time(9, 0), self.free_times('crisis'))
+        self.assertNotIn(time(9, 0), self.free_times('group'))
+        self.assertNotIn(time(9, 0), self.free_times('individual'))
+        slot = next(slot for slot in SlotIndex(self.day, self.day, 'crisis').free_slots() if slot['time'] == time(9, 0))
+        self.assertEqual(slot['available'], 1)
+
+
+class BookingArchiveTest(TestCase):
+    """Bookings whose outbox jobs have not run yet are not archived."""
+
+    def setUp(self):
+        student = User.objects.create_user(
+            username='teststudent',
+            email='test@example.com',
+            password='testpass123',
+            role='student'
+        )
+        day = date.today() - timedelta(days=30)
+        self.done, self.waiting = [
+            Booking.objects.create(
+                student=student, date=day, time=time(9 + i, 0),
+                status='cancelled', reason='Need counseling session',
+            )
+            for i in range(2)
+        ]
+        OutboxJob.objects.create(kind=OutboxJob.DELETE_MEET, booking=self.done, status='succeeded')
+        self.job = OutboxJob.objects.create(kind=OutboxJob.DELETE_MEET, booking=self.waiting)
+
+    def test_unfinished_jobs_keep_booking(self):
+        self.assertEqual(archive_batch(archivable(7), 100), 1)
+        self.assertEqual(archive_batch(archivable(7), 100), 0)
+        self.assertEqual(list(BookingArchive.objects.values_list('id', flat=True)), [self.done.pk])
+        self.assertTrue(OutboxJob.objects.filter(pk=self.job.pk).exists())
+
+        OutboxJob.objects.filter(pk=self.job.pk).update(status='succeeded')
+        self.assertEqual(archive_batch(archivable(7), 100), 1)
@@ -0,0 +1,87 @@
+"""
+Booking status state machine.
+
+Every status change is a single conditional UPDATE:
+
+    UPDATE bookings SET status = 'approved' WHERE id = 42 AND status IN ('pending')
+
+so of two concurrent requests for the same change exactly one matches the
+row; the other gets TransitionConflict instead of overwriting it. Side
+effects are only queued after the UPDATE succeeded, in the same transaction.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import outbox
+from .models import Booking, OutboxJob
+
+# target status -> statuses it may be reached from
+TRANSITIONS = {
+    'approved': ('pending',),
+    'rejected': ('pending',),
+    'cancelled': ('pending', 'approved'),
+    'completed': ('approved',),
+}
+
+
+class TransitionConflict(Exception):
+    """Raised when a booking is not in a status the change is allowed from."""
+
+    def __init__(self, booking_id, target, current):
+        self.booking_id = booking_id
+        self.target = target
+        self.current = current
+        if current is None:
+            message = f"Booking {booking_id} does not exist"
+        else:
+            message = f"Booking {booking_id} is {current} and cannot be {target}"
+        super().__init__(message)
+
+
+def transition(booking, target, **fields):
+    """
+    Move one booking to ``target`` if its current status allows it.
+
+    Args:
+        booking: Booking instance; updated in place on success
+        target: new status (a key of TRANSITIONS)
+        fields: other columns to set in the same UPDATE (e.g. notes)
+
+    Raises:
+        TransitionConflict: if another request changed the status first
+    """
+    now = timezone.now()
+    updated = Booking.objects.filter(pk=booking.pk, status__in=TRANSITIONS[target]).update(
+        status=target, updated_at=now, **fields
+    )
+    if not updated:
+        current = Booking.objects.filter(pk=booking.pk).values_list('status', flat=True).first()
+        raise TransitionConflict(booking.pk, target, current)
+    booking.status = target
+    booking.updated_at = now
+    for name, value in fields.items():
+        setattr(booking, name, value)
+    return booking
+
+
+def transition_many(queryset, target, **fields):
+    """Move every booking in ``queryset`` that allows it to ``target``; return the count."""
+    return queryset.filter(status__in=TRANSITIONS[target]).update(
+        status=target, updated_at=timezone.now(), **fields
+    )
+
+
+def cancel_booking(booking):
+    """
+    Cancel a pending or approved booking and queue removal of its Google
+    Calendar event, if one was created.
+
+    Raises:
+        TransitionConflict: if the booking cannot be cancelled any more
+    """
+    with transaction.atomic():
+        transition(booking, 'cancelled')
+        event_id = Booking.objects.filter(pk=booking.pk).values_list('calendar_event_id', flat=True).first()
+        if event_id:
+            outbox.enqueue(OutboxJob.DELETE_MEET, booking, payload={'event_id': event_id})
+    return booking
@@ -18,102 +18,314 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.mail import send_mail
-from .gmail_utils import send_gmail
 from django.conf import settings
+from django.http import Http404
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from decouple import config
-from .models import Booking
+from mindbridge_app.exports import CONTENT_TYPES, export_response
+from mindbridge_app.pagination import KeysetPagination, QuerySetChain
+from mindbridge_app.query_budget import QueryBudgetMixin
+from datetime import date, timedelta
+from . import transitions
+from .approvals import approve_booking, bulk_approve
+from .availability import SlotIndex, SlotUnavailable, reserve_slot
+from .models import Booking, BookingArchive, OutboxJob
 from .forms import BookingForm
-from .serializers import BookingSerializer, BookingDetailSerializer
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-import base64
-from email.mime.text import MIMEText
+from .google_clients import client_stats
+from .idempotency import idempotent
+from .serializers import (
+    BookingSerializer, BookingDetailSerializer, BookingTriageSerializer, BookingArchiveSerializer, OutboxJobSerializer
+)
+
+
+# Largest batch accepted by the bulk approve endpoint
+BULK_APPROVE_LIMIT = 500
+# Longest date range served by the slots endpoint (about one term)
+MAX_SLOT_RANGE_DAYS = 180
+
+
+# Columns of /api/bookings/export/ (reason and notes are left out on purpose)
+BOOKING_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('student_id', 'student_id'),
+    ('student_username', 'student__username'),
+    ('full_name', 'full_name'),
+    ('email', 'email'),
+    ('date', 'date'),
+    ('time', 'time'),
+    ('session_type', 'session_type'),
+    ('status', 'status'),
+    ('meet_link', 'meet_link'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+)
+
+
+class BookingQueuePagination(KeysetPagination):
+    # Matches bookings_queue_idx / bookings_queue_type_idx
+    ordering = ('date', 'time', 'id')
+
+
+class RiskBookingQueuePagination(KeysetPagination):
+    # Matches bookings_risk_queue_idx
+    ordering = ('-risk_score', 'date', 'time', 'id')
 
 
 # ========== REST API ViewSets ==========
 
-class BookingViewSet(viewsets.ModelViewSet):
-    queryset = Booking.objects.all()
+class BookingViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
+    # The serializer reads student username/name for every row
+    queryset = Booking.objects.select_related('student')
     serializer_class = BookingSerializer
+    query_budgets = {'list': 2, 'retrieve': 1, 'queue': 1}
+
+    def include_archived(self):
+        return self.request.query_params.get('include_archived') == '1'
+
+    def get_query_budget(self):
+        budget = super().get_query_budget()
+        # Archived rows are read from bookings_archive with their own queries
+        if budget is not None and self.include_archived() and self.action in ('list', 'retrieve'):
+            budget *= 2
+        return budget
+
+    def list(self, request, *args, **kwargs):
+        """With ?include_archived=1, archived bookings are listed after the live ones."""
+        if not self.include_archived():
+            return super().list(request, *args, **kwargs)
+        bookings = QuerySetChain(
+            self.filter_queryset(self.get_queryset()),
+            BookingArchive.objects.select_related('student'),
+        )
+        page = self.paginate_queryset(bookings)
+        data = [self._serialize(booking) for booking in (bookings if page is None else page)]
+        return Response(data) if page is None else self.get_paginated_response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        """With ?include_archived=1, an archived booking is returned if the id is not live."""
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            if not self.include_archived() or not str(kwargs['pk']).isdigit():
+                raise
+        booking = get_object_or_404(BookingArchive.objects.select_related('student'), pk=kwargs['pk'])
+        return Response(BookingArchiveSerializer(booking).data)
+
+    def _serialize(self, booking):
+        if isinstance(booking, BookingArchive):
+            return BookingArchiveSerializer(booking).data
+        return self.get_serializer(booking).data
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        try:
+            with reserve_slot(data['date'], data['time'], data.get('session_type')):
+                serializer.save()
+        except SlotUnavailable as e:
+            raise ValidationError({'time': [str(e)]})
+
+    @action(detail=False, methods=['get'])
+    def slots(self, request):
+        """
+        Free booking slots between two dates.
+        Query params: start, end (YYYY-MM-DD, default today/+14 days), session_type.
+        """
+        try:
+            start = date.fromisoformat(request.query_params.get('start') or date.today().isoformat())
+            end = date.fromisoformat(request.query_params.get('end') or (start + timedelta(days=14)).isoformat())
+        except ValueError:
+            return Response({'error': 'start and end must be YYYY-MM-DD dates'}, status=status.HTTP_400_BAD_REQUEST)
+        if end < start or (end - start).days > MAX_SLOT_RANGE_DAYS:
+            return Response(
+                {'error': f'end must be within {MAX_SLOT_RANGE_DAYS} days after start'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        index = SlotIndex(start, end, request.query_params.get('session_type'))
+        return Response({
+            'slot_minutes': index.slot_minutes,
+            'slots': [
+                {'date': slot['date'].isoformat(), 'time': slot['time'].strftime('%H:%M'), 'available': slot['available']}
+                for slot in index.free_slots()
+            ],
+        })
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    @idempotent
     def approve(self, request, pk=None):
         booking = self.get_object()
         # Only wellness team can approve
         if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
-        # Generate Google Meet link
+        # Meet creation and the approval email run in the outbox worker;
+        # the job is committed together with the status change.
         try:
-            from .google_meet import create_meet_event
-            meet_data = create_meet_event(booking)
-            booking.status = 'approved'
-            booking.meet_link = meet_data['meet_link']
-            booking.save()
-        except Exception as e:
-            print(f"Google Meet creation failed: {e}")
-            meet_data = None
-
-        # Send approval email and handle fallback
-        if meet_data:
-            try:
-                student_email = booking.student.email or booking.email
-                student_name = booking.student.first_name or booking.full_name or booking.student.username
-                subject = 'Booking Approved - Your Session is Confirmed!'
-                session_time = booking.time.strftime('%I:%M %p')
-                session_date = booking.date.strftime('%B %d, %Y')
-                message = f"""Hello {student_name},
-
-Your counseling session booking has been approved!
-
-Date: {session_date}
-Time: {session_time}
-Duration: 40 minutes
-Type: {booking.get_session_type_display()}
-
-Join your session using the Google Meet link below:
-{booking.meet_link}
-
-✓ Test your camera and microphone beforehand
-✓ Use headphones for better audio quality
-✓ Have a glass of water nearby
-✓ Keep your phone on silent
-✓ Be ready to share openly and honestly
-
-IMPORTANT:
-• Save this email for easy access to your meeting link
-• You can also find the meeting link in your MindBridge dashboard
-• If you need to cancel, please do so at least 24 hours in advance
-
-We're looking forward to supporting you on your wellness journey!
-
-Best regards,
-The MindBridge Wellness Team
-African Leadership University
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Need help? Log in to your MindBridge account or contact our wellness team.
-"""
-                send_gmail(student_email, subject, message)
-                print(f"✓ Approval email with Google Meet link sent to {student_email}")
-            except Exception as e:
-                print(f"Failed to send approval email: {e}")
-            return Response({
-                'status': 'booking approved',
-                'meet_link': meet_data['meet_link'],
-                'event_id': meet_data['event_id'],
-                'message': 'Booking approved! Google Meet invitation sent to student email.'
-            })
-        else:
-            # Fallback: approve without Meet link
-            print("Google Meet data was None - creation failed")
-            return Response({
-                'status': 'booking approved (Google Meet creation failed)',
-                'message': 'Please create meeting link manually'
-            })
+            job = approve_booking(booking)
+        except transitions.TransitionConflict as e:
+            return Response({'error': str(e), 'status': e.current}, status=status.HTTP_409_CONFLICT)
+
+        return Response({
+            'status': 'booking approved',
+            'job_id': job.id,
+            'message': 'Booking approved! Google Meet invitation will be sent to the student shortly.'
+        }, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def export(self, request):
+        """
+        Stream bookings for reporting.
+        Query params: output (csv or jsonl, default csv), status, session_type, date_from, date_to.
+        """
+        if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params
+        output = params.get('output', 'csv')
+        if output not in CONTENT_TYPES:
+            return Response({'error': 'output must be csv or jsonl'}, status=status.HTTP_400_BAD_REQUEST)
+        bookings = Booking.objects.all()
+        if params.get('status'):
+            if params['status'] not in dict(Booking.STATUS_CHOICES):
+                return Response({'error': f"Unknown status: {params['status']}"}, status=status.HTTP_400_BAD_REQUEST)
+            bookings = bookings.filter(status=params['status'])
+        if params.get('session_type'):
+            bookings = bookings.filter(session_type=params['session_type'])
+        try:
+            if params.get('date_from'):
+                bookings = bookings.filter(date__gte=date.fromisoformat(params['date_from']))
+            if params.get('date_to'):
+                bookings = bookings.filter(date__lte=date.fromisoformat(params['date_to']))
+        except ValueError:
+            return Response({'error': 'date_from and date_to must be YYYY-MM-DD dates'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return export_response(bookings, BOOKING_EXPORT_COLUMNS, output, 'bookings')
+
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    @idempotent
+    def reject(self, request, pk=None):
+        """Reject a pending booking. Optional JSON: {"notes": "..."}"""
+        booking = self.get_object()
+        if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        fields = {'notes': request.data['notes']} if request.data.get('notes') else {}
+        try:
+            transitions.transition(booking, 'rejected', **fields)
+        except transitions.TransitionConflict as e:
+            return Response({'error': str(e), 'status': e.current}, status=status.HTTP_409_CONFLICT)
+        return Response({'status': 'booking rejected'})
+
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    @idempotent
+    def cancel(self, request, pk=None):
+        """Cancel a pending or approved booking (its student or the wellness team)."""
+        booking = self.get_object()
+        is_team = getattr(request.user, 'is_wellness_team', False)
+        if booking.student_id != request.user.id and not is_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            transitions.cancel_booking(booking)
+        except transitions.TransitionConflict as e:
+            return Response({'error': str(e), 'status': e.current}, status=status.HTTP_409_CONFLICT)
+        return Response({'status': 'booking cancelled'})
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def queue(self, request):
+        """
+        Wellness team triage queue, earliest session first (or highest risk
+        first with ?sort=risk), keyset-paginated.
+        Query params: status (default pending), session_type, date_from, date_to,
+        sort (date|risk), cursor, page_size.
+        """
+        if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params
+        booking_status = params.get('status', 'pending')
+        if booking_status not in dict(Booking.STATUS_CHOICES):
+            return Response({'error': f'Unknown status: {booking_status}'}, status=status.HTTP_400_BAD_REQUEST)
+        bookings = Booking.objects.select_related('student').filter(status=booking_status)
+
+        session_type = params.get('session_type')
+        if session_type:
+            bookings = bookings.filter(session_type=session_type)
+        try:
+            if params.get('date_from'):
+                bookings = bookings.filter(date__gte=date.fromisoformat(params['date_from']))
+            if params.get('date_to'):
+                bookings = bookings.filter(date__lte=date.fromisoformat(params['date_to']))
+        except ValueError:
+            return Response({'error': 'date_from and date_to must be YYYY-MM-DD dates'}, status=status.HTTP_400_BAD_REQUEST)
+
+        sort = params.get('sort', 'date')
+        if sort not in ('date', 'risk'):
+            return Response({'error': 'sort must be date or risk'}, status=status.HTTP_400_BAD_REQUEST)
+        paginator = RiskBookingQueuePagination() if sort == 'risk' else BookingQueuePagination()
+        page = paginator.paginate_queryset(bookings, request, view=self)
+        serializer = BookingTriageSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='bulk-approve',
+            permission_classes=[permissions.IsAuthenticated])
+    def bulk_approve(self, request):
+        """
+        Approve many bookings at once.
+        Expects JSON: {"ids": [1, 2, ...]}; returns a per-booking report.
+        """
+        if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+            return Response({'error': 'Booking ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        # Each booking is approved and reported once, in request order
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > BULK_APPROVE_LIMIT:
+            return Response(
+                {'error': f'At most {BULK_APPROVE_LIMIT} bookings can be approved per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        bookings = Booking.objects.filter(pk__in=ids).select_related('student')
+        results = bulk_approve(bookings)
+        found = {result['id'] for result in results}
+        results += [{'id': pk, 'ok': False, 'error': 'Not found'} for pk in ids if pk not in found]
+        return Response({
+            'approved': sum(1 for result in results if result['ok']),
+            'failed': sum(1 for result in results if not result['ok']),
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'], url_path=r'jobs/(?P<job_id>\d+)',
+            permission_classes=[permissions.IsAuthenticated])
+    def job_status(self, request, job_id=None):
+        """Poll the status of an outbox job returned by approve."""
+        if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        job = get_object_or_404(OutboxJob.objects.prefetch_related('children'), pk=job_id)
+        return Response(OutboxJobSerializer(job).data)
+
+    @action(detail=False, methods=['get'], url_path='google-client-stats',
+            permission_classes=[permissions.IsAuthenticated])
+    def google_client_stats(self, request):
+        """Google API client/credential cache counters for this worker process."""
+        if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        return Response(client_stats())
+
     # ...existing code for booking_create_public...
 
 
@@ -127,9 +339,14 @@ def create_booking(request):
         if form.is_valid():
             booking = form.save(commit=False)
             booking.student = request.user
-            booking.save()
-            messages.success(request, 'Booking created successfully! You will be notified once it is reviewed.')
-            return redirect('bookings:list')
+            try:
+                with reserve_slot(booking.date, booking.time, booking.session_type):
+                    booking.save()
+            except SlotUnavailable as e:
+                form.add_error('time', str(e))
+            else:
+                messages.success(request, 'Booking created successfully! You will be notified once it is reviewed.')
+                return redirect('bookings:list')
     else:
         form = BookingForm()
     
@@ -158,11 +375,11 @@ def cancel_booking(request, pk):
     """
     booking = get_object_or_404(Booking, pk=pk, student=request.user)
     
-    if booking.can_cancel():
-        booking.status = 'cancelled'
-        booking.save()
-        messages.success(request, 'Booking cancelled successfully.')
-    else:
+    try:
+        transitions.cancel_booking(booking)
+    except transitions.TransitionConflict:
         messages.error(request, 'This booking cannot be cancelled.')
+    else:
+        messages.success(request, 'Booking cancelled successfully.')
     
     return redirect('bookings:list')
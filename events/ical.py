@@ -0,0 +1,93 @@
+"""
+Minimal iCalendar (RFC 5545) writer used by the calendar feeds.
+
+Feeds are produced line by line so they can be streamed without building
+the whole calendar in memory.
+"""
+import datetime
+
+from django.utils import timezone
+
+PRODID = '-//MindBridge//Wellness Calendar//EN'
+
+
+def escape(text):
+    """Escape a TEXT value."""
+    return (
+        str(text)
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Fold a content line to 75 octets as required by RFC 5545."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Never split a multi-byte UTF-8 character
+        while cut and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    parts.append(encoded.decode('utf-8'))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def utc_stamp(value):
+    """Format an aware datetime as a UTC DATE-TIME value."""
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def local_datetime(day, time):
+    """Combine a date and a wall-clock time in TIME_ZONE into an aware datetime."""
+    return timezone.make_aware(datetime.datetime.combine(day, time))
+
+
+def calendar_start(name):
+    yield fold('BEGIN:VCALENDAR')
+    yield fold('VERSION:2.0')
+    yield fold(f'PRODID:{PRODID}')
+    yield fold('CALSCALE:GREGORIAN')
+    yield fold('METHOD:PUBLISH')
+    yield fold(f'X-WR-CALNAME:{escape(name)}')
+    yield fold('X-PUBLISHED-TTL:PT15M')
+
+
+def calendar_end():
+    yield fold('END:VCALENDAR')
+
+
+def event(uid, start, end, summary, stamp, description='', location='', url=''):
+    """
+    Yield the lines of one VEVENT.
+
+    Args:
+        uid: globally unique, stable id
+        start, end: aware datetimes
+        summary: event title
+        stamp: aware datetime the entry was last modified
+    """
+    chunk = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{utc_stamp(stamp)}',
+        f'LAST-MODIFIED:{utc_stamp(stamp)}',
+        f'DTSTART:{utc_stamp(start)}',
+        f'DTEND:{utc_stamp(end)}',
+        f'SUMMARY:{escape(summary)}',
+    ]
+    if description:
+        chunk.append(f'DESCRIPTION:{escape(description)}')
+    if location:
+        chunk.append(f'LOCATION:{escape(location)}')
+    if url:
+        chunk.append(f'URL:{url}')
+    chunk.append('END:VEVENT')
+    return ''.join(fold(line) for line in chunk)
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventregistration',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, help_text='When the event reminder was sent', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_active', 'date', 'time'], name='events_upcoming_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventregistration',
+            index=models.Index(fields=['event', 'reminder_sent_at'], name='registration_reminder_idx'),
+        ),
+    ]
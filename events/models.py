@@ -21,6 +21,7 @@ class Event(models.Model):
     )
     max_participants = models.IntegerField(default=50, help_text="Maximum number of participants")
     image = models.ImageField(upload_to='events/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized JPEG/WebP copies of the image")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -30,6 +31,9 @@ class Event(models.Model):
         verbose_name = 'Event'
         verbose_name_plural = 'Events'
         ordering = ['date', 'time']
+        indexes = [
+            models.Index(fields=['is_active', 'date', 'time'], name='events_upcoming_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.date}"
@@ -55,6 +59,7 @@ class EventRegistration(models.Model):
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='event_registrations')
     registered_at = models.DateTimeField(auto_now_add=True)
     attended = models.BooleanField(default=False)
+    reminder_sent_at = models.DateTimeField(blank=True, null=True, help_text="When the event reminder was sent")
     
     class Meta:
         db_table = 'event_registrations'
@@ -62,6 +67,9 @@ class EventRegistration(models.Model):
         verbose_name_plural = 'Event Registrations'
         unique_together = ('event', 'student')
         ordering = ['-registered_at']
+        indexes = [
+            models.Index(fields=['event', 'reminder_sent_at'], name='registration_reminder_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.event.title}"
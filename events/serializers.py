@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Event, EventRegistration
+from mindbridge_app.images import srcset
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -8,6 +9,7 @@ class EventSerializer(serializers.ModelSerializer):
     is_full = serializers.BooleanField(read_only=True)
     spots_remaining = serializers.IntegerField(read_only=True)
     is_registered = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Event
@@ -15,7 +17,7 @@ class EventSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'date', 'time', 'start_time', 'end_time', 'location',
             'organizer', 'organizer_name', 'max_participants', 
             'registered_count', 'is_full', 'spots_remaining',
-            'image', 'is_active', 'is_registered',
+            'image', 'image_srcset', 'is_active', 'is_registered',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['organizer', 'created_at', 'updated_at']
@@ -25,6 +27,10 @@ class EventSerializer(serializers.ModelSerializer):
             return obj.organizer.get_full_name() or obj.organizer.username
         return 'Unknown'
     
+    def get_image_srcset(self, obj):
+        """{'webp': srcset, 'jpeg': srcset} of the resized images, or None."""
+        return srcset(obj.image_variants, obj.image.storage, self.context.get('request'))
+    
     def get_is_registered(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from mindbridge_app.images import sync_variants
+
+from .models import Event
+
+
+@receiver(post_save, sender=Event)
+def image_saved(sender, instance, raw=False, **kwargs):
+    """Create the resized variants of a new or replaced event image."""
+    if not raw:
+        sync_variants(instance, 'image', 'image_variants')
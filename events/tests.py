@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class CalendarFeedTokenTest(TestCase):
+    """Resetting the feed URL revokes the old one."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            username='teststudent',
+            email='test@example.com',
+            password='testpass123',
+            role='student'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def feed_path(self, response):
+        return response.data['url'].replace('http://testserver', '')
+
+    def test_reset_revokes_old_url(self):
+        old = self.feed_path(self.client.get('/api/calendar/feed-url/'))
+        self.assertEqual(self.client.get(old).status_code, 200)
+
+        new = self.feed_path(self.client.post('/api/calendar/feed-url/'))
+        self.assertNotEqual(new, old)
+        self.assertEqual(self.client.get(old).status_code, 404)
+        self.assertEqual(self.client.get(new).status_code, 200)
+        self.assertEqual(self.feed_path(self.client.get('/api/calendar/feed-url/')), new)
+
+    def test_bad_token(self):
+        self.assertEqual(self.client.get('/api/calendar/garbage/mindbridge.ics').status_code, 404)
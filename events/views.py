@@ -1,12 +1,35 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from datetime import date
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.http import Http404, StreamingHttpResponse
+from django.views.decorators.http import condition, require_GET
+from datetime import date, timedelta
+import hashlib
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from .models import Event, EventRegistration
 from .serializers import EventSerializer, EventRegistrationSerializer
+from . import ical
+from bookings.models import Booking
+from mindbridge_app.exports import CONTENT_TYPES, export_response
+
+
+# Columns of /api/event-registrations/export/
+REGISTRATION_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('event_id', 'event_id'),
+    ('event_title', 'event__title'),
+    ('event_date', 'event__date'),
+    ('student_id', 'student_id'),
+    ('student_username', 'student__username'),
+    ('registered_at', 'registered_at'),
+    ('attended', 'attended'),
+)
 
 
 # ========== REST API ViewSets ==========
@@ -80,6 +103,186 @@ class EventRegistrationViewSet(viewsets.ReadOnlyModelViewSet):
             return EventRegistration.objects.all()
         return EventRegistration.objects.filter(student=user)
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream event registrations for reporting (wellness team only).
+        Query params: output (csv or jsonl, default csv), event, attended (true/false),
+        date_from, date_to (event date).
+        """
+        if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params
+        output = params.get('output', 'csv')
+        if output not in CONTENT_TYPES:
+            return Response({'error': 'output must be csv or jsonl'}, status=status.HTTP_400_BAD_REQUEST)
+        registrations = EventRegistration.objects.all()
+        if params.get('event'):
+            if not params['event'].isdigit():
+                return Response({'error': 'event must be an event id'}, status=status.HTTP_400_BAD_REQUEST)
+            registrations = registrations.filter(event_id=params['event'])
+        if params.get('attended') in ('true', 'false'):
+            registrations = registrations.filter(attended=params['attended'] == 'true')
+        try:
+            if params.get('date_from'):
+                registrations = registrations.filter(event__date__gte=date.fromisoformat(params['date_from']))
+            if params.get('date_to'):
+                registrations = registrations.filter(event__date__lte=date.fromisoformat(params['date_to']))
+        except ValueError:
+            return Response({'error': 'date_from and date_to must be YYYY-MM-DD dates'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return export_response(registrations, REGISTRATION_EXPORT_COLUMNS, output, 'event_registrations')
+
+
+# ========== Calendar Feeds (iCalendar) ==========
+# Calendar clients poll feeds every few minutes. ETag/Last-Modified come from
+# one aggregate query, so unchanged feeds are answered with a 304 and the
+# entries are only streamed when something changed.
+
+FEED_SALT = 'mindbridge.calendar-feed'
+
+
+def feed_token(user):
+    """
+    Signed, unguessable token identifying a user's personal feed. It carries
+    the user's calendar_feed_version, so bumping the version revokes it.
+    """
+    return signing.Signer(salt=FEED_SALT).sign(f'{user.pk}:{user.calendar_feed_version}')
+
+
+def _feed_user(request, token):
+    """The user a feed token belongs to (looked up once per request)."""
+    if not hasattr(request, '_feed_user'):
+        try:
+            user_id, version = signing.Signer(salt=FEED_SALT).unsign(token).split(':')
+        except (signing.BadSignature, ValueError):
+            raise Http404("Unknown calendar feed")
+        request._feed_user = get_object_or_404(
+            get_user_model(), pk=user_id, calendar_feed_version=version, is_active=True
+        )
+    return request._feed_user
+
+
+def _validators(request, *aggregates):
+    """ETag and Last-Modified for a feed from (count, max timestamp) aggregates."""
+    if not hasattr(request, '_feed_validators'):
+        stamps = [value for aggregate in aggregates for value in aggregate.values()]
+        modified = max((value for value in stamps if hasattr(value, 'isoformat')), default=None)
+        digest = hashlib.md5(repr(stamps).encode()).hexdigest()
+        request._feed_validators = (f'"{digest}"', modified)
+    return request._feed_validators
+
+
+def _public_feed_validators(request):
+    return _validators(
+        request,
+        Event.objects.filter(is_active=True).aggregate(count=Count('id'), last=Max('updated_at')),
+    )
+
+
+def _user_feed_validators(request, token):
+    if not hasattr(request, '_feed_validators'):
+        user = _feed_user(request, token)
+        return _validators(
+            request,
+            _user_bookings(user).aggregate(count=Count('id'), last=Max('updated_at')),
+            _user_events(user).aggregate(count=Count('id'), last=Max('updated_at')),
+            EventRegistration.objects.filter(student=user).aggregate(count=Count('id'), last=Max('registered_at')),
+        )
+    return request._feed_validators
+
+
+def _user_bookings(user):
+    return Booking.objects.filter(student=user, status='approved', meet_link__isnull=False).exclude(meet_link='')
+
+
+def _user_events(user):
+    return Event.objects.filter(is_active=True, registrations__student=user)
+
+
+def _event_entries(events):
+    rows = events.values(
+        'id', 'title', 'description', 'date', 'time', 'start_time', 'end_time', 'location', 'updated_at'
+    ).order_by('date', 'time')
+    for row in rows.iterator(chunk_size=500):
+        start = ical.local_datetime(row['date'], row['start_time'] or row['time'])
+        if row['end_time'] and row['end_time'] > (row['start_time'] or row['time']):
+            end = ical.local_datetime(row['date'], row['end_time'])
+        else:
+            end = start + timedelta(hours=1)
+        yield ical.event(
+            f"event-{row['id']}@mindbridge", start, end, row['title'], row['updated_at'],
+            description=row['description'], location=row['location'],
+        )
+
+
+def _booking_entries(bookings):
+    rows = bookings.values('id', 'date', 'time', 'session_type', 'meet_link', 'updated_at').order_by('date', 'time')
+    session_types = dict(Booking.SESSION_TYPE_CHOICES)
+    for row in rows.iterator(chunk_size=500):
+        start = ical.local_datetime(row['date'], row['time'])
+        yield ical.event(
+            f"booking-{row['id']}@mindbridge", start, start + timedelta(minutes=settings.BOOKING_SLOT_MINUTES),
+            f"MindBridge {session_types.get(row['session_type'], 'Counseling Session')}", row['updated_at'],
+            description=f"Join on Google Meet: {row['meet_link']}", location=row['meet_link'], url=row['meet_link'],
+        )
+
+
+def _stream_calendar(name, *entry_groups):
+    def lines():
+        yield from ical.calendar_start(name)
+        for entries in entry_groups:
+            yield from entries
+        yield from ical.calendar_end()
+
+    response = StreamingHttpResponse(lines(), content_type='text/calendar; charset=utf-8')
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
+
+
+@require_GET
+@condition(
+    etag_func=lambda request: _public_feed_validators(request)[0],
+    last_modified_func=lambda request: _public_feed_validators(request)[1],
+)
+def public_events_feed(request):
+    """Subscribable feed of all active events."""
+    return _stream_calendar('MindBridge Events', _event_entries(Event.objects.filter(is_active=True)))
+
+
+@require_GET
+@condition(
+    etag_func=lambda request, token: _user_feed_validators(request, token)[0],
+    last_modified_func=lambda request, token: _user_feed_validators(request, token)[1],
+)
+def user_calendar_feed(request, token):
+    """A user's approved sessions (with Meet links) and registered events."""
+    user = _feed_user(request, token)
+    return _stream_calendar(
+        'MindBridge',
+        _booking_entries(_user_bookings(user)),
+        _event_entries(_user_events(user)),
+    )
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def calendar_feed_url(request):
+    """
+    URL of the current user's personal calendar feed, for calendar apps.
+    POST replaces it with a new URL; the old one stops working.
+    """
+    user = request.user
+    if request.method == 'POST':
+        get_user_model().objects.filter(pk=user.pk).update(calendar_feed_version=F('calendar_feed_version') + 1)
+        user.refresh_from_db(fields=['calendar_feed_version'])
+    url = request.build_absolute_uri(f'/api/calendar/{feed_token(user)}/mindbridge.ics')
+    return Response({
+        'url': url,
+        'webcal_url': url.replace('https://', 'webcal://').replace('http://', 'webcal://'),
+    })
+
 
 # ========== Template-based Views (keep for admin/legacy) ==========
 
@@ -976,8 +976,8 @@ headers: {
 if (!response.ok) throw new Error('Failed to approve booking');
 
     const data = await response.json();
-    if (data.meet_link) {
-      showToast('Booking approved! Google Meet link created and invitation sent to student.', 'success');
+    if (data.job_id) {
+      showToast('Booking approved! The Google Meet invitation will be sent to the student shortly.', 'success');
     } else {
       showToast('Booking approved! (Google Meet link creation failed - check server logs)', 'success');
     }
@@ -1328,7 +1328,14 @@ return `
 <div class="bg-white rounded-xl shadow-lg overflow-hidden card-hover">
 <div class="h-48 ${hasCover ? 'bg-gray-100' : `bg-gradient-to-br ${colorClass}`} flex items-center justify-center overflow-hidden">
 ${hasCover ? `
-<img src="${book.cover_image}" alt="${escapeHtml(book.title)}" class="h-full w-auto object-contain">
+${book.cover_srcset ? `
+<picture class="contents">
+<source type="image/webp" srcset="${book.cover_srcset.webp}" sizes="160px">
+<img src="${book.cover_image}" srcset="${book.cover_srcset.jpeg}" sizes="160px" alt="${escapeHtml(book.title)}" class="h-full w-auto object-contain" loading="lazy">
+</picture>
+` : `
+<img src="${book.cover_image}" alt="${escapeHtml(book.title)}" class="h-full w-auto object-contain" loading="lazy">
+`}
 ` : `
 <svg viewBox="0 0 200 250" class="w-32 h-40">
 <rect x="20" y="20" width="160" height="210" rx="8" fill="white" opacity="0.9"/>
@@ -1346,7 +1353,7 @@ ${hasCover ? `
 <span class="inline-block bg-blue-100 text-blue-800 text-xs px-2 py-1 rounded-full mb-3 capitalize">${book.category.replace('_', ' ').replace('-', ' ')}</span>
 <p class="text-sm text-gray-500 line-clamp-3 mb-4">${escapeHtml(book.description) || 'A valuable resource for mental wellness and personal growth.'}</p>
 ${hasPdf ? `
-<a href="${book.pdf_file}" download class="inline-flex items-center justify-center w-full bg-blue-600 text-white py-2 px-4 rounded-lg font-semibold hover:bg-blue-700 transition-colors">
+<a href="${book.pdf_url || book.pdf_file}" target="_blank" rel="noopener" class="inline-flex items-center justify-center w-full bg-blue-600 text-white py-2 px-4 rounded-lg font-semibold hover:bg-blue-700 transition-colors">
 <svg class="w-5 h-5 mr-2" fill="none" stroke="currentColor" viewBox="0 0 24 24">
 <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 10v6m0 0l-3-3m3 3l3-3m2 8H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z" />
 </svg>
@@ -2000,7 +2007,7 @@ timeDisplay = eventDate.toLocaleTimeString('en-US', { hour: 'numeric', minute: '
 
 return `
 <div class="bg-white rounded-xl shadow-lg overflow-hidden card-hover">
-${event.image ? `<img src="${event.image}" alt="${escapeHtml(event.title)}" class="w-full h-48 object-cover">` : `
+${event.image ? (event.image_srcset ? `<picture class="contents"><source type="image/webp" srcset="${event.image_srcset.webp}" sizes="(min-width: 768px) 33vw, 100vw"><img src="${event.image}" srcset="${event.image_srcset.jpeg}" sizes="(min-width: 768px) 33vw, 100vw" alt="${escapeHtml(event.title)}" class="w-full h-48 object-cover" loading="lazy"></picture>` : `<img src="${event.image}" alt="${escapeHtml(event.title)}" class="w-full h-48 object-cover" loading="lazy">`) : `
 <div class="w-full h-48 bg-gradient-to-br from-purple-400 to-indigo-500 flex items-center justify-center">
 <svg class="w-20 h-20 text-white opacity-50" fill="none" stroke="currentColor" viewBox="0 0 24 24">
 <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M8 7V3m8 4V3m-9 8h10M5 21h14a2 2 0 002-2V7a2 2 0 00-2-2H5a2 2 0 00-2 2v12a2 2 0 002 2z" />
@@ -0,0 +1,127 @@
+"""
+PDF delivery for library books.
+
+After the permission check a PDF is either handed to the front web server
+(LIBRARY_SENDFILE = 'x-sendfile' for Apache/lighttpd, 'x-accel' for nginx),
+which then does the transfer, ranges and all, without a Python worker; or
+served by Django with:
+
+- ETag / Last-Modified and 304 answers to If-None-Match / If-Modified-Since
+- single byte ranges (Range, If-Range) with 206 / 416, so PDF viewers can
+  fetch pages on demand
+- the file read in CHUNK_SIZE pieces; whole files go through FileResponse,
+  which lets the WSGI server use sendfile()
+
+For nginx, map LIBRARY_ACCEL_PREFIX to MEDIA_ROOT in an internal location:
+
+    location /protected-media/ {
+        internal;
+        alias /path/to/media/;
+    }
+"""
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range Range header.
+
+    Returns:
+        (start, end) inclusive, None to send the whole file (no header, or a
+        form this module does not serve, e.g. several ranges), or False if
+        the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, field, content_type='application/pdf'):
+    """
+    Response delivering the file of a FileField.
+
+    Args:
+        request: the (already authorized) request
+        field: a FieldFile with a file, e.g. book.pdf_file
+    """
+    try:
+        path = field.path
+    except NotImplementedError:
+        # Remote storage: it serves ranges itself
+        return HttpResponseRedirect(field.url)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    size = stat.st_size
+    etag = quote_etag(f'{int(stat.st_mtime):x}-{size:x}')
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        return not_modified
+
+    filename = os.path.basename(field.name)
+    mode = settings.LIBRARY_SENDFILE
+    byte_range = None
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    elif mode == 'x-accel':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.LIBRARY_ACCEL_PREFIX.rstrip('/') + '/' + field.name.lstrip('/')
+    else:
+        if_range = request.headers.get('If-Range')
+        if if_range is None or if_range == etag:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(read_range(path, start, end - start + 1), status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Content-Disposition'] = content_disposition_header(False, filename)
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
@@ -0,0 +1,185 @@
+"""
+Bulk catalog import (python manage.py import_library).
+
+Rows come from CSV or JSON Lines files with the columns
+
+    title, author, isbn, category, year, description, external_link,
+    cover (image path), pdf (PDF path)
+
+File paths are relative to the files directory given to the command. Each
+row is validated and matched against the catalog: a book with the same
+normalized ISBN, or else the same normalized title and author, is updated;
+other rows become new books. Rows repeating an earlier row of the same
+file are rejected.
+"""
+import csv
+import json
+import os
+from datetime import date
+
+from .models import LibraryBook
+from .suggest import normalize
+
+# Accepted column names -> field
+COLUMN_ALIASES = {
+    'title': 'title',
+    'author': 'author',
+    'isbn': 'isbn',
+    'category': 'category',
+    'year': 'published_year',
+    'published_year': 'published_year',
+    'description': 'description',
+    'external_link': 'external_link',
+    'link': 'external_link',
+    'cover': 'cover',
+    'cover_image': 'cover',
+    'cover_path': 'cover',
+    'pdf': 'pdf',
+    'pdf_file': 'pdf',
+    'pdf_path': 'pdf',
+}
+# Fields an import overwrites on an existing book when the row has a value
+UPDATE_FIELDS = ['title', 'author', 'isbn', 'category', 'published_year', 'description', 'external_link']
+
+CATEGORIES = {}
+for _key, _label in LibraryBook.CATEGORY_CHOICES:
+    CATEGORIES[_key] = _key
+    CATEGORIES[normalize(_label)] = _key
+    CATEGORIES[normalize(_key)] = _key
+
+
+class RowError(ValueError):
+    """A row that cannot be imported; the message goes to the reject report."""
+
+
+def read_rows(path, file_format):
+    """Yield (line number, {field: value}) from a CSV or JSONL file."""
+    with open(path, encoding='utf-8-sig', newline='') as handle:
+        if file_format == 'csv':
+            for line, row in enumerate(csv.DictReader(handle), start=2):
+                yield line, _fields(row)
+        else:
+            for line, text in enumerate(handle, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    row = json.loads(text)
+                except ValueError as e:
+                    yield line, RowError(f"invalid JSON: {e}")
+                    continue
+                yield line, _fields(row) if isinstance(row, dict) else RowError("not a JSON object")
+
+
+def _fields(row):
+    fields = {}
+    for column, value in row.items():
+        field = COLUMN_ALIASES.get((column or '').strip().lower())
+        if field is not None and value is not None:
+            fields[field] = str(value).strip()
+    return fields
+
+
+def normalize_isbn(value):
+    """
+    Return the ISBN-13 form of an ISBN-10 or ISBN-13 (hyphens and spaces
+    ignored).
+
+    Raises:
+        RowError: if it is not a valid ISBN
+    """
+    digits = value.replace('-', '').replace(' ', '').upper()
+    if len(digits) == 10 and digits[:9].isdigit() and (digits[9].isdigit() or digits[9] == 'X'):
+        total = sum((10 - i) * int(d) for i, d in enumerate(digits[:9]))
+        total += 10 if digits[9] == 'X' else int(digits[9])
+        if total % 11:
+            raise RowError(f"invalid ISBN-10 check digit: {value}")
+        digits = '978' + digits[:9]
+        return digits + str((10 - sum((3 if i % 2 else 1) * int(d) for i, d in enumerate(digits)) % 10) % 10)
+    if len(digits) == 13 and digits.isdigit():
+        if sum((3 if i % 2 else 1) * int(d) for i, d in enumerate(digits)) % 10:
+            raise RowError(f"invalid ISBN-13 check digit: {value}")
+        return digits
+    raise RowError(f"not an ISBN: {value}")
+
+
+def clean_row(fields, files_dir):
+    """
+    Validate one row.
+
+    Returns:
+        dict of LibraryBook field values, plus 'cover' and 'pdf' absolute
+        paths when given
+
+    Raises:
+        RowError
+    """
+    title = fields.get('title', '')
+    author = fields.get('author', '')
+    if not title or not author:
+        raise RowError("title and author are required")
+    max_length = LibraryBook._meta.get_field('title').max_length
+    if len(title) > max_length or len(author) > max_length:
+        raise RowError(f"title and author must be at most {max_length} characters")
+
+    book = {
+        'title': title,
+        'author': author,
+        'isbn': normalize_isbn(fields['isbn']) if fields.get('isbn') else None,
+        'description': fields.get('description', ''),
+        'external_link': fields.get('external_link') or None,
+    }
+
+    category = fields.get('category', '')
+    book['category'] = CATEGORIES.get(normalize(category)) if category else None
+    if category and book['category'] is None:
+        raise RowError(f"unknown category: {category}")
+
+    year = fields.get('published_year', '')
+    if year:
+        try:
+            book['published_year'] = int(year)
+        except ValueError:
+            raise RowError(f"year is not a number: {year}")
+        if not 1400 <= book['published_year'] <= date.today().year + 1:
+            raise RowError(f"implausible year: {year}")
+    else:
+        book['published_year'] = None
+
+    for name in ('cover', 'pdf'):
+        if fields.get(name):
+            path = os.path.normpath(os.path.join(files_dir, fields[name]))
+            if not os.path.isfile(path):
+                raise RowError(f"{name} file not found: {fields[name]}")
+            book[name] = path
+    return book
+
+
+def title_author_key(title, author):
+    return f'{normalize(title)}\x00{normalize(author)}'
+
+
+class Catalog:
+    """
+    In-memory lookup of existing books by ISBN and by title + author, to
+    match import rows without a query per row.
+    """
+
+    def __init__(self):
+        self.by_isbn = {}
+        self.by_title_author = {}
+        for book_id, isbn, title, author in LibraryBook.objects.values_list('id', 'isbn', 'title', 'author').iterator(chunk_size=5000):
+            self.add(book_id, isbn, title, author)
+
+    def add(self, book_id, isbn, title, author):
+        if isbn:
+            try:
+                self.by_isbn.setdefault(normalize_isbn(isbn), book_id)
+            except RowError:
+                pass
+        self.by_title_author.setdefault(title_author_key(title, author), book_id)
+
+    def match(self, book):
+        """Id of the existing book ``book`` describes, or None."""
+        if book['isbn'] and book['isbn'] in self.by_isbn:
+            return self.by_isbn[book['isbn']]
+        return self.by_title_author.get(title_author_key(book['title'], book['author']))
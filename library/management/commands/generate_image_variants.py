@@ -0,0 +1,118 @@
+"""
+Create resized JPEG/WebP variants of existing book covers and event images
+(new uploads get them when saved), and of the bundled frontend images.
+
+    python manage.py generate_image_variants --workers 4
+Redo every image, e.g. after changing VARIANT_WIDTHS:
+    python manage.py generate_image_variants --force
+Frontend images (frontend/images/*.jpg), printing their srcset:
+    python manage.py generate_image_variants --static
+"""
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from events.models import Event
+from library.models import LibraryBook
+from mindbridge_app.images import FORMATS, delete_variants, render_variants, store_variants, variant_name
+
+# (model, image field, variants field)
+TARGETS = (
+    (LibraryBook, 'cover_image', 'cover_variants'),
+    (Event, 'image', 'image_variants'),
+)
+STATIC_PATTERNS = ('*.jpg', '*.jpeg', '*.png')
+VARIANT_FILE_RE = re.compile(r'\.\d+w\.[0-9a-f]{8}\.(jpg|webp)$')
+
+
+class Command(BaseCommand):
+    help = "Backfill resized JPEG/WebP variants of uploaded and bundled images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=max(settings.IMAGE_WORKERS, 1),
+                            help="Image processes")
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help="Images rendered concurrently per batch")
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate variants that are already up to date")
+        parser.add_argument('--static', action='store_true',
+                            help="Process frontend/images instead of uploaded media")
+
+    def handle(self, *args, **options):
+        # Children must not share the parent's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            if options['static']:
+                self.static_images(pool)
+                return
+            for model, image_field, variants_field in TARGETS:
+                self.backfill(pool, model, image_field, variants_field, options)
+
+    def backfill(self, pool, model, image_field, variants_field, options):
+        started = time.perf_counter()
+        done = failed = 0
+        rows = (
+            model.objects.exclude(**{image_field: ''}).exclude(**{f'{image_field}__isnull': True})
+            .order_by('id').values_list('id', image_field, variants_field)
+        )
+        stale = [
+            (pk, name, variants) for pk, name, variants in rows.iterator(chunk_size=2000)
+            if options['force'] or (variants or {}).get('source') != name
+        ]
+        storage = model._meta.get_field(image_field).storage
+        for start in range(0, len(stale), options['batch_size']):
+            batch = stale[start:start + options['batch_size']]
+            futures = []
+            for pk, name, variants in batch:
+                try:
+                    with storage.open(name, 'rb') as handle:
+                        futures.append((pk, name, variants, pool.submit(render_variants, handle.read())))
+                except OSError as e:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {pk}: cannot read {name}: {e}")
+            for pk, name, variants, future in futures:
+                try:
+                    rendered = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {pk}: cannot resize {name}: {e}")
+                    continue
+                delete_variants(storage, variants)
+                model.objects.filter(pk=pk).update(**{variants_field: store_variants(storage, name, rendered)})
+                done += 1
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{model.__name__}: {done}/{len(stale)} image(s), {done / elapsed:.1f}/s")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{model._meta.verbose_name_plural}: {done} image(s) processed, {failed} failed"
+        ))
+
+    def static_images(self, pool):
+        directory = settings.FRONTEND_DIR / 'images'
+        sources = sorted(
+            path for pattern in STATIC_PATTERNS for path in directory.glob(pattern)
+            if not VARIANT_FILE_RE.search(path.name)
+        )
+        futures = [(path, pool.submit(render_variants, path.read_bytes())) for path in sources]
+        for path, future in futures:
+            rendered = future.result()
+            keep = set()
+            srcsets = {key: [] for key in FORMATS}
+            for width, _, encoded in rendered:
+                for key, data in encoded.items():
+                    target = directory / variant_name(path.name, width, data, key)
+                    if not target.exists():
+                        target.write_bytes(data)
+                    keep.add(target.name)
+                    srcsets[key].append(f"/static/images/{target.name} {width}w")
+            # Variants of an earlier version of this image
+            for old in directory.glob(f'{path.stem}.*w.*'):
+                if VARIANT_FILE_RE.search(old.name) and old.name not in keep:
+                    old.unlink()
+            self.stdout.write(path.name)
+            for key, entries in srcsets.items():
+                self.stdout.write(f"  {key}: {', '.join(entries)}")
@@ -0,0 +1,246 @@
+"""
+Import library books in bulk from a CSV or JSON Lines file.
+
+    python manage.py import_library catalog.csv --files-dir /mnt/catalog
+    python manage.py import_library catalog.jsonl --batch-size 1000 --workers 4
+Validate and match only, writing nothing but the reject report:
+    python manage.py import_library catalog.csv --dry-run
+
+See library/importer.py for the columns and how rows are matched to
+existing books. Each batch is written in one transaction with bulk_create /
+bulk_update, so no save signals run: the in-process search indexes of
+running web workers pick the new books up when they restart (MySQL FULLTEXT
+search sees them at once), while the suggestion indexes are marked stale
+after each batch and rebuilt on their next lookup. Covers are resized on a
+process pool; rejected rows are listed in <file>.rejects.csv.
+"""
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from library import suggest
+from library.importer import UPDATE_FIELDS, Catalog, RowError, clean_row, read_rows, title_author_key
+from library.models import LibraryBook
+from mindbridge_app.images import delete_variants, render_variants, store_variants
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+class Command(BaseCommand):
+    help = "Bulk import library books from a CSV or JSONL catalog file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help="CSV or JSONL file with one book per row")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="File format (default: from the file extension)")
+        parser.add_argument('--files-dir',
+                            help="Directory cover and PDF paths are relative to (default: the file's directory)")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Rows validated and written per transaction")
+        parser.add_argument('--workers', type=int, default=max(settings.IMAGE_WORKERS, 1),
+                            help="Cover resizing processes; 0 resizes in this process")
+        parser.add_argument('--rejects',
+                            help="Reject report path (default: <file>.rejects.csv)")
+        parser.add_argument('--skip-existing', action='store_true',
+                            help="Leave books already in the library unchanged instead of updating them")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Validate and match rows without writing books or files")
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not os.path.isfile(path):
+            raise CommandError(f"No such file: {path}")
+        file_format = options['format'] or FORMATS.get(os.path.splitext(path)[1].lower())
+        if file_format is None:
+            raise CommandError("Cannot tell the format from the extension; pass --format csv or --format jsonl")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        self.files_dir = options['files_dir'] or os.path.dirname(os.path.abspath(path))
+        self.options = options
+        self.counts = {'created': 0, 'updated': 0, 'skipped': 0}
+        self.rejects = []
+
+        catalog = Catalog()
+        # normalized ISBN / title + author -> line of its first row in this file
+        seen = {}
+        self.pool = None
+        if options['workers'] > 0 and not options['dry_run']:
+            # Children must not share the parent's database connections
+            connections.close_all()
+            self.pool = ProcessPoolExecutor(max_workers=options['workers'])
+
+        started = time.perf_counter()
+        processed = 0
+        batch = []
+        try:
+            for line, fields in read_rows(path, file_format):
+                processed += 1
+                entry = self.validate(line, fields, catalog, seen)
+                if entry is not None:
+                    batch.append(entry)
+                if len(batch) >= options['batch_size']:
+                    self.write_batch(batch)
+                    batch = []
+                    self.progress(processed, started)
+            if batch:
+                self.write_batch(batch)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+        self.progress(processed, started)
+
+        if self.rejects:
+            report = options['rejects'] or f'{path}.rejects.csv'
+            with open(report, 'w', newline='', encoding='utf-8') as handle:
+                writer = csv.writer(handle)
+                writer.writerow(['line', 'title', 'author', 'isbn', 'reason'])
+                writer.writerows(sorted(self.rejects))
+            self.stdout.write(self.style.WARNING(f"{len(self.rejects)} row(s) rejected, see {report}"))
+        verb = "Would import" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {processed} row(s): {self.counts['created']} created, {self.counts['updated']} updated, "
+            f"{self.counts['skipped']} skipped, {len(self.rejects)} rejected"
+        ))
+
+    def reject(self, line, fields, reason):
+        self.rejects.append((line, fields.get('title', ''), fields.get('author', ''), fields.get('isbn', ''), reason))
+
+    def validate(self, line, fields, catalog, seen):
+        """Returns (line, fields, cleaned book, existing book id or None), or None if rejected."""
+        if isinstance(fields, RowError):
+            self.reject(line, {}, str(fields))
+            return None
+        try:
+            book = clean_row(fields, self.files_dir)
+        except RowError as e:
+            self.reject(line, fields, str(e))
+            return None
+
+        keys = [title_author_key(book['title'], book['author'])]
+        if book['isbn']:
+            keys.append(book['isbn'])
+        first = next((seen[key] for key in keys if key in seen), None)
+        if first is not None:
+            self.reject(line, fields, f"duplicate of line {first}")
+            return None
+        for key in keys:
+            seen[key] = line
+
+        existing_id = catalog.match(book)
+        if existing_id is not None and self.options['skip_existing']:
+            self.counts['skipped'] += 1
+            return None
+        return line, fields, book, existing_id
+
+    def write_batch(self, batch):
+        if self.options['dry_run']:
+            for _, _, _, existing_id in batch:
+                self.counts['updated' if existing_id else 'created'] += 1
+            return
+
+        existing = LibraryBook.objects.in_bulk([entry[3] for entry in batch if entry[3]])
+        stored = self.store_files(batch)
+        new_books, updated_books, replaced_variants = [], [], []
+        update_fields = set()
+        now = timezone.now()
+        for line, fields, book, existing_id in batch:
+            if line not in stored:
+                continue
+            files = stored[line]
+            if existing_id is None or existing_id not in existing:
+                new_books.append(LibraryBook(
+                    title=book['title'], author=book['author'], isbn=book['isbn'],
+                    category=book['category'] or 'other', published_year=book['published_year'],
+                    description=book['description'], external_link=book['external_link'], **files,
+                ))
+                continue
+            instance = existing[existing_id]
+            # Columns left empty keep the current value
+            changed = [name for name in UPDATE_FIELDS if book[name] not in (None, '')]
+            for name in changed:
+                setattr(instance, name, book[name])
+            if 'cover_image' in files:
+                replaced_variants.append(instance.cover_variants)
+            for name, value in files.items():
+                setattr(instance, name, value)
+            instance.updated_at = now
+            update_fields.update(changed, files, ['updated_at'])
+            updated_books.append(instance)
+
+        try:
+            with transaction.atomic():
+                LibraryBook.objects.bulk_create(new_books)
+                if updated_books:
+                    LibraryBook.objects.bulk_update(updated_books, sorted(update_fields))
+        except DatabaseError as e:
+            for line, fields, _, _ in batch:
+                if line in stored:
+                    self.reject(line, fields, f"database error: {e}")
+            return
+        suggest.bump_index_version()
+        storage = LibraryBook._meta.get_field('cover_image').storage
+        for variants in replaced_variants:
+            delete_variants(storage, variants)
+        self.counts['created'] += len(new_books)
+        self.counts['updated'] += len(updated_books)
+
+    def store_files(self, batch):
+        """
+        Copy the batch's covers and PDFs into media storage and resize the
+        covers on the pool.
+
+        Returns:
+            {line: {model field: value}} for the rows whose files were stored
+        """
+        cover_field = LibraryBook._meta.get_field('cover_image')
+        pdf_field = LibraryBook._meta.get_field('pdf_file')
+        stored = {}
+        renders = []
+        for line, fields, book, _ in batch:
+            files = {}
+            try:
+                if 'pdf' in book:
+                    files['pdf_file'] = self.copy(pdf_field, book['pdf'])
+                if 'cover' in book:
+                    files['cover_image'] = self.copy(cover_field, book['cover'])
+                    with open(book['cover'], 'rb') as handle:
+                        data = handle.read()
+                    if self.pool is not None:
+                        renders.append((line, fields, files, self.pool.submit(render_variants, data)))
+                    else:
+                        renders.append((line, fields, files, data))
+            except OSError as e:
+                self.reject(line, fields, f"cannot copy file: {e}")
+                continue
+            stored[line] = files
+
+        for line, fields, files, result in renders:
+            try:
+                rendered = result.result() if self.pool is not None else render_variants(result)
+            except Exception as e:
+                # The cover is kept; generate_image_variants retries it
+                self.stderr.write(f"Line {line}: cannot resize {files['cover_image']}: {e}")
+                files['cover_variants'] = {}
+                continue
+            files['cover_variants'] = store_variants(cover_field.storage, files['cover_image'], rendered)
+        return stored
+
+    @staticmethod
+    def copy(field, source):
+        with open(source, 'rb') as handle:
+            return field.storage.save(field.generate_filename(None, os.path.basename(source)), File(handle))
+
+    def progress(self, processed, started):
+        elapsed = time.perf_counter() - started
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{processed} row(s): {self.counts['created']} created, {self.counts['updated']} updated, "
+            f"{len(self.rejects)} rejected ({rate:.0f} rows/s)"
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibraryBook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('author', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('psychology', 'Psychology'), ('self_help', 'Self Help'), ('mental_health', 'Mental Health'), ('wellbeing', 'Wellbeing'), ('mindfulness', 'Mindfulness'), ('other', 'Other')], default='other', max_length=50)),
+                ('cover_image', models.ImageField(blank=True, null=True, upload_to='library/covers/')),
+                ('pdf_file', models.FileField(blank=True, null=True, upload_to='library/pdfs/')),
+                ('external_link', models.URLField(blank=True, help_text='External link to book resource', null=True)),
+                ('isbn', models.CharField(blank=True, max_length=13, null=True)),
+                ('published_year', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Library Book',
+                'verbose_name_plural': 'Library Books',
+                'db_table': 'library_books',
+                'ordering': ['title'],
+            },
+        ),
+    ]
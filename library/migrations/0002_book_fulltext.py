@@ -0,0 +1,32 @@
+from django.db import migrations
+
+FULLTEXT_INDEXES = {
+    'library_books_text_ft': 'title, author, description',
+    'library_books_title_ft': 'title',
+    'library_books_author_ft': 'author',
+    'library_books_description_ft': 'description',
+}
+
+
+def add_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        for name, columns in FULLTEXT_INDEXES.items():
+            schema_editor.execute(f'CREATE FULLTEXT INDEX {name} ON library_books ({columns})')
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        for name in FULLTEXT_INDEXES:
+            schema_editor.execute(f'DROP INDEX {name} ON library_books')
+
+
+class Migration(migrations.Migration):
+    """FULLTEXT indexes for catalog search (MySQL only; other databases use the in-process index)."""
+
+    dependencies = [
+        ('library', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_indexes, drop_fulltext_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0002_book_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='librarybook',
+            name='cover_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized JPEG/WebP copies of the cover'),
+        ),
+    ]
@@ -19,6 +19,7 @@ class LibraryBook(models.Model):
     description = models.TextField()
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='other')
     cover_image = models.ImageField(upload_to='library/covers/', blank=True, null=True)
+    cover_variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized JPEG/WebP copies of the cover")
     pdf_file = models.FileField(upload_to='library/pdfs/', blank=True, null=True)
     external_link = models.URLField(blank=True, null=True, help_text="External link to book resource")
     isbn = models.CharField(max_length=13, blank=True, null=True)
@@ -0,0 +1,85 @@
+"""
+Ranked catalog search.
+
+On MySQL the title, author and description FULLTEXT indexes are queried with
+MATCH ... AGAINST in natural language mode and the relevances are combined
+with the field boosts. On other databases (SQLite in development and tests)
+an in-process InvertedIndex with the same boosts is built from the catalog
+on first use and kept current by the LibraryBook signals. Either way a
+search only reads the books containing the search words, so its cost does
+not grow with the catalog. SEARCH_BACKEND ('auto', 'fulltext' or 'memory')
+overrides the choice.
+"""
+import threading
+
+from django.db.models.expressions import RawSQL
+
+from mindbridge_app.search import InvertedIndex, use_fulltext
+
+from .models import LibraryBook
+
+# A title match outranks an author match, which outranks a description match
+FIELD_BOOSTS = {'title': 3.0, 'author': 2.0, 'description': 1.0}
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def search_book_ids(query, category=None):
+    """
+    Ids of books matching ``query``, most relevant first.
+
+    Returns:
+        a list of ids, or (with FULLTEXT) a lazy ids queryset; both can be
+        paginated
+    """
+    if use_fulltext():
+        books = LibraryBook.objects.all()
+        if category:
+            books = books.filter(category=category)
+        # The combined index finds the matches; the per-field ones rank them
+        matches = RawSQL('MATCH (title, author, description) AGAINST (%s IN NATURAL LANGUAGE MODE)', (query,))
+        relevance = RawSQL(
+            ' + '.join(
+                f'{boost} * MATCH ({field}) AGAINST (%s IN NATURAL LANGUAGE MODE)'
+                for field, boost in FIELD_BOOSTS.items()
+            ),
+            (query,) * len(FIELD_BOOSTS),
+        )
+        return (
+            books.annotate(matches=matches, relevance=relevance)
+            .filter(matches__gt=0)
+            .order_by('-relevance', 'id')
+            .values_list('id', flat=True)
+        )
+
+    filter = (lambda meta: meta['category'] == category) if category else None
+    return [book_id for book_id, _ in get_index().search(query, filter=filter)]
+
+
+def get_index():
+    """The in-process catalog index, built on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = InvertedIndex(boosts=FIELD_BOOSTS)
+                rows = LibraryBook.objects.values_list('id', 'title', 'author', 'description', 'category')
+                for book_id, title, author, description, category in rows.iterator(chunk_size=2000):
+                    index.add(book_id, {'title': title, 'author': author, 'description': description}, category=category)
+                _index = index
+    return _index
+
+
+def sync_books(book_ids):
+    """Re-index the given books; deleted ones are removed."""
+    if _index is None:
+        # Not built in this process yet; it will be read fresh
+        return
+    rows = LibraryBook.objects.filter(id__in=book_ids).values_list('id', 'title', 'author', 'description', 'category')
+    seen = set()
+    for book_id, title, author, description, category in rows:
+        seen.add(book_id)
+        _index.add(book_id, {'title': title, 'author': author, 'description': description}, category=category)
+    for book_id in set(book_ids) - seen:
+        _index.remove(book_id)
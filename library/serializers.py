@@ -1,17 +1,34 @@
+from django.urls import reverse
 from rest_framework import serializers
+
+from mindbridge_app.images import srcset
 from .models import LibraryBook
 
 
 class LibraryBookSerializer(serializers.ModelSerializer):
     has_pdf = serializers.BooleanField(read_only=True)
     has_link = serializers.BooleanField(read_only=True)
+    pdf_url = serializers.SerializerMethodField()
+    cover_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = LibraryBook
         fields = [
             'id', 'title', 'author', 'description', 'category',
-            'cover_image', 'pdf_file', 'external_link', 
-            'isbn', 'published_year', 'has_pdf', 'has_link',
+            'cover_image', 'cover_srcset', 'pdf_file', 'external_link', 
+            'pdf_url', 'isbn', 'published_year', 'has_pdf', 'has_link',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+    
+    def get_pdf_url(self, obj):
+        """Range-capable PDF endpoint (LibraryBookViewSet.pdf)."""
+        if not obj.pdf_file:
+            return None
+        url = reverse('library-pdf', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
+    def get_cover_srcset(self, obj):
+        """{'webp': srcset, 'jpeg': srcset} of the resized covers, or None."""
+        return srcset(obj.cover_variants, obj.cover_image.storage, self.context.get('request'))
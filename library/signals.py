@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from mindbridge_app.images import sync_variants
+
+from . import search, suggest
+from .models import LibraryBook
+
+
+@receiver(post_save, sender=LibraryBook)
+@receiver(post_delete, sender=LibraryBook)
+def book_changed(sender, instance, **kwargs):
+    """Keep the in-process search and suggestion indexes current."""
+    book_id = instance.pk
+    transaction.on_commit(lambda: search.sync_books([book_id]))
+    transaction.on_commit(lambda: suggest.sync_books([book_id]))
+
+
+@receiver(post_save, sender=LibraryBook)
+def cover_saved(sender, instance, raw=False, **kwargs):
+    """Create the resized variants of a new or replaced cover."""
+    if not raw:
+        sync_variants(instance, 'cover_image', 'cover_variants')
@@ -0,0 +1,201 @@
+"""
+Typeahead suggestions for the library search box.
+
+An in-process sorted list of (normalized text, book id) entries answers
+prefix lookups with a binary search: every title and author is entered
+whole, and every later word of it is entered as the start of a suffix, so
+'work' finds 'The Anxiety Workbook'. Matches at the start of a title or
+author are returned before matches on a later word.
+
+The index is built on first use from LibraryBook.objects.values_list() and
+kept current by the LibraryBook signals. Every process holds its own copy,
+so a version number in the cache tells them apart: changing books (signals,
+import_library) bumps it, and a process whose index was built for an older
+version rebuilds it on its next lookup.
+"""
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+
+from .models import LibraryBook
+
+VERSION_KEY = 'library:suggest_version'
+
+NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize(text):
+    """Lowercase, accents removed, runs of punctuation and spaces collapsed."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return NON_WORD_RE.sub(' ', text.lower()).strip()
+
+
+class PrefixIndex:
+    """Thread-safe sorted prefix index of book titles and authors."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.starts = []    # (whole normalized title or author, book id), sorted
+        self.words = []     # (normalized suffix from a later word, book id), sorted
+        self.books = {}     # book id -> (title, author)
+        self.version = None  # index_version() the index is current for
+
+    def __len__(self):
+        return len(self.books)
+
+    @staticmethod
+    def _entries(title, author):
+        starts, words = set(), set()
+        for text in (title, author):
+            normalized = normalize(text)
+            if not normalized:
+                continue
+            starts.add(normalized)
+            for match in re.finditer(' ', normalized):
+                words.add(normalized[match.end():])
+        return starts, words
+
+    def add(self, book_id, title, author, presorted=False):
+        """Index (or re-index) a book. ``presorted`` skips sorting for bulk loads."""
+        with self.lock:
+            self._remove(book_id)
+            starts, words = self._entries(title, author)
+            for entries, keys in ((self.starts, starts), (self.words, words)):
+                for key in keys:
+                    if presorted:
+                        entries.append((key, book_id))
+                    else:
+                        insort(entries, (key, book_id))
+            self.books[book_id] = (title, author)
+
+    def remove(self, book_id):
+        with self.lock:
+            self._remove(book_id)
+
+    def _remove(self, book_id):
+        book = self.books.pop(book_id, None)
+        if book is None:
+            return
+        starts, words = self._entries(*book)
+        for entries, keys in ((self.starts, starts), (self.words, words)):
+            for key in keys:
+                position = bisect_left(entries, (key, book_id))
+                if position < len(entries) and entries[position] == (key, book_id):
+                    del entries[position]
+
+    def sort(self):
+        with self.lock:
+            self.starts.sort()
+            self.words.sort()
+
+    def suggest(self, prefix, limit=8):
+        """
+        Returns:
+            up to ``limit`` (book id, title, author) tuples whose title or
+            author starts with ``prefix`` (or has a word that does)
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        found = {}
+        with self.lock:
+            for entries in (self.starts, self.words):
+                position = bisect_left(entries, (prefix,))
+                while len(found) < limit and position < len(entries):
+                    key, book_id = entries[position]
+                    if not key.startswith(prefix):
+                        break
+                    found.setdefault(book_id, self.books[book_id])
+                    position += 1
+            return [(book_id, title, author) for book_id, (title, author) in found.items()]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def index_version():
+    """Current version of the books, shared by all processes (created on first use)."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so a lost version key never matches an old index
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_index_version():
+    """
+    Mark every process's index stale; call after books change.
+
+    Returns:
+        the new version, or None if the key had to be recreated
+    """
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # Key missing (evicted or never created)
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+        return None
+
+
+def _build(version):
+    index = PrefixIndex()
+    for book_id, title, author in LibraryBook.objects.values_list('id', 'title', 'author').iterator(chunk_size=2000):
+        index.add(book_id, title, author, presorted=True)
+    index.sort()
+    index.version = version
+    return index
+
+
+def get_index():
+    """
+    The in-process prefix index, built on first use and rebuilt when books
+    were changed since (by this or another process).
+    """
+    global _index
+    # Read before building: a change made during the build bumps it again
+    version = index_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    if index is not None:
+        # One thread rebuilds; the others keep answering from the stale index
+        if not _index_lock.acquire(blocking=False):
+            return index
+    else:
+        _index_lock.acquire()
+    try:
+        if _index is None or _index.version != version:
+            _index = _build(version)
+        return _index
+    finally:
+        _index_lock.release()
+
+
+def sync_books(book_ids):
+    """
+    Re-index the given books (deleted ones are removed) and tell the other
+    processes to rebuild theirs.
+    """
+    index = _index
+    if index is None:
+        bump_index_version()
+        return
+    rows = LibraryBook.objects.filter(id__in=book_ids).values_list('id', 'title', 'author')
+    seen = set()
+    for book_id, title, author in rows:
+        seen.add(book_id)
+        index.add(book_id, title, author)
+    for book_id in set(book_ids) - seen:
+        index.remove(book_id)
+    current = index.version
+    version = bump_index_version()
+    if current is not None and version == current + 1:
+        # Nothing else changed in between: this index is already current
+        index.version = version
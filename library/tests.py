@@ -0,0 +1,88 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from . import suggest
+from .models import LibraryBook
+
+
+class SuggestIndexTest(TestCase):
+    """The suggestion index picks up changes made by other processes."""
+
+    def setUp(self):
+        suggest._index = None
+        self.book = LibraryBook.objects.create(title='The Anxiety Workbook', author='Jane Doe')
+
+    def tearDown(self):
+        suggest._index = None
+
+    def titles(self, prefix):
+        return [title for _, title, _ in suggest.get_index().suggest(prefix)]
+
+    def test_changes_without_signals(self):
+        self.assertEqual(self.titles('work'), ['The Anxiety Workbook'])
+        # As import_library writes: no signals, then a version bump
+        LibraryBook.objects.filter(pk=self.book.pk).update(title='Sleep Better')
+        LibraryBook.objects.bulk_create([LibraryBook(title='Mindful Work', author='Ann Lee')])
+        self.assertEqual(self.titles('work'), ['The Anxiety Workbook'])
+        suggest.bump_index_version()
+        self.assertEqual(self.titles('work'), ['Mindful Work'])
+        self.assertEqual(self.titles('sleep'), ['Sleep Better'])
+
+    def test_own_changes_do_not_rebuild(self):
+        index = suggest.get_index()
+        self.book.title = 'Sleep Better'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.save()
+        self.assertIs(suggest.get_index(), index)
+        self.assertEqual(self.titles('sleep'), ['Sleep Better'])
+
+
+class CoverVariantsTest(TestCase):
+    """Cover variants change only when the new cover is committed."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(MEDIA_ROOT=media, IMAGE_WORKERS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.storage = LibraryBook._meta.get_field('cover_image').storage
+        self.book = LibraryBook(title='The Anxiety Workbook', author='Jane Doe')
+        self.set_cover('calm.jpg')
+
+    def set_cover(self, name, commit=True):
+        image = io.BytesIO()
+        Image.new('RGB', (400, 600), 'blue').save(image, 'JPEG')
+        self.book.cover_image.save(name, ContentFile(image.getvalue()), save=False)
+        with self.captureOnCommitCallbacks(execute=commit):
+            self.book.save()
+
+    def variant_files(self, variants):
+        return [entry['webp'] for entry in variants['variants']]
+
+    def test_rollback_keeps_variants(self):
+        old = LibraryBook.objects.get(pk=self.book.pk).cover_variants
+        self.assertTrue(old['variants'])
+        try:
+            with transaction.atomic():
+                self.set_cover('other.jpg', commit=False)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(LibraryBook.objects.get(pk=self.book.pk).cover_variants, old)
+        self.assertTrue(all(self.storage.exists(name) for name in self.variant_files(old)))
+
+    def test_replaced_cover(self):
+        old = LibraryBook.objects.get(pk=self.book.pk).cover_variants
+        self.set_cover('other.jpg')
+        new = LibraryBook.objects.get(pk=self.book.pk).cover_variants
+        self.assertEqual(new['source'], self.book.cover_image.name)
+        self.assertEqual(self.book.cover_variants, new)
+        self.assertFalse(any(self.storage.exists(name) for name in self.variant_files(old)))
+        self.assertTrue(all(self.storage.exists(name) for name in self.variant_files(new)))
@@ -1,7 +1,13 @@
 from django.shortcuts import render, get_object_or_404
+from django.http import Http404
 from django.contrib.auth.decorators import login_required
 from rest_framework import viewsets, permissions, filters
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .delivery import serve_file
 from .models import LibraryBook
+from .search import search_book_ids
+from .suggest import get_index as get_suggest_index
 from .serializers import LibraryBookSerializer
 
 
@@ -15,8 +21,7 @@ class LibraryBookViewSet(viewsets.ModelViewSet):
     queryset = LibraryBook.objects.all()
     serializer_class = LibraryBookSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'author', 'description', 'category']
+    filter_backends = [filters.OrderingFilter]
     ordering_fields = ['title', 'author', 'created_at']
     ordering = ['title']
     
@@ -28,6 +33,67 @@ class LibraryBookViewSet(viewsets.ModelViewSet):
             return [permissions.IsAuthenticated()]
         return super().get_permissions()
     
+    def list(self, request, *args, **kwargs):
+        """
+        ?search= returns the matching books (optionally within ?category=),
+        most relevant first: title matches rank above author matches, which
+        rank above description matches.
+        """
+        query = request.query_params.get('search', '').strip()
+        if query:
+            return self._search(request, query)
+        return super().list(request, *args, **kwargs)
+    
+    def _search(self, request, query):
+        ids = self.paginate_queryset(search_book_ids(query, request.query_params.get('category')))
+        books = LibraryBook.objects.in_bulk(ids)
+        serializer = self.get_serializer([books[book_id] for book_id in ids if book_id in books], many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    def perform_content_negotiation(self, request, force=False):
+        # PDF viewers ask for application/pdf; errors are still sent as JSON
+        return super().perform_content_negotiation(request, force=force or self.action == 'pdf')
+    
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def pdf(self, request, pk=None):
+        """
+        The book's PDF, for signed-in users. Supports Range requests and
+        ETag revalidation, or hands the transfer to the web server
+        (LIBRARY_SENDFILE); see delivery.py.
+        """
+        book = self.get_object()
+        response = serve_file(request, book.pdf_file) if book.pdf_file else None
+        if response is None:
+            raise Http404("This book has no PDF")
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """
+        Typeahead: books whose title or author starts with ?prefix= (or has a
+        word that does). Served from memory without a database query (one
+        cache read checks that the index is current).
+        Query params: prefix, limit (default 8, at most 20).
+        """
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 8)), 20))
+        except ValueError:
+            limit = 8
+        suggestions = get_suggest_index().suggest(request.query_params.get('prefix', ''), limit)
+        return Response({
+            'results': [
+                {'id': book_id, 'title': title, 'author': author}
+                for book_id, title, author in suggestions
+            ],
+        })
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        category = self.request.query_params.get('category')
+        if category and self.action == 'list':
+            queryset = queryset.filter(category=category)
+        return queryset
+    
     def perform_create(self, serializer):
         # Only wellness team can create books
         if hasattr(self.request.user, 'is_wellness_team') and self.request.user.is_wellness_team:
@@ -48,13 +114,15 @@ def library_list(request):
     category = request.GET.get('category')
     search = request.GET.get('search')
     
-    books = LibraryBook.objects.all()
-    
-    if category:
-        books = books.filter(category=category)
-    
     if search:
-        books = books.filter(title__icontains=search) | books.filter(author__icontains=search)
+        # Most relevant first
+        ids = list(search_book_ids(search, category))
+        found = LibraryBook.objects.in_bulk(ids)
+        books = [found[book_id] for book_id in ids if book_id in found]
+    else:
+        books = LibraryBook.objects.all()
+        if category:
+            books = books.filter(category=category)
     
     categories = LibraryBook.CATEGORY_CHOICES
     
@@ -6,7 +6,10 @@ from rest_framework.routers import DefaultRouter
 from bookings.views import BookingViewSet
 from posts.views import PostViewSet
 from library.views import LibraryBookViewSet
-from events.views import EventViewSet, EventRegistrationViewSet
+from events.views import (
+    EventViewSet, EventRegistrationViewSet,
+    calendar_feed_url, public_events_feed, user_calendar_feed,
+)
 
 # Create router and register viewsets
 router = DefaultRouter()
@@ -18,4 +21,8 @@ router.register(r'event-registrations', EventRegistrationViewSet, basename='even
 
 urlpatterns = [
     path('', include(router.urls)),
+    # iCalendar feeds
+    path('calendar/feed-url/', calendar_feed_url, name='calendar-feed-url'),
+    path('calendar/events.ics', public_events_feed, name='calendar-events-feed'),
+    path('calendar/<str:token>/mindbridge.ics', user_calendar_feed, name='calendar-user-feed'),
 ]
@@ -0,0 +1,202 @@
+"""
+Responsive image variants for uploaded book covers and event images.
+
+Each uploaded image is rendered at every width in VARIANT_WIDTHS that is
+not wider than the original (or once at its own width if it is smaller),
+as JPEG and as WebP. The variants are stored next to the original with the
+width and a content hash in the name, so they can be cached forever:
+
+    library/covers/calm.jpg -> library/covers/calm.320w.3f9a1c2e.webp
+
+The list is kept on the model in a JSONField:
+
+    {'source': 'library/covers/calm.jpg',
+     'variants': [{'width': 160, 'height': 240, 'jpeg': '...', 'webp': '...'}, ...]}
+
+and the serializers expose it as srcset strings (srcset() below). Pillow
+runs in a process pool of IMAGE_WORKERS processes, started on first use, so
+decoding multi-megabyte photos does not happen in the web worker.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+VARIANT_WIDTHS = (160, 320, 640, 1280)
+# format key -> (Pillow format, file extension, save options)
+FORMATS = {
+    'jpeg': ('JPEG', '.jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', '.webp', {'quality': 80, 'method': 4}),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def render_variants(data, widths=VARIANT_WIDTHS):
+    """
+    Render the variants of an encoded image. Runs in the worker processes.
+
+    Returns:
+        list of (width, height, {format key: encoded bytes}), narrowest first
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEGs can be decoded at a reduced scale, much faster than in full
+        image.draft('RGB', (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        results = []
+        for width in sorted({min(width, image.width) for width in widths}):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize(
+                (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+            )
+            encoded = {}
+            for key, (pil_format, _, options) in FORMATS.items():
+                buffer = io.BytesIO()
+                resized.save(buffer, pil_format, **options)
+                encoded[key] = buffer.getvalue()
+            results.append((width, height, encoded))
+        return results
+
+
+def variant_name(source_name, width, data, key):
+    stem, _ = os.path.splitext(source_name)
+    digest = hashlib.sha1(data).hexdigest()[:8]
+    return f'{stem}.{width}w.{digest}{FORMATS[key][1]}'
+
+
+def store_variants(storage, source_name, rendered):
+    """Save render_variants() output next to ``source_name``; return the variants dict."""
+    variants = []
+    for width, height, encoded in rendered:
+        entry = {'width': width, 'height': height}
+        for key, data in encoded.items():
+            name = variant_name(source_name, width, data, key)
+            # Content-hashed: an existing file already holds these bytes
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(data))
+            entry[key] = name
+        variants.append(entry)
+    return {'source': source_name, 'variants': variants}
+
+
+def delete_variants(storage, variants):
+    for entry in (variants or {}).get('variants', []):
+        for key in FORMATS:
+            if entry.get(key):
+                storage.delete(entry[key])
+
+
+def get_pool():
+    """The image worker pool, or None to render in this process (IMAGE_WORKERS = 0)."""
+    global _pool
+    if settings.IMAGE_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a threaded web worker is not safe
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.IMAGE_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _pool
+
+
+def render(data):
+    global _pool
+    pool = get_pool()
+    if pool is None:
+        return render_variants(data)
+    try:
+        return pool.submit(render_variants, data).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a new pool next time
+        with _pool_lock:
+            _pool = None
+        raise
+
+
+def generate(field):
+    """Render and store the variants of an ImageField file; return the variants dict."""
+    with field.open('rb') as handle:
+        data = handle.read()
+    try:
+        rendered = render(data)
+    except BrokenProcessPool as e:
+        print(f"Could not create variants of {field.name}: {e}")
+        # No source recorded: the next save or generate_image_variants retries
+        return {}
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        print(f"Could not create variants of {field.name}: {e}")
+        rendered = []
+    return store_variants(field.storage, field.name, rendered)
+
+
+def sync_variants(instance, image_field, variants_field):
+    """
+    Regenerate the variants of ``instance.<image_field>`` if the image
+    changed since they were made, and save them with an UPDATE (no signals).
+
+    Runs once the transaction commits: until then the old variants still
+    belong to the stored image, and a rollback must not lose them.
+    """
+    transaction.on_commit(lambda: _sync_variants(instance, image_field, variants_field))
+
+
+def _sync_variants(instance, image_field, variants_field):
+    model = type(instance)
+    # The committed row: a later save in the same transaction may have
+    # changed the image again, or the row may be gone
+    stored = model.objects.filter(pk=instance.pk).only(image_field, variants_field).first()
+    if stored is None:
+        return
+    field = getattr(stored, image_field)
+    current = getattr(stored, variants_field) or {}
+    if (field.name or None) == current.get('source'):
+        setattr(instance, variants_field, current)
+        return
+    variants = generate(field) if field else {}
+    # Only if the image was not replaced meanwhile; that save regenerates
+    if not model.objects.filter(pk=instance.pk, **{image_field: field.name}).update(**{variants_field: variants}):
+        delete_variants(field.storage, variants)
+        return
+    delete_variants(field.storage, current)
+    setattr(instance, variants_field, variants)
+
+
+def srcset(variants, storage, request=None):
+    """
+    Returns:
+        {'webp': 'url 160w, url 320w, ...', 'jpeg': '...'}, or None if
+        there are no variants
+    """
+    entries = (variants or {}).get('variants')
+    if not entries:
+        return None
+    result = {}
+    for key in FORMATS:
+        urls = []
+        for entry in entries:
+            url = storage.url(entry[key])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls.append(f"{url} {entry['width']}w")
+        result[key] = ', '.join(urls)
+    return result
@@ -0,0 +1,203 @@
+"""
+Keyset (seek) pagination for large, append-heavy tables.
+
+DRF's CursorPagination positions on the first ordering field only and falls
+back to OFFSET within equal values. KeysetPagination seeks on the whole
+ordering tuple, e.g. WHERE (date, time, id) > (last date, last time, last
+id), so every page is an index range scan no matter how deep the client has
+paged, and no COUNT(*) is run.
+"""
+import base64
+import datetime
+import heapq
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination.
+
+    ``ordering`` must end with a unique field (normally 'id') and its fields
+    must not be NULL. Prefix a field with '-' for descending order.
+    """
+    ordering = ('id',)
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.seek_filter(self.decode_cursor(encoded, queryset.model)))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [getattr(last, field.lstrip('-')) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    def seek_filter(self, values):
+        """
+        Rows strictly after ``values`` in ``ordering``:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, values):
+        values = [value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value for value in values]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, encoded, model):
+        """
+        Values of the ordering fields in a cursor, converted with the model
+        fields' to_python(); a cursor that does not decode to one valid,
+        non-NULL value per field is rejected with 404.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        converted = []
+        for field, value in zip(self.ordering, values):
+            if value is None or isinstance(value, (list, dict)):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                value = model._meta.get_field(field.lstrip('-')).to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            converted.append(value)
+        return converted
+
+
+class QuerySetChain:
+    """
+    Several querysets read back to back as one sequence, so page-number
+    pagination can page across them (e.g. live rows, then archived rows).
+    Each page costs one query per queryset it touches, plus one COUNT per
+    queryset.
+    """
+
+    def __init__(self, *querysets):
+        self.querysets = querysets
+        self._counts = None
+
+    def counts(self):
+        if self._counts is None:
+            self._counts = [queryset.count() for queryset in self.querysets]
+        return self._counts
+
+    def count(self):
+        return sum(self.counts())
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            items = self[index:index + 1]
+            if not items:
+                raise IndexError(index)
+            return items[0]
+        start = index.start or 0
+        stop = index.stop
+        items = []
+        offset = 0
+        for queryset, count in zip(self.querysets, self.counts()):
+            if stop is not None and stop <= offset:
+                break
+            low = max(start - offset, 0)
+            high = count if stop is None else min(stop - offset, count)
+            if low < high:
+                items.extend(queryset[low:high])
+            offset += count
+        return items
+
+
+class MergedQuerySets:
+    """
+    Disjoint querysets read as one sequence in a common order, like a
+    UNION ALL ... ORDER BY ... LIMIT that each branch can answer from its
+    own index.
+
+    A slice [start:stop] reads the first ``stop`` (ordering values, pk) of
+    every queryset, ordered and LIMITed, so each is one index range scan
+    with no sort; merges them in Python; and loads the rows of the slice
+    with one query on ``rows``. OR-ing the filters instead would make the
+    database sort the whole result. ``ordering`` must end with 'id' and use
+    one direction throughout. ``count()`` runs one COUNT per queryset.
+    """
+
+    def __init__(self, *querysets, ordering, rows):
+        self.ordering = ordering
+        self.querysets = [queryset.order_by(*ordering) for queryset in querysets]
+        self.rows = rows
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = sum(queryset.count() for queryset in self.querysets)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            items = self[index:index + 1]
+            if not items:
+                raise IndexError(index)
+            return items[0]
+        start = index.start or 0
+        fields = [field.lstrip('-') for field in self.ordering]
+        branches = [
+            queryset.values_list(*fields) if index.stop is None else queryset.values_list(*fields)[:index.stop]
+            for queryset in self.querysets
+        ]
+        merged = heapq.merge(*branches, reverse=self.ordering[0].startswith('-'))
+        ids = [values[-1] for values in list(merged)[start:index.stop]]
+        rows = self.rows.in_bulk(ids)
+        return [rows[pk] for pk in ids if pk in rows]
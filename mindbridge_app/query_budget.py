@@ -0,0 +1,73 @@
+"""
+Query budgets for API endpoints.
+
+``assert_max_queries`` is the check the test suite runs against the API
+endpoints (see bookings/tests.py), so an N+1 regression fails CI.
+``QueryBudgetMixin`` declares a budget per ViewSet action; in DEBUG, or
+with QUERY_BUDGET_LOGGING on, requests over budget are logged with their
+queries. Live responses are never failed over it.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code runs more queries than its budget."""
+
+
+def _report(label, budget, queries):
+    sql = '\n'.join(f"  {i}. {query['sql']}" for i, query in enumerate(queries, 1))
+    return f"{label} ran {len(queries)} queries (budget {budget}):\n{sql}"
+
+
+@contextmanager
+def assert_max_queries(budget, label='Block'):
+    """
+    Fail if the wrapped block runs more than ``budget`` queries.
+
+    Usage:
+        with assert_max_queries(2, 'GET /api/bookings/'):
+            client.get('/api/bookings/')
+    """
+    with CaptureQueriesContext(connection) as context:
+        yield context
+    if len(context) > budget:
+        raise QueryBudgetExceeded(_report(label, budget, context.captured_queries))
+
+
+class QueryBudgetMixin:
+    """
+    ViewSet mixin that logs actions exceeding ``query_budgets`` (only in
+    DEBUG or when QUERY_BUDGET_LOGGING is on). Tests use the same budgets
+    with assert_max_queries.
+
+    Queries made while authenticating and checking permissions are not
+    counted, so the budget only covers the action and its serializer.
+
+        query_budgets = {'list': 2, 'retrieve': 1}
+    """
+    query_budgets = {}
+
+    def get_query_budget(self):
+        """Budget for the current request; override for budgets that depend on parameters."""
+        return self.query_budgets.get(self.action)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._query_budget = self.get_query_budget()
+        if self._query_budget is not None and (settings.DEBUG or settings.QUERY_BUDGET_LOGGING):
+            self._query_capture = CaptureQueriesContext(connection)
+            self._query_capture.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        capture = getattr(self, '_query_capture', None)
+        if capture is not None:
+            self._query_capture = None
+            capture.__exit__(None, None, None)
+            if len(capture) > self._query_budget:
+                message = _report(f"{request.method} {request.path}", self._query_budget, capture.captured_queries)
+                print(f"Query budget exceeded: {message}")
+        return super().finalize_response(request, response, *args, **kwargs)
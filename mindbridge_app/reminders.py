@@ -0,0 +1,94 @@
+"""
+Helpers for the reminder scheduler (python manage.py send_reminders).
+
+Rows are claimed in small batches with SELECT ... FOR UPDATE SKIP LOCKED and
+stamped with ``reminder_sent_at`` before any email goes out. Two scheduler
+runs that overlap therefore never pick the same row, and memory use is
+bounded by the batch size no matter how many rows are due. After sending,
+rows whose reminder did not go out are released (reminder_sent_at back to
+NULL) for the next run to retry.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .notifications import send_many
+
+
+def datetime_window_q(start, end, date_field='date', time_field='time'):
+    """
+    Q matching rows whose separate date and time columns fall in [start, end).
+
+    Written as date ranges plus time bounds on the first and last day, so a
+    (date, time) index can serve it as a range scan.
+    """
+    start_date, end_date = start.date(), end.date()
+    if start_date == end_date:
+        return Q(**{date_field: start_date, f'{time_field}__gte': start.time(), f'{time_field}__lt': end.time()})
+    return (
+        Q(**{date_field: start_date, f'{time_field}__gte': start.time()})
+        | Q(**{f'{date_field}__gt': start_date, f'{date_field}__lt': end_date})
+        | Q(**{date_field: end_date, f'{time_field}__lt': end.time()})
+    )
+
+
+def claim_unsent(queryset, batch_size):
+    """
+    Yield lists of at most ``batch_size`` rows from ``queryset`` (which must
+    filter on reminder_sent_at IS NULL), marking each batch as sent first.
+    Rows released while the batch was being sent are not claimed again in
+    this pass.
+    """
+    model = queryset.model
+    released = set()
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            pending = queryset.exclude(pk__in=released) if released else queryset
+            ids = list(
+                pending.select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return
+            model.objects.filter(pk__in=ids, reminder_sent_at__isnull=True).update(reminder_sent_at=now)
+        yield ids
+        released.update(model.objects.filter(pk__in=ids, reminder_sent_at__isnull=True).values_list('pk', flat=True))
+
+
+def release(model, ids):
+    """Mark claimed rows as unsent again."""
+    if ids:
+        model.objects.filter(pk__in=ids).update(reminder_sent_at=None)
+
+
+def send_claimed(rows, render):
+    """
+    Email the reminders of a claimed batch and release the rows whose
+    reminder was not sent.
+
+    Backends that report per-message results (GmailBackend sets
+    ``send_error``) release only the failed rows; if sending raises, the
+    whole batch is released, so a reminder may be sent twice but is never
+    lost.
+
+    Args:
+        rows: the claimed model instances
+        render: function returning the EmailMessage for a row
+
+    Returns:
+        int: number of reminders sent
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    model = type(rows[0])
+    try:
+        messages = [(row.pk, render(row)) for row in rows]
+        sent = send_many(message for _, message in messages)
+    except Exception as e:
+        print(f"Failed to send {len(rows)} {model._meta.verbose_name} reminder(s): {e}")
+        release(model, [row.pk for row in rows])
+        return 0
+    release(model, [pk for pk, message in messages if getattr(message, 'send_error', None) is not None])
+    return sent
@@ -0,0 +1,281 @@
+"""
+Crisis-language risk scoring for posts and booking reasons.
+
+A linear model over the distinct word n-grams (one to three words) of a
+text, stored as NumPy arrays:
+
+    score = sigmoid(bias + sum of lexicon phrase weights
+                         + sum of weights[feature(hash(n-gram))])
+
+The lexicon holds crisis phrases with a weight and a reason code such as
+'self_harm'; the codes of the phrases found are stored with the score. The
+hashed weights come from a trained model (the hashing trick) and are all
+zero in the built-in model, which is derived from the lexicon alone; a trained
+model saved with RiskModel.save() is used instead when RISK_MODEL_PATH
+points at its .npz file. Nothing is sent to an external service.
+
+Texts are scored in batches: the n-gram hashes of a whole batch are built
+with array operations, so one core scores thousands of documents per
+second. ``python manage.py score_risk`` runs the batches on a process pool.
+"""
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+FEATURE_BITS = 18
+N_FEATURES = 1 << FEATURE_BITS
+# Multiplier mapping n-gram hashes to feature indices (2**64 / golden ratio)
+FIBONACCI = np.uint64(11400714819323198485)
+MAX_NGRAM = 3
+# Combines token hashes into n-gram hashes (FNV-1 64-bit prime)
+NGRAM_PRIME = 1099511628211
+DEFAULT_BIAS = -3.0
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# reason code -> (weight, phrases of at most MAX_NGRAM words)
+LEXICON = {
+    'suicidal_ideation': (4.0, [
+        'suicide', 'suicidal', 'kill myself', 'killing myself', 'end my life',
+        'take my life', 'want to die', 'wanna die', 'better off dead',
+        'end it all', 'not worth living',
+    ]),
+    'plan_or_means': (3.0, [
+        'overdose', 'overdosed', 'hang myself', 'suicide note', 'goodbye letter',
+        'jump off', 'stockpiling pills', 'took pills',
+    ]),
+    'self_harm': (3.0, [
+        'self harm', 'selfharm', 'cut myself', 'cutting myself', 'hurt myself',
+        'hurting myself', 'burn myself', 'burning myself',
+    ]),
+    'hopelessness': (1.5, [
+        'hopeless', 'worthless', 'no way out', 'can t go', 'cannot go on',
+        'give up on', 'nothing matters', 'burden to everyone', 'no point in',
+        'no future',
+    ]),
+    'abuse': (2.0, [
+        'abused', 'abusive', 'assaulted', 'raped', 'hits me', 'beats me',
+        'threatened me', 'unsafe at home',
+    ]),
+    'substance_use': (1.0, [
+        'relapse', 'relapsed', 'addicted', 'drunk every', 'drinking every',
+        'blackout drunk',
+    ]),
+}
+
+_MASK64 = (1 << 64) - 1
+_token_hashes = {}
+
+
+def _token_hash(token):
+    value = _token_hashes.get(token)
+    if value is None:
+        if len(_token_hashes) > 500000:
+            _token_hashes.clear()
+        value = _token_hashes[token] = zlib.crc32(token.encode())
+    return value
+
+
+def phrase_hash(phrase):
+    """Hash of a phrase as it appears among the n-gram hashes of a text."""
+    tokens = TOKEN_RE.findall(phrase.lower())
+    if not 1 <= len(tokens) <= MAX_NGRAM:
+        raise ValueError(f"Phrase must have 1 to {MAX_NGRAM} words: {phrase!r}")
+    value = _token_hash(tokens[0])
+    for token in tokens[1:]:
+        value = (value * NGRAM_PRIME + _token_hash(token)) & _MASK64
+    return value
+
+
+def ngram_hashes(texts):
+    """
+    Hash every 1..MAX_NGRAM word n-gram of every text.
+
+    Returns:
+        (hashes, owners): uint64 n-gram hashes and the index of the text
+        each one came from
+    """
+    token_hashes = []
+    lengths = np.zeros(len(texts), dtype=np.intp)
+    for i, text in enumerate(texts):
+        tokens = TOKEN_RE.findall(text.lower()) if text else []
+        lengths[i] = len(tokens)
+        token_hashes.extend(_token_hash(token) for token in tokens)
+
+    unigrams = np.array(token_hashes, dtype=np.uint64)
+    docs = np.repeat(np.arange(len(texts)), lengths)
+    hashes = [unigrams]
+    owners = [docs]
+    grams = unigrams
+    prime = np.uint64(NGRAM_PRIME)
+    for n in range(2, MAX_NGRAM + 1):
+        # n-grams starting at each token, from the (n-1)-grams (uint64 wraps)
+        grams = grams[:-1] * prime + unigrams[n - 1:]
+        # Drop n-grams that run from one text into the next
+        same_text = docs[:len(grams)] == docs[n - 1:]
+        hashes.append(grams[same_text])
+        owners.append(docs[:len(grams)][same_text])
+    return np.concatenate(hashes), np.concatenate(owners)
+
+
+class RiskModel:
+    """
+    Args:
+        weights: float32 array of N_FEATURES hashed n-gram weights (all zero
+            for the built-in model)
+        bias: intercept
+        phrase_hashes: sorted uint64 array of lexicon phrase hashes
+        phrase_weights: weight of each lexicon phrase
+        phrase_codes: index into ``codes`` for each lexicon phrase
+        codes: reason code names
+    """
+
+    def __init__(self, weights, bias, phrase_hashes, phrase_weights, phrase_codes, codes):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.phrase_hashes = np.asarray(phrase_hashes, dtype=np.uint64)
+        self.phrase_weights = np.asarray(phrase_weights, dtype=np.float32)
+        self.phrase_codes = np.asarray(phrase_codes, dtype=np.intp)
+        self.codes = [str(code) for code in codes]
+        if self.weights.shape != (N_FEATURES,):
+            raise ValueError(f"Expected {N_FEATURES} weights, got {self.weights.shape}")
+        self.hashed = bool(self.weights.any())
+
+    @classmethod
+    def from_lexicon(cls, lexicon=LEXICON, bias=DEFAULT_BIAS):
+        """Model whose only features are the lexicon phrases."""
+        codes = sorted(lexicon)
+        phrases = {}
+        for index, code in enumerate(codes):
+            weight, code_phrases = lexicon[code]
+            for phrase in code_phrases:
+                phrases[phrase_hash(phrase)] = (weight, index)
+        ordered = sorted(phrases)
+        return cls(
+            np.zeros(N_FEATURES, dtype=np.float32), bias,
+            np.array(ordered, dtype=np.uint64),
+            [phrases[value][0] for value in ordered],
+            [phrases[value][1] for value in ordered],
+            codes,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(
+                arrays['weights'], arrays['bias'], arrays['phrase_hashes'],
+                arrays['phrase_weights'], arrays['phrase_codes'], arrays['codes'],
+            )
+
+    def save(self, path):
+        np.savez_compressed(
+            path, weights=self.weights, bias=np.float64(self.bias),
+            phrase_hashes=self.phrase_hashes, phrase_weights=self.phrase_weights,
+            phrase_codes=self.phrase_codes, codes=np.array(self.codes),
+        )
+
+    def score(self, texts):
+        """
+        Features are binary: a phrase repeated ten times counts once.
+
+        Returns:
+            (scores, reasons): float array of risk scores in [0, 1] and, per
+            text, the sorted reason codes of the lexicon phrases it contains
+        """
+        hashes, owners = ngram_hashes(texts)
+        logits = np.full(len(texts), self.bias)
+        reasons = [set() for _ in texts]
+
+        if self.hashed:
+            # Fibonacci hashing: the top bits of the product are well mixed
+            features = ((hashes * FIBONACCI) >> np.uint64(64 - FEATURE_BITS)).astype(np.intp)
+            present = np.unique(owners * N_FEATURES + features)
+            logits += np.bincount(present // N_FEATURES, weights=self.weights[present % N_FEATURES], minlength=len(texts))
+
+        if len(self.phrase_hashes) and len(hashes):
+            # Lexicon phrases match on the full 64-bit hash, so never by collision
+            positions = np.searchsorted(self.phrase_hashes, hashes)
+            positions[positions == len(self.phrase_hashes)] = 0
+            matched = self.phrase_hashes[positions] == hashes
+            pairs = np.unique(owners[matched] * len(self.phrase_hashes) + positions[matched])
+            matched_owners = pairs // len(self.phrase_hashes)
+            matched_phrases = pairs % len(self.phrase_hashes)
+            logits += np.bincount(matched_owners, weights=self.phrase_weights[matched_phrases], minlength=len(texts))
+            for owner, code in zip(matched_owners.tolist(), self.phrase_codes[matched_phrases].tolist()):
+                reasons[owner].add(self.codes[code])
+
+        scores = 1.0 / (1.0 + np.exp(-logits))
+        return scores, [sorted(codes) for codes in reasons]
+
+
+_model = None
+
+
+def get_model():
+    """The configured model, loaded once per process."""
+    global _model
+    if _model is None:
+        _model = RiskModel.load(settings.RISK_MODEL_PATH) if settings.RISK_MODEL_PATH else RiskModel.from_lexicon()
+    return _model
+
+
+def score_batch(rows):
+    """
+    Score (id, updated_at, text) rows; runs in score_risk worker processes.
+
+    Returns:
+        list of (id, updated_at, score, reason codes)
+    """
+    scores, reasons = get_model().score([text for _, _, text in rows])
+    return [
+        (pk, updated_at, round(float(score), 4), codes)
+        for (pk, updated_at, _), score, codes in zip(rows, scores, reasons)
+    ]
+
+
+def unscored_batches(queryset, text_fields, batch_size, rescore=False):
+    """
+    Yield lists of (id, updated_at, text) rows in id order, ``batch_size``
+    rows per query, where text is the non-empty ``text_fields`` joined by
+    newlines. Only rows never scored (or changed since) are read unless
+    ``rescore``.
+    """
+    if not rescore:
+        queryset = queryset.filter(risk_scored_at__isnull=True)
+    queryset = queryset.order_by('id')
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).values_list('id', 'updated_at', *text_fields)[:batch_size])
+        if not rows:
+            return
+        yield [(row[0], row[1], '\n'.join(text for text in row[2:] if text)) for row in rows]
+        last_id = rows[-1][0]
+
+
+def save_scores(model, results):
+    """
+    Store score_batch() results on ``model`` rows; return the row count.
+
+    Rows edited since they were read (updated_at changed) are left alone:
+    the edit reset risk_scored_at, so the next pass scores the new text.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Locked, so an edit cannot slip in between this check and the write
+        current = set(
+            model.objects.select_for_update()
+            .filter(id__in=[pk for pk, _, _, _ in results])
+            .values_list('id', 'updated_at')
+        )
+        objs = [
+            model(id=pk, risk_score=score, risk_reasons=codes, risk_scored_at=now)
+            for pk, updated_at, score, codes in results
+            if (pk, updated_at) in current
+        ]
+        # bulk_update: no save signals and no updated_at change, scoring is not an edit
+        model.objects.bulk_update(objs, ['risk_score', 'risk_reasons', 'risk_scored_at'], batch_size=500)
+    return len(objs)
@@ -0,0 +1,160 @@
+"""
+In-process full-text index with BM25 ranking.
+
+The portable search backend for posts and library books when the database
+has no full-text index (SQLite in development and tests). On MySQL the apps
+use FULLTEXT indexes instead.
+
+Documents have several text fields, each with a boost; term frequencies and
+document lengths are weighted by the field boosts (BM25F). Postings are kept
+per term, so a query only touches the documents containing its terms, not
+the whole collection.
+
+    index = InvertedIndex(boosts={'title': 3.0, 'description': 1.0})
+    index.add(1, {'title': 'Feeling Good', 'description': '...'}, category='self-help')
+    index.search('feeling good', filter=lambda meta: meta['category'] == 'self-help')
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from heapq import nlargest
+
+from django.conf import settings
+from django.db import connection
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i if in into is it its me my
+of on or our so that the their them then there these they this to was we
+were what when which who will with you your
+""".split())
+
+
+def use_fulltext():
+    """Whether searches should use the database FULLTEXT indexes (SEARCH_BACKEND)."""
+    if settings.SEARCH_BACKEND == 'auto':
+        return connection.vendor == 'mysql'
+    return settings.SEARCH_BACKEND == 'fulltext'
+
+
+def tokenize(text):
+    """Lowercased word tokens without stopwords or single characters."""
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class InvertedIndex:
+    """
+    Thread-safe BM25 inverted index.
+
+    Args:
+        boosts: {field name: weight}; only these fields are indexed
+        k1, b: BM25 parameters
+    """
+
+    def __init__(self, boosts, k1=1.2, b=0.75):
+        self.boosts = dict(boosts)
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.RLock()
+        self.postings = defaultdict(dict)   # term -> {doc id: weighted term frequency}
+        self.lengths = {}                   # doc id -> weighted length
+        self.terms = {}                     # doc id -> terms, for removal
+        self.meta = {}                      # doc id -> metadata for filters
+        self.total_length = 0.0
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.lengths
+
+    def add(self, doc_id, fields, **meta):
+        """Index (or re-index) a document."""
+        frequencies = Counter()
+        length = 0.0
+        for name, boost in self.boosts.items():
+            tokens = tokenize(fields.get(name) or '')
+            length += boost * len(tokens)
+            for token in tokens:
+                frequencies[token] += boost
+        with self.lock:
+            self._remove(doc_id)
+            for term, frequency in frequencies.items():
+                self.postings[term][doc_id] = frequency
+            self.lengths[doc_id] = length
+            self.terms[doc_id] = tuple(frequencies)
+            self.meta[doc_id] = meta
+            self.total_length += length
+
+    def remove(self, doc_id):
+        with self.lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        if doc_id not in self.lengths:
+            return
+        for term in self.terms.pop(doc_id):
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.lengths.pop(doc_id)
+        self.meta.pop(doc_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.postings.clear()
+            self.lengths.clear()
+            self.terms.clear()
+            self.meta.clear()
+            self.total_length = 0.0
+
+    def search(self, query, limit=None, filter=None):
+        """
+        Rank documents matching any query term.
+
+        Args:
+            query: free text
+            limit: return only the best ``limit`` results
+            filter: optional callable(meta) -> bool to restrict results
+
+        Returns:
+            list of (doc id, score), best first
+        """
+        terms = set(tokenize(query))
+        with self.lock:
+            count = len(self.lengths)
+            if not terms or not count:
+                return []
+            average = (self.total_length / count) or 1.0
+            # BM25 length normalization k1 * (1 - b + b * length / average)
+            # as base + slope * length
+            base = self.k1 * (1 - self.b)
+            slope = self.k1 * self.b / average
+            lengths = self.lengths
+            scores = defaultdict(float)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                weight = idf * (self.k1 + 1)
+                for doc_id, frequency in postings.items():
+                    scores[doc_id] += weight * frequency / (frequency + base + slope * lengths[doc_id])
+            if filter is not None:
+                scores = {doc_id: score for doc_id, score in scores.items() if filter(self.meta[doc_id])}
+
+        if limit is not None:
+            return nlargest(limit, scores.items(), key=_rank_key)
+        return sorted(scores.items(), key=_rank_key, reverse=True)
+
+
+def _rank_key(item):
+    # Highest score first; equal scores: lower (older) id first
+    doc_id, score = item
+    return score, -doc_id
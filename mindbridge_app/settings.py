@@ -109,6 +109,33 @@ TIME_ZONE = 'Africa/Kigali'
 USE_I18N = True
 USE_TZ = True
 
+# Cache
+# The default in-process cache is per worker; point CACHE_BACKEND/CACHE_LOCATION
+# at a shared cache (e.g. django.core.cache.backends.redis.RedisCache) in
+# production so invalidations reach every worker.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Full-text search: 'auto' uses FULLTEXT indexes on MySQL and the in-process
+# index (mindbridge_app/search.py) elsewhere; 'fulltext' or 'memory' force one
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='auto')
+
+# Seconds approved-post counts per category are cached
+POST_CATEGORY_COUNTS_TTL = config('POST_CATEGORY_COUNTS_TTL', default=300, cast=int)
+# Seconds public stories feed pages are cached (they are invalidated on
+# every moderation change anyway)
+POST_FEED_CACHE_TTL = config('POST_FEED_CACHE_TTL', default=600, cast=int)
+
+# New posts sharing at least this share of their text (estimated Jaccard
+# similarity) with a post of the last POST_DUPLICATE_WINDOW_DAYS are
+# flagged as duplicates in the moderation queue
+POST_DUPLICATE_THRESHOLD = config('POST_DUPLICATE_THRESHOLD', default=0.8, cast=float)
+POST_DUPLICATE_WINDOW_DAYS = config('POST_DUPLICATE_WINDOW_DAYS', default=30, cast=int)
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -119,6 +146,16 @@ STATICFILES_DIRS = [FRONTEND_DIR]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Library PDFs (/api/library/<id>/pdf/): '' streams them from Django;
+# 'x-sendfile' (Apache, lighttpd) or 'x-accel' (nginx) hands the transfer
+# to the web server. LIBRARY_ACCEL_PREFIX is the internal nginx location
+# aliased to MEDIA_ROOT.
+LIBRARY_SENDFILE = config('LIBRARY_SENDFILE', default='')
+LIBRARY_ACCEL_PREFIX = config('LIBRARY_ACCEL_PREFIX', default='/protected-media/')
+
+# Processes resizing uploaded covers and event images (0: in the web worker)
+IMAGE_WORKERS = config('IMAGE_WORKERS', default=2, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -144,10 +181,47 @@ REST_FRAMEWORK = {
 }
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Notifications go through the Gmail API by default; set EMAIL_BACKEND to
+# django.core.mail.backends.smtp.EmailBackend to use the SMTP settings below
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='bookings.gmail_utils.GmailBackend')
 EMAIL_HOST = config('EMAIL_HOST')
 EMAIL_PORT = config('EMAIL_PORT', cast=int)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
 DEFAULT_FROM_EMAIL = 'MindBridge Wellness <mindbridge.alu@gmail.com>' 
+
+# Booking outbox worker (python manage.py run_outbox)
+OUTBOX_WORKERS = config('OUTBOX_WORKERS', default=4, cast=int)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=2.0, cast=float)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+OUTBOX_BACKOFF_SECONDS = config('OUTBOX_BACKOFF_SECONDS', default=30, cast=int)
+OUTBOX_MAX_BACKOFF_SECONDS = config('OUTBOX_MAX_BACKOFF_SECONDS', default=3600, cast=int)
+OUTBOX_LEASE_SECONDS = config('OUTBOX_LEASE_SECONDS', default=300, cast=int)
+
+# Base URL for Google Calendar/Gmail API calls. Leave empty for Google;
+# set to a fake server (python manage.py fake_google) for load tests.
+GOOGLE_API_ENDPOINT = config('GOOGLE_API_ENDPOINT', default='')
+
+# How long responses stored for Idempotency-Key headers are replayed
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', default=24, cast=int)
+
+# Length of a counseling session slot in minutes
+BOOKING_SLOT_MINUTES = config('BOOKING_SLOT_MINUTES', default=40, cast=int)
+
+# Log requests that exceed their ViewSet query budget outside DEBUG
+QUERY_BUDGET_LOGGING = config('QUERY_BUDGET_LOGGING', default=False, cast=bool)
+
+# Completed/cancelled bookings older than this move to bookings_archive
+# (python manage.py archive_bookings)
+BOOKING_ARCHIVE_AFTER_DAYS = config('BOOKING_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+
+# Crisis-language risk scoring (python manage.py score_risk). Leave
+# RISK_MODEL_PATH empty to use the built-in lexicon model.
+RISK_MODEL_PATH = config('RISK_MODEL_PATH', default='')
+RISK_SCORING_WORKERS = config('RISK_SCORING_WORKERS', default=2, cast=int)
+RISK_SCORING_BATCH_SIZE = config('RISK_SCORING_BATCH_SIZE', default=1000, cast=int)
+
+# Reminder scheduler (python manage.py send_reminders)
+REMINDER_LEAD_HOURS = config('REMINDER_LEAD_HOURS', default=24, cast=int)
+REMINDER_BATCH_SIZE = config('REMINDER_BATCH_SIZE', default=200, cast=int)
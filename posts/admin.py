@@ -1,4 +1,5 @@
 from django.contrib import admin
+from .moderation import decide
 from .models import Post
 
 
@@ -7,8 +8,8 @@ class PostAdmin(admin.ModelAdmin):
     """
     Admin interface for Post model.
     """
-    list_display = ('get_display_name', 'content_preview', 'anonymous', 'is_approved', 'created_at')
-    list_filter = ('is_approved', 'anonymous', 'created_at')
+    list_display = ('get_display_name', 'content_preview', 'anonymous', 'is_approved', 'risk_score', 'created_at')
+    list_filter = ('is_approved', 'moderated_at', 'anonymous', 'created_at')
     search_fields = ('content', 'author__username')
     ordering = ('-created_at',)
     
@@ -17,7 +18,7 @@ class PostAdmin(admin.ModelAdmin):
             'fields': ('author', 'content', 'anonymous')
         }),
         ('Moderation', {
-            'fields': ('is_approved',)
+            'fields': ('is_approved', 'moderated_at', 'duplicate_of', 'risk_score', 'risk_reasons', 'risk_scored_at')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -25,7 +26,7 @@ class PostAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('moderated_at', 'duplicate_of', 'risk_score', 'risk_reasons', 'risk_scored_at', 'created_at', 'updated_at')
     
     actions = ['approve_posts', 'unapprove_posts']
     
@@ -38,11 +39,11 @@ class PostAdmin(admin.ModelAdmin):
     content_preview.short_description = 'Content'
     
     def approve_posts(self, request, queryset):
-        queryset.update(is_approved=True)
-        self.message_user(request, f"{queryset.count()} post(s) approved.")
+        approved, _ = decide(approve=queryset.values_list('id', flat=True))
+        self.message_user(request, f"{approved} post(s) approved.")
     approve_posts.short_description = "Approve selected posts"
     
     def unapprove_posts(self, request, queryset):
-        queryset.update(is_approved=False)
-        self.message_user(request, f"{queryset.count()} post(s) unapproved.")
+        _, rejected = decide(reject=queryset.values_list('id', flat=True))
+        self.message_user(request, f"{rejected} post(s) unapproved.")
     unapprove_posts.short_description = "Unapprove selected posts"
@@ -0,0 +1,90 @@
+"""
+Caching for the public stories feed.
+
+Everything cached here is keyed by a feed version number. Approving,
+rejecting, editing or deleting a post bumps the version (see signals.py and
+the admin actions), which makes every cached page and count stale at once
+without having to find and delete them; they simply expire.
+
+- category_counts(): approved-post counts per category
+- feed pages: rendered JSON of anonymous /api/posts/ pages (PostViewSet.list)
+- approved_page(): post ids of one page of the legacy post_list view
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Count
+
+from .models import Post
+
+FEED_VERSION_KEY = 'posts:feed_version'
+
+
+def feed_version():
+    """Current feed version (created on first use)."""
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        # Start from the clock so a lost version key never reuses old entries
+        cache.add(FEED_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def bump_feed_version():
+    """Invalidate everything cached for the feed."""
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        # Key missing (evicted or never created)
+        cache.set(FEED_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def feed_page_key(host, category, page):
+    return f'posts:feed:{feed_version()}:{host}:{category or "all"}:{page or 1}'
+
+
+def category_counts():
+    """Return {category: approved post count} for every Post.CATEGORY_CHOICES entry."""
+    key = f'posts:category_counts:{feed_version()}'
+    counts = cache.get(key)
+    if counts is None:
+        rows = dict(
+            Post.objects.filter(is_approved=True)
+            .order_by()
+            .values_list('category')
+            .annotate(count=Count('id'))
+        )
+        counts = {category: rows.get(category, 0) for category, _ in Post.CATEGORY_CHOICES}
+        cache.set(key, counts, settings.POST_CATEGORY_COUNTS_TTL)
+    return counts
+
+
+def approved_page(number, category=None):
+    """
+    One page of approved posts, newest first, with authors loaded.
+
+    Only the page's post ids are cached, per (version, category, page); the
+    total comes from category_counts(). A hit costs one primary-key query
+    for at most one page of rows.
+
+    Returns:
+        django.core.paginator.Page whose object_list is the posts
+    """
+    counts = category_counts()
+    total = counts.get(category, 0) if category else sum(counts.values())
+    # Paginator over offsets validates ``number`` against the cached total
+    page = Paginator(range(total), settings.REST_FRAMEWORK['PAGE_SIZE']).get_page(number)
+    key = f'posts:page_ids:{feed_version()}:{category or "all"}:{page.number}'
+    ids = cache.get(key)
+    if ids is None:
+        posts = Post.objects.filter(is_approved=True)
+        if category:
+            posts = posts.filter(category=category)
+        offsets = page.object_list
+        ids = list(posts.order_by('-created_at', '-id').values_list('id', flat=True)[offsets.start:offsets.stop])
+        cache.set(key, ids, settings.POST_FEED_CACHE_TTL)
+    rows = Post.objects.select_related('author').in_bulk(ids)
+    page.object_list = [rows[post_id] for post_id in ids if post_id in rows]
+    return page
@@ -0,0 +1,236 @@
+"""
+Near-duplicate detection for submitted posts (MinHash + LSH).
+
+Every post gets a MinHash signature of its word 3-gram shingles: NUM_PERM
+minimum hash values, stored in Post.minhash as NUM_PERM * 4 bytes. Two
+signatures agree in each position with probability equal to the Jaccard
+similarity of the two shingle sets, so the share of equal positions
+estimates how much text two posts have in common.
+
+Lookups go to an in-process LSH index of the posts of the last
+POST_DUPLICATE_WINDOW_DAYS: signatures are cut into BANDS bands of ROWS
+values, posts sharing a whole band with the new post are candidates, and
+candidates at or above POST_DUPLICATE_THRESHOLD are duplicates. A lookup
+reads BANDS dict entries, however many posts are indexed.
+
+The index is built on first use and, before every lookup, reads the posts
+other processes saved since (WHERE id > last indexed id).
+"""
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from mindbridge_app.search import tokenize
+
+from .models import Post
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Largest prime below 2**32: (a * x + b) % PRIME fits in uint64 for 32-bit x
+PRIME = 4294967291
+
+
+def _coefficients(seed, count):
+    # splitmix64, so signatures stored in the database stay valid across
+    # NumPy versions
+    values = []
+    state = seed
+    for _ in range(count):
+        state = (state + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        values.append((z ^ (z >> 31)) % (PRIME - 1) + 1)
+    return np.array(values, dtype=np.uint64)[:, None]
+
+
+_A = _coefficients(1, NUM_PERM)
+_B = _coefficients(2, NUM_PERM)
+
+
+def signature(text):
+    """MinHash signature of ``text`` as a uint32 array, or None if it has no words."""
+    tokens = tokenize(text or '')
+    if not tokens:
+        return None
+    size = min(SHINGLE_SIZE, len(tokens))
+    shingles = {
+        zlib.crc32(' '.join(tokens[i:i + size]).encode())
+        for i in range(len(tokens) - size + 1)
+    }
+    values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    return ((_A * values + _B) % np.uint64(PRIME)).min(axis=1).astype(np.uint32)
+
+
+def encode(sig):
+    return None if sig is None else sig.astype('<u4').tobytes()
+
+
+def decode(data):
+    return None if data is None else np.frombuffer(bytes(data), dtype='<u4').astype(np.uint32)
+
+
+class LSHIndex:
+    """
+    Thread-safe banded LSH index of MinHash signatures.
+
+    Posts are added in id order, so the oldest are at the front of
+    ``entries`` and expire from there.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.buckets = defaultdict(set)     # (band, band bytes) -> post ids
+        self.entries = OrderedDict()        # post id -> (signature, original id, created_at)
+        self.last_id = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _bands(sig):
+        data = sig.tobytes()
+        width = ROWS * 4
+        return [(band, data[band * width:(band + 1) * width]) for band in range(BANDS)]
+
+    def add(self, post_id, sig, original_id, created_at):
+        with self.lock:
+            if post_id in self.entries:
+                self._unbucket(post_id, self.entries[post_id][0])
+            # Re-added (edited) posts keep their place in the expiry order
+            self.entries[post_id] = (sig, original_id, created_at)
+            for key in self._bands(sig):
+                self.buckets[key].add(post_id)
+            self.last_id = max(self.last_id, post_id)
+
+    def remove(self, post_id):
+        with self.lock:
+            self._remove(post_id)
+
+    def _remove(self, post_id):
+        entry = self.entries.pop(post_id, None)
+        if entry is not None:
+            self._unbucket(post_id, entry[0])
+
+    def _unbucket(self, post_id, sig):
+        for key in self._bands(sig):
+            bucket = self.buckets[key]
+            bucket.discard(post_id)
+            if not bucket:
+                del self.buckets[key]
+
+    def forget_original(self, original_id):
+        """Make the copies of a deleted post originals (duplicate_of is SET_NULL)."""
+        with self.lock:
+            for post_id, (sig, original, created_at) in self.entries.items():
+                if original == original_id:
+                    self.entries[post_id] = (sig, post_id, created_at)
+
+    def expire(self, before):
+        """Drop posts created before ``before``."""
+        with self.lock:
+            while self.entries:
+                post_id, (_, _, created_at) = next(iter(self.entries.items()))
+                if created_at >= before:
+                    break
+                self._remove(post_id)
+
+    def query(self, sig, threshold, exclude=None):
+        """
+        Returns:
+            list of (original post id, estimated similarity), most similar
+            first; a post and its copies count as the original
+        """
+        with self.lock:
+            candidates = set()
+            for key in self._bands(sig):
+                candidates.update(self.buckets.get(key, ()))
+            candidates.discard(exclude)
+            best = {}
+            for post_id in candidates:
+                other, original_id, _ = self.entries[post_id]
+                similarity = float(np.count_nonzero(other == sig)) / NUM_PERM
+                if similarity >= threshold and original_id != exclude:
+                    best[original_id] = max(best.get(original_id, 0.0), similarity)
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _window_start():
+    return timezone.now() - timedelta(days=settings.POST_DUPLICATE_WINDOW_DAYS)
+
+
+def _load(index, posts):
+    rows = list(posts.order_by('id').values_list('id', 'minhash', 'duplicate_of_id', 'created_at'))
+    # Posts saved before signatures existed
+    missing = [row[0] for row in rows if row[1] is None]
+    contents = dict(Post.objects.filter(id__in=missing).values_list('id', 'content')) if missing else {}
+    for post_id, minhash, duplicate_of_id, created_at in rows:
+        sig = decode(minhash) if minhash is not None else signature(contents.get(post_id))
+        if sig is not None:
+            index.add(post_id, sig, duplicate_of_id or post_id, created_at)
+        else:
+            index.remove(post_id)
+        index.last_id = max(index.last_id, post_id)
+
+
+def get_index():
+    """The in-process index of recent posts, built on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = LSHIndex()
+                _load(index, Post.objects.filter(created_at__gte=_window_start()))
+                _index = index
+    return _index
+
+
+def refresh(post_ids=()):
+    """
+    Index posts created since the last refresh, in this or another process,
+    and re-read ``post_ids`` (edited posts).
+    """
+    if _index is None:
+        return
+    with _index.lock:
+        posts = Post.objects.filter(Q(id__gt=_index.last_id) | Q(id__in=post_ids), created_at__gte=_window_start())
+        _load(_index, posts)
+        _index.expire(_window_start())
+
+
+def forget(post_id):
+    if _index is not None:
+        _index.remove(post_id)
+        _index.forget_original(post_id)
+
+
+def flag(post):
+    """
+    Store the signature of a new or edited post and point duplicate_of at the
+    original it copies, if any. Posts whose content is unchanged are left alone.
+    """
+    sig = signature(post.content)
+    encoded = encode(sig)
+    if post.minhash is not None and encoded is not None and bytes(post.minhash) == encoded:
+        return
+    post.minhash = encoded
+    post.duplicate_of = None
+    if sig is None:
+        return
+    get_index()
+    refresh()
+    matches = _index.query(sig, settings.POST_DUPLICATE_THRESHOLD, exclude=post.pk)
+    if matches:
+        post.duplicate_of_id = matches[0][0]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_approved', 'category', 'created_at'], name='posts_category_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('CREATE FULLTEXT INDEX posts_content_ft ON posts (content)')
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX posts_content_ft ON posts')
+
+
+class Migration(migrations.Migration):
+    """FULLTEXT index for story search (MySQL only; other databases use the in-process index)."""
+
+    dependencies = [
+        ('posts', '0003_post_category_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_content_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='moderated_at',
+            field=models.DateTimeField(blank=True, help_text='When the wellness team approved or rejected the post', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_approved', 'moderated_at', 'created_at', 'id'], name='posts_moderation_idx'),
+        ),
+    ]
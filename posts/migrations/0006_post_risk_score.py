@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_moderation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='risk_reasons',
+            field=models.JSONField(blank=True, default=list, help_text='Reason codes of matched crisis phrases'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='risk_score',
+            field=models.FloatField(default=0.0, help_text='Crisis-language risk from 0 to 1'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='risk_scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_approved', 'moderated_at', '-risk_score', 'created_at', 'id'], name='posts_risk_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['risk_scored_at', 'id'], name='posts_unscored_idx'),
+        ),
+    ]
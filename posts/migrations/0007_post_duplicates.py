@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_risk_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earlier post this one copies', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='posts.post'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='minhash',
+            field=models.BinaryField(blank=True, help_text='MinHash signature of the content', null=True),
+        ),
+    ]
@@ -29,6 +29,22 @@ class Post(models.Model):
     )
     anonymous = models.BooleanField(default=True, help_text="Display this post anonymously")
     is_approved = models.BooleanField(default=False, help_text="Must be approved by wellness team")
+    moderated_at = models.DateTimeField(blank=True, null=True, help_text="When the wellness team approved or rejected the post")
+    # Crisis-language risk (python manage.py score_risk); risk_scored_at is
+    # cleared when the text changes so the row is scored again
+    risk_score = models.FloatField(default=0.0, help_text="Crisis-language risk from 0 to 1")
+    risk_reasons = models.JSONField(default=list, blank=True, help_text="Reason codes of matched crisis phrases")
+    risk_scored_at = models.DateTimeField(blank=True, null=True)
+    # Near-duplicate detection (see duplicates.py)
+    minhash = models.BinaryField(blank=True, null=True, editable=False, help_text="MinHash signature of the content")
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='duplicates',
+        help_text="Earlier post this one copies"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -37,6 +53,20 @@ class Post(models.Model):
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
         ordering = ['-created_at']
+        indexes = [
+            # Approved feed, newest first (PostViewSet visibility filter)
+            models.Index(fields=['is_approved', 'created_at'], name='posts_approved_idx'),
+            # An author's own posts, newest first
+            models.Index(fields=['author', 'created_at'], name='posts_author_idx'),
+            # Category tabs of the approved feed
+            models.Index(fields=['is_approved', 'category', 'created_at'], name='posts_category_idx'),
+            # Moderation queue: unmoderated posts, oldest first
+            models.Index(fields=['is_approved', 'moderated_at', 'created_at', 'id'], name='posts_moderation_idx'),
+            # Moderation queue sorted by risk (?sort=risk)
+            models.Index(fields=['is_approved', 'moderated_at', '-risk_score', 'created_at', 'id'], name='posts_risk_queue_idx'),
+            # Posts waiting to be scored (score_risk)
+            models.Index(fields=['risk_scored_at', 'id'], name='posts_unscored_idx'),
+        ]
     
     def __str__(self):
         author_name = "Anonymous" if self.anonymous else self.author.username
@@ -0,0 +1,39 @@
+"""
+Moderation decisions on posts.
+
+Decisions are applied with one UPDATE ... WHERE id IN (...) per outcome, and
+the feed caches and search index are refreshed once per batch after the
+transaction commits (update() does not send the Post signals).
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_feed_version
+from .models import Post
+from .search import sync_posts
+
+
+def decide(approve=(), reject=()):
+    """
+    Approve and reject posts by id.
+
+    Returns:
+        (number approved, number rejected)
+    """
+    approve = list(approve)
+    reject = list(reject)
+    now = timezone.now()
+    with transaction.atomic():
+        approved = rejected = 0
+        if approve:
+            approved = Post.objects.filter(id__in=approve).update(is_approved=True, moderated_at=now, updated_at=now)
+        if reject:
+            rejected = Post.objects.filter(id__in=reject).update(is_approved=False, moderated_at=now, updated_at=now)
+        if approved or rejected:
+            transaction.on_commit(lambda: _published(approve + reject))
+    return approved, rejected
+
+
+def _published(post_ids):
+    bump_feed_version()
+    sync_posts(post_ids)
@@ -0,0 +1,77 @@
+"""
+Full-text search over approved posts.
+
+On MySQL the posts_content_ft FULLTEXT index is queried with MATCH ...
+AGAINST in natural language mode, ranked by relevance. On other databases
+(SQLite in development and tests) an in-process InvertedIndex is built from
+the approved posts on first use and kept current by the Post signals.
+SEARCH_BACKEND ('auto', 'fulltext' or 'memory') overrides the choice.
+"""
+import threading
+
+from django.db.models.expressions import RawSQL
+
+from mindbridge_app.search import InvertedIndex, use_fulltext
+
+from .models import Post
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def search_post_ids(query, category=None):
+    """
+    Ids of approved posts matching ``query``, most relevant first.
+
+    Returns:
+        a list of ids, or (with FULLTEXT) a lazy ids queryset; both can be
+        paginated
+    """
+    if use_fulltext():
+        posts = Post.objects.filter(is_approved=True)
+        if category:
+            posts = posts.filter(category=category)
+        relevance = RawSQL('MATCH (content) AGAINST (%s IN NATURAL LANGUAGE MODE)', (query,))
+        return (
+            posts.annotate(relevance=relevance)
+            .filter(relevance__gt=0)
+            .order_by('-relevance', 'id')
+            .values_list('id', flat=True)
+        )
+
+    filter = (lambda meta: meta['category'] == category) if category else None
+    return [post_id for post_id, _ in get_index().search(query, filter=filter)]
+
+
+def get_index():
+    """The in-process index of approved posts, built on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = InvertedIndex(boosts={'content': 1.0})
+                rows = Post.objects.filter(is_approved=True).values_list('id', 'content', 'category')
+                for post_id, content, category in rows.iterator(chunk_size=2000):
+                    index.add(post_id, {'content': content}, category=category)
+                _index = index
+    return _index
+
+
+def sync_posts(post_ids):
+    """
+    Bring the in-process index up to date for the given posts: approved
+    posts are (re)indexed, unapproved or deleted ones removed.
+    """
+    if _index is None:
+        # Not built in this process yet; it will be read fresh
+        return
+    rows = Post.objects.filter(id__in=post_ids).values_list('id', 'content', 'category', 'is_approved')
+    seen = set()
+    for post_id, content, category, is_approved in rows:
+        seen.add(post_id)
+        if is_approved:
+            _index.add(post_id, {'content': content}, category=category)
+        else:
+            _index.remove(post_id)
+    for post_id in set(post_ids) - seen:
+        _index.remove(post_id)
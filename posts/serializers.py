@@ -8,8 +8,8 @@ class PostSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Post
-        fields = ['id', 'author', 'author_name', 'content', 'category', 'category_display', 'anonymous', 'is_approved', 'created_at', 'updated_at']
-        read_only_fields = ['author', 'is_approved', 'created_at', 'updated_at']
+        fields = ['id', 'author', 'author_name', 'content', 'category', 'category_display', 'anonymous', 'is_approved', 'moderated_at', 'created_at', 'updated_at']
+        read_only_fields = ['author', 'is_approved', 'moderated_at', 'created_at', 'updated_at']
     
     def get_author_name(self, obj):
         return obj.get_display_name()
@@ -17,3 +17,17 @@ class PostSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
         return super().create(validated_data)
+    
+    def update(self, instance, validated_data):
+        if validated_data.get('content', instance.content) != instance.content:
+            # Score the edited text again
+            instance.risk_scored_at = None
+        return super().update(instance, validated_data)
+
+
+class PostModerationSerializer(PostSerializer):
+    """Post with its risk score and duplicate flag, for the wellness team moderation queue."""
+    
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + ['risk_score', 'risk_reasons', 'risk_scored_at', 'duplicate_of']
+        read_only_fields = fields
@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import duplicates, search
+from .cache import bump_feed_version
+from .models import Post
+
+
+@receiver(pre_save, sender=Post)
+def flag_duplicate(sender, instance, raw=False, **kwargs):
+    """Mark new or edited posts that copy a recent post (see duplicates.py)."""
+    if not raw:
+        duplicates.flag(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_signature(sender, instance, raw=False, **kwargs):
+    post_id = instance.pk
+    transaction.on_commit(lambda: duplicates.refresh([post_id]))
+
+
+@receiver(post_delete, sender=Post)
+def forget_signature(sender, instance, **kwargs):
+    duplicates.forget(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, created=False, **kwargs):
+    """Invalidate the cached feed when a post is approved, rejected, edited or deleted."""
+    post_id = instance.pk
+    transaction.on_commit(lambda: search.sync_posts([post_id]))
+    # New submissions await approval and do not change the public feed
+    if created and not instance.is_approved:
+        return
+    if kwargs.get('signal') is post_delete and not instance.is_approved:
+        return
+    # After commit, so no request can cache the old rows under the new version
+    transaction.on_commit(bump_feed_version)
@@ -0,0 +1,165 @@
+import json
+import os
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from mindbridge_app import risk
+
+from .models import Post
+from .views import FEED_ORDERING, PostViewSet
+
+User = get_user_model()
+
+
+def plan_problems(node, problems=None):
+    """Full table scans and filesorts anywhere in a MySQL EXPLAIN FORMAT=JSON plan."""
+    if problems is None:
+        problems = []
+    if isinstance(node, dict):
+        if node.get('access_type') == 'ALL':
+            problems.append(f"full scan of {node.get('table_name')}")
+        if node.get('using_filesort') is True:
+            problems.append("filesort")
+        for value in node.values():
+            plan_problems(value, problems)
+    elif isinstance(node, list):
+        for value in node:
+            plan_problems(value, problems)
+    return problems
+
+
+@skipUnless(connection.vendor == 'mysql', "EXPLAIN plans are checked on MySQL")
+class PostFeedPlanTest(TransactionTestCase):
+    """
+    Every query behind the post feed must be an index range scan without a
+    filesort on a large table (POST_PLAN_TEST_ROWS posts, default 1M).
+
+    A TransactionTestCase because ANALYZE TABLE commits; the rows are
+    loaded once for the single test.
+    """
+
+    def setUp(self):
+        rows = int(os.environ.get('POST_PLAN_TEST_ROWS', 1000000))
+        self.student = User.objects.create_user(
+            username='teststudent',
+            email='test@example.com',
+            password='testpass123',
+            role='student'
+        )
+        other = User.objects.create_user(
+            username='otherstudent',
+            email='other@example.com',
+            password='testpass123',
+            role='student'
+        )
+        categories = [category for category, _ in Post.CATEGORY_CHOICES]
+        with connection.cursor() as cursor:
+            cursor.execute('SET SESSION cte_max_recursion_depth = %s', [rows + 1])
+            # 1 post in 100 by the student, 1 in 10 unapproved
+            cursor.execute(
+                f"""
+                INSERT INTO posts (author_id, content, category, anonymous, is_approved,
+                                   risk_score, risk_reasons, created_at, updated_at)
+                WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+                SELECT IF(n %% 100 = 0, %s, %s), 'Test story', ELT(1 + n %% {len(categories)}, {', '.join(['%s'] * len(categories))}),
+                       TRUE, n %% 10 <> 0, 0, '[]', NOW() - INTERVAL n SECOND, NOW()
+                FROM seq
+                """,
+                [rows, self.student.pk, other.pk, *categories],
+            )
+            cursor.execute('ANALYZE TABLE posts')
+
+    def assertIndexScan(self, queryset):
+        plan = json.loads(queryset.explain(format='json'))
+        self.assertEqual(plan_problems(plan), [], json.dumps(plan, indent=2))
+
+    def branch_page(self, queryset, page=1, page_size=20):
+        # The query MergedQuerySets runs for each branch
+        return queryset.order_by(*FEED_ORDERING).values_list('created_at', 'id')[:page * page_size]
+
+    def test_feed_plans(self):
+        approved, own = PostViewSet.feed_branches(self.student)
+        queries = {
+            'approved': self.branch_page(approved),
+            'approved, page 50': self.branch_page(approved, page=50),
+            'approved in category': self.branch_page(approved.filter(category='self_care')),
+            'own pending': self.branch_page(own),
+            'own pending in category': self.branch_page(own.filter(category='self_care')),
+            'anonymous': Post.objects.filter(is_approved=True).order_by('-created_at')[:20],
+            'anonymous in category': Post.objects.filter(is_approved=True, category='self_care').order_by('-created_at')[:20],
+        }
+        for name, queryset in queries.items():
+            with self.subTest(name):
+                self.assertIndexScan(queryset)
+
+
+class PostModerationActionTest(TestCase):
+    def setUp(self):
+        student = User.objects.create_user(
+            username='teststudent',
+            email='test@example.com',
+            password='testpass123',
+            role='student'
+        )
+        staff = User.objects.create_user(
+            username='wellness',
+            email='wellness@example.com',
+            password='testpass123',
+            role='wellness_team'
+        )
+        self.post = Post.objects.create(author=student, content='A story about exams')
+        self.client = APIClient()
+        self.client.force_authenticate(staff)
+
+    def test_approve_and_reject(self):
+        response = self.client.post(f'/api/posts/{self.post.pk}/approve/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Post.objects.get(pk=self.post.pk).is_approved)
+        response = self.client.post(f'/api/posts/{self.post.pk}/reject/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Post.objects.get(pk=self.post.pk).is_approved)
+
+    def test_unknown_post(self):
+        for pk in ('abc', '999999'):
+            for decision in ('approve', 'reject'):
+                response = self.client.post(f'/api/posts/{pk}/{decision}/')
+                self.assertEqual(response.status_code, 404, (pk, decision))
+
+    def test_moderate_rejects_non_integer_ids(self):
+        for ids in ([True], [False], ['1'], [1.0], [None]):
+            response = self.client.post('/api/posts/moderate/', {'approve': ids}, format='json')
+            self.assertEqual(response.status_code, 400, ids)
+        self.assertFalse(Post.objects.get(pk=self.post.pk).is_approved)
+        response = self.client.post('/api/posts/moderate/', {'approve': [self.post.pk]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Post.objects.get(pk=self.post.pk).is_approved)
+
+
+class PostRiskScoringTest(TestCase):
+    def setUp(self):
+        student = User.objects.create_user(
+            username='teststudent',
+            email='test@example.com',
+            password='testpass123',
+            role='student'
+        )
+        self.posts = [Post.objects.create(author=student, content=f'Story {i}') for i in range(2)]
+
+    def test_edit_during_scoring_is_rescored(self):
+        rows = next(risk.unscored_batches(Post.objects.all(), ('content',), 10))
+        results = risk.score_batch(rows)
+        # Edited between the read and the write
+        edited = self.posts[0]
+        edited.content = 'An edited story'
+        edited.risk_scored_at = None
+        edited.save()
+        self.assertEqual(risk.save_scores(Post, results), 1)
+
+        self.assertIsNone(Post.objects.get(pk=edited.pk).risk_scored_at)
+        self.assertIsNotNone(Post.objects.get(pk=self.posts[1].pk).risk_scored_at)
+        rows = next(risk.unscored_batches(Post.objects.all(), ('content',), 10))
+        self.assertEqual([(pk, text) for pk, _, text in rows], [(edited.pk, 'An edited story')])
@@ -1,17 +1,45 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db.models import Q
+from django.core.cache import cache
+from django.conf import settings
+from django.http import HttpResponse
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from mindbridge_app.pagination import KeysetPagination, MergedQuerySets
+from mindbridge_app.query_budget import QueryBudgetMixin
+from .cache import approved_page, category_counts, feed_page_key
+from .search import search_post_ids
 from .models import Post
+from .moderation import decide
 from .forms import PostForm
-from .serializers import PostSerializer
+from .serializers import PostSerializer, PostModerationSerializer
+
+
+# Largest number of decisions accepted by the bulk moderation endpoint
+MODERATION_BATCH_LIMIT = 500
+
+# Feed order; matches posts_approved_idx, posts_category_idx and
+# posts_author_idx (InnoDB secondary indexes end with the primary key)
+FEED_ORDERING = ('-created_at', '-id')
+
+
+class ModerationQueuePagination(KeysetPagination):
+    # Matches posts_moderation_idx
+    ordering = ('created_at', 'id')
+
+
+class RiskModerationQueuePagination(KeysetPagination):
+    # Matches posts_risk_queue_idx
+    ordering = ('-risk_score', 'created_at', 'id')
 
 
 # ========== REST API ViewSets ==========
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """
     API endpoint for posts (stories).
     Only approved posts are visible to all users.
@@ -19,18 +47,121 @@ class PostViewSet(viewsets.ModelViewSet):
     """
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    query_budgets = {'list': 2, 'retrieve': 1, 'moderation': 1}
     
     def get_queryset(self):
+        # The serializer reads the author's name for non-anonymous posts
+        posts = Post.objects.select_related('author')
         user = self.request.user
         if user.is_authenticated and hasattr(user, 'is_wellness_team') and user.is_wellness_team:
             # Wellness team sees all posts
-            return Post.objects.all()
+            return posts
         elif user.is_authenticated:
-            # Authenticated users see approved posts + their own posts
-            return Post.objects.filter(is_approved=True) | Post.objects.filter(author=user)
+            # Authenticated users see approved posts + their own posts (the
+            # list reads the two parts separately, see feed_branches)
+            return posts.filter(Q(is_approved=True) | Q(author=user))
         else:
             # Anonymous users see only approved posts
-            return Post.objects.filter(is_approved=True)
+            return posts.filter(is_approved=True)
+    
+    @staticmethod
+    def feed_branches(user):
+        """
+        The feed of an authenticated student as two disjoint querysets:
+        approved posts (posts_approved_idx, or posts_category_idx within a
+        category) and the student's own unapproved posts (posts_author_idx).
+        """
+        return (
+            Post.objects.filter(is_approved=True),
+            Post.objects.filter(author=user, is_approved=False),
+        )
+    
+    def is_student_feed(self):
+        user = self.request.user
+        return user.is_authenticated and not getattr(user, 'is_wellness_team', False)
+    
+    def get_query_budget(self):
+        if self.action == 'list':
+            # Search: count, one page of ids, then the posts
+            if self.request.query_params.get('q'):
+                return 3
+            # Student feed: a count and an id scan per branch, then the posts
+            if self.is_student_feed():
+                return 5
+        return super().get_query_budget()
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Anonymous feed pages are served from the cache as rendered JSON,
+        keyed by the feed version, so a hit runs no query and no serializer.
+        
+        ?q= searches approved posts (optionally within ?category=), most
+        relevant first.
+        """
+        query = request.query_params.get('q', '').strip()
+        if query:
+            return self._search(request, query)
+        if self.is_student_feed():
+            return self._student_feed(request)
+        
+        cacheable = (
+            not request.user.is_authenticated
+            and set(request.query_params) <= {'category', 'page'}
+            and request.accepted_renderer.format == 'json'
+        )
+        if not cacheable:
+            return super().list(request, *args, **kwargs)
+        
+        key = feed_page_key(request.get_host(), request.query_params.get('category'), request.query_params.get('page'))
+        content = cache.get(key)
+        if content is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            content = JSONRenderer().render(response.data)
+            cache.set(key, content, settings.POST_FEED_CACHE_TTL)
+        return HttpResponse(content, content_type='application/json')
+    
+    def _student_feed(self, request):
+        """
+        Approved posts and the user's own pending posts, newest first. An OR
+        of the two filters would sort every matching row for each page; each
+        branch is read in index order instead and the branches are merged.
+        """
+        feed = MergedQuerySets(
+            *(self.filter_queryset(branch) for branch in self.feed_branches(request.user)),
+            ordering=FEED_ORDERING,
+            rows=Post.objects.select_related('author'),
+        )
+        page = self.paginate_queryset(feed)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    def _search(self, request, query):
+        ids = self.paginate_queryset(search_post_ids(query, request.query_params.get('category')))
+        posts = Post.objects.select_related('author').in_bulk(ids)
+        serializer = self.get_serializer([posts[post_id] for post_id in ids if post_id in posts], many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Category tabs of the stories feed (?category=...)
+        category = self.request.query_params.get('category')
+        if category and self.action == 'list':
+            queryset = queryset.filter(category=category)
+        return queryset
+    
+    @action(detail=False, methods=['get'])
+    def categories(self, request):
+        """Number of approved posts in each category (cached)."""
+        counts = category_counts()
+        return Response({
+            'total': sum(counts.values()),
+            'categories': [
+                {'category': category, 'label': label, 'count': counts[category]}
+                for category, label in Post.CATEGORY_CHOICES
+            ],
+        })
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def approve(self, request, pk=None):
@@ -41,9 +172,10 @@ class PostViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        post = self.get_object()
-        post.is_approved = True
-        post.save()
+        post_id = self._post_id(pk)
+        approved, _ = decide(approve=[post_id]) if post_id is not None else (0, 0)
+        if not approved:
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
         return Response({'status': 'post approved'})
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -55,10 +187,73 @@ class PostViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        post = self.get_object()
-        post.is_approved = False
-        post.save()
+        post_id = self._post_id(pk)
+        _, rejected = decide(reject=[post_id]) if post_id is not None else (0, 0)
+        if not rejected:
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
         return Response({'status': 'post rejected'})
+    
+    @staticmethod
+    def _post_id(pk):
+        """The URL pk as an int, or None if it is not a number (answered with 404)."""
+        try:
+            return int(pk)
+        except (TypeError, ValueError):
+            return None
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def moderation(self, request):
+        """
+        Posts awaiting moderation, oldest first (or highest risk first with
+        ?sort=risk), keyset-paginated.
+        Query params: category, sort (oldest|risk), duplicates (1: only posts
+        flagged as copies), duplicate_of (copies of one post), cursor, page_size.
+        """
+        if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        posts = Post.objects.select_related('author').filter(is_approved=False, moderated_at__isnull=True)
+        if request.query_params.get('category'):
+            posts = posts.filter(category=request.query_params['category'])
+        if request.query_params.get('duplicates') in ('1', 'true'):
+            posts = posts.filter(duplicate_of__isnull=False)
+        if request.query_params.get('duplicate_of'):
+            try:
+                posts = posts.filter(duplicate_of=int(request.query_params['duplicate_of']))
+            except ValueError:
+                return Response({'error': 'duplicate_of must be a post id'}, status=status.HTTP_400_BAD_REQUEST)
+        sort = request.query_params.get('sort', 'oldest')
+        if sort not in ('oldest', 'risk'):
+            return Response({'error': 'sort must be oldest or risk'}, status=status.HTTP_400_BAD_REQUEST)
+        paginator = RiskModerationQueuePagination() if sort == 'risk' else ModerationQueuePagination()
+        page = paginator.paginate_queryset(posts, request, view=self)
+        return paginator.get_paginated_response(PostModerationSerializer(page, many=True).data)
+    
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def moderate(self, request):
+        """
+        Apply many moderation decisions at once.
+        Expects JSON: {"approve": [1, 2, ...], "reject": [3, ...]}
+        """
+        if not hasattr(request.user, 'is_wellness_team') or not request.user.is_wellness_team:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        approve = request.data.get('approve', [])
+        reject = request.data.get('reject', [])
+        if not isinstance(approve, list) or not isinstance(reject, list) or not (approve or reject):
+            return Response({'error': 'approve and reject must be lists of post ids'}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(post_id, int) and not isinstance(post_id, bool) for post_id in approve + reject):
+            return Response({'error': 'Post ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(approve) + len(reject) > MODERATION_BATCH_LIMIT:
+            return Response(
+                {'error': f'At most {MODERATION_BATCH_LIMIT} decisions can be sent per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if set(approve) & set(reject):
+            return Response({'error': 'A post cannot be both approved and rejected'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        approved, rejected = decide(approve=approve, reject=reject)
+        return Response({'approved': approved, 'rejected': rejected})
 
 
 # ========== Template-based Views (keep for admin/legacy) ==========
@@ -66,10 +261,11 @@ class PostViewSet(viewsets.ModelViewSet):
 
 def post_list(request):
     """
-    Display list of approved posts.
+    Display one page of approved posts (?page=, optionally ?category=).
     """
-    posts = Post.objects.filter(is_approved=True)
-    return render(request, 'posts/post_list.html', {'posts': posts})
+    category = request.GET.get('category') or None
+    page = approved_page(request.GET.get('page'), category)
+    return render(request, 'posts/post_list.html', {'posts': page.object_list, 'page_obj': page, 'category': category})
 
 
 @login_required
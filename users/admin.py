@@ -14,7 +14,7 @@ class CustomUserAdmin(UserAdmin):
     ordering = ('-created_at',)
     
     fieldsets = UserAdmin.fieldsets + (
-        ('Additional Info', {'fields': ('role', 'phone_number', 'student_id', 'personal_email')}),
+        ('Additional Info', {'fields': ('role', 'phone_number', 'student_id', 'personal_email', 'calendar_feed_version')}),
         ('Timestamps', {'fields': ('created_at', 'updated_at')}),
     )
     
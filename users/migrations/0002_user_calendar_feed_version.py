@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='calendar_feed_version',
+            field=models.PositiveIntegerField(default=0, help_text="Bumped to revoke the user's calendar feed URL"),
+        ),
+    ]
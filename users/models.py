@@ -16,6 +16,9 @@ class User(AbstractUser):
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     student_id = models.CharField(max_length=20, blank=True, null=True, unique=True)
     personal_email = models.EmailField(blank=True, null=True, help_text="Optional personal email for notifications")
+    calendar_feed_version = models.PositiveIntegerField(
+        default=0, help_text="Bumped to revoke the user's calendar feed URL"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     